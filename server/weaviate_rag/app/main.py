@@ -1,14 +1,39 @@
-from fastapi import FastAPI, Request
-from pydantic import BaseModel
-from app.services.rag import retrieve_answer
+from fastapi import FastAPI, Request, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Literal, Optional, Tuple
+import dataclasses
+from app.services.rag import answer_question, answer_batch, render_answer, clear_tenant_cache, watch_index_updates
+from app.services.filters import build_filters, check_page_ranges
+from app.services.weaviate_setup import resolve_tenant
+from app.services import config
+from app.services.metrics import METRICS
+from app.services.compression import CompressionMiddleware
+from app.services.figure_store import cache_control
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
+import json
 
 app = FastAPI()
 
+# Protects /admin/*; admin endpoints are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Largest question list accepted by /chat/batch
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "1000"))
+
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "static")
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+
+class CachedStaticFiles(StaticFiles):
+    # Content-hashed figures are immutable; everything else revalidates via ETag / 304
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = cache_control(str(full_path))
+        return response
+
+
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
 
 app.add_middleware(
@@ -18,12 +43,112 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip/br above COMPRESS_MIN_BYTES; /static figures are left alone
+app.add_middleware(CompressionMiddleware)
+
+class ChatFilters(BaseModel):
+    sources: Optional[List[str]] = None          # PDF file names, e.g. ["Exercise Convection-Diffusion.pdf"]
+    pages: Optional[List[Tuple[int, int]]] = None  # inclusive 1-based ranges, e.g. [[10, 20]]
+    tags: Optional[List[str]] = None             # see docs/metadata.json
+    language: Optional[str] = None               # "de" | "en"
+
+    @field_validator("pages")
+    @classmethod
+    def _check_pages(cls, pages):
+        # ValueError here is a 422, like any other malformed request field
+        return check_page_ranges(pages)
 
 class ChatRequest(BaseModel):
     question: str
+    filters: Optional[ChatFilters] = None
+    tenant: Optional[str] = None                 # course, with MULTI_TENANCY on (default: DEFAULT_TENANT)
+    # "html": one string with inline <img> tags and the sources list (default)
+    # "structured": answer, sources[] and figures[] as separate fields, images lazy-loadable
+    format: Literal["html", "structured"] = "html"
 
 @app.post("/chat")
-async def chat_endpoint(req: ChatRequest):
-    answer = retrieve_answer(req.question)
-    return {"answer": answer}
+def chat_endpoint(req: ChatRequest):
+    # Plain def: FastAPI runs it in its threadpool, so waiting for a chat slot
+    # (MAX_CONCURRENT_CHATS) blocks that worker thread, not the event loop
+    filters = build_filters(**req.filters.model_dump()) if req.filters else None
+    try:
+        tenant = resolve_tenant(req.tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = answer_question(req.question, filters=filters, tenant=tenant)
+    if req.format == "structured":
+        return result
+    return {"answer": render_answer(result)}
+
+
+class BatchRequest(BaseModel):
+    questions: List[str]
+    filters: Optional[ChatFilters] = None
+    tenant: Optional[str] = None
+    format: Literal["html", "structured"] = "html"
+
+@app.post("/chat/batch")
+def chat_batch_endpoint(req: BatchRequest):
+    """
+    NDJSON stream, one line per question in completion order: {"index", "question", "answer"}
+    (plus sources/figures when structured), or {"index", "question", "error"}.
+    """
+    if len(req.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=400, detail=f"at most {BATCH_MAX_QUESTIONS} questions per batch")
+    filters = build_filters(**req.filters.model_dump()) if req.filters else None
+    try:
+        tenant = resolve_tenant(req.tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def lines():
+        for index, result, error in answer_batch(req.questions, filters=filters, tenant=tenant):
+            row = {"index": index, "question": req.questions[index]}
+            if error is not None:
+                row["error"] = error
+            elif req.format == "structured":
+                row.update(result)
+            else:
+                row["answer"] = render_answer(result)
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.on_event("startup")
+def _start_watchers():
+    # runtime_config.json changes are picked up without a restart
+    config.start_watcher()
+    # Re-ingested courses (load_documents.py) drop their cached retrieval results
+    watch_index_updates()
+
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="admin token required")
+
+@app.get("/admin/config")
+async def get_config(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return dataclasses.asdict(config.settings())
+
+@app.post("/admin/config")
+async def update_config(changes: Dict[str, Any], x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    try:
+        return dataclasses.asdict(config.update(changes))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/admin/cache/clear")
+async def clear_cache(tenant: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Drop cached retrieval results for one course (?tenant=...), or for all of them.
+    """
+    _require_admin(x_admin_token)
+    clear_tenant_cache(tenant)
+    return {"cleared": tenant if tenant is not None else "all"}
 
+@app.get("/metrics")
+async def metrics():
+    return METRICS.snapshot()
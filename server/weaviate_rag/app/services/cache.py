@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    Keys live in a namespace (the tenant/course), so one course can be cleared
+    without touching the others:
+
+        cache.set(tenant, key, value)
+        cache.get(tenant, key)          # None when missing or expired
+        cache.clear(tenant)
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        full = (namespace, key)
+        with self._lock:
+            entry = self._data.get(full)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[full]
+                self.misses += 1
+                return None
+            self._data.move_to_end(full)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, namespace: str, key: Hashable, value: Any):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self, namespace: str = None):
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+            else:
+                for full in [k for k in self._data if k[0] == namespace]:
+                    del self._data[full]
+
+    def __len__(self) -> int:
+        return len(self._data)
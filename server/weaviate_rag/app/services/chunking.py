@@ -0,0 +1,52 @@
+import os
+import re
+from typing import Iterable, Tuple
+
+# Kept free of OpenAI/Weaviate imports so scripts and benchmarks can use it offline
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))       # words
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
+
+_WORD_RE = re.compile(r"\S+")
+_VOCAB_RE = re.compile(r"\w+")
+# Soft hyphens (U+00AD) only mark where a word may be broken: always dropped
+_SOFT_HYPHEN_RE = re.compile("\u00ad\n?")
+# A hard hyphen at a line end is ambiguous: "Strö-\nmung" is a broken word, "well-\nknown"
+# and "state-\nof-the-art" are compounds. See _join_hyphen_break.
+_HYPHEN_BREAK_RE = re.compile(r"(\w+)-\n([a-zäöüß][\w-]*)")
+
+def _join_hyphen_break(match, vocabulary) -> str:
+    """
+    Re-join "head-\ntail" only when the joined word appears unhyphenated elsewhere on the
+    page (the page is its own word list); compounds and words seen once keep the hyphen.
+    """
+    head, tail = match.groups()
+    if "-" not in tail and (head + tail).lower() in vocabulary:
+        return head + tail
+    return match.group(0)
+
+def normalize_page_text(text: str) -> str:
+    """
+    Compact text for embedding/BM25: re-join words broken at line ends, collapse runs of
+    spaces and drop blank lines. Line breaks are kept so display formatting still works.
+    """
+    text = _SOFT_HYPHEN_RE.sub("", text)
+    if "-\n" in text:
+        vocabulary = {w.lower() for w in _VOCAB_RE.findall(text)}
+        text = _HYPHEN_BREAK_RE.sub(lambda m: _join_hyphen_break(m, vocabulary), text)
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def iter_chunks(text: str, size: int = None, overlap: int = None) -> Iterable[Tuple[int, str]]:
+    """
+    Yields (word_offset, chunk) for overlapping CHUNK_SIZE-word windows (or `size` / `overlap`,
+    e.g. when evaluating other chunkings). Chunks are slices of `text`, so they keep its line breaks.
+    """
+    size = size or CHUNK_SIZE
+    overlap = CHUNK_OVERLAP if overlap is None else overlap
+    spans = [m.span() for m in _WORD_RE.finditer(text)]
+    start = 0
+    step = max(1, size - overlap)
+    while start < len(spans):
+        end = min(start + size, len(spans)) - 1
+        yield start, text[spans[start][0]:spans[end][1]]
+        start += step
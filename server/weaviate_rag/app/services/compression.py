@@ -0,0 +1,65 @@
+import os
+
+from starlette.middleware.gzip import GZipMiddleware
+
+# brotli-asgi (in requirements.txt) adds `br`, ~15-20% smaller than gzip on our
+# JSON/markdown answers. The import guard is only a safety net for installs without it:
+# responses are then gzip-only and a warning is printed once at startup.
+try:
+    from brotli_asgi import BrotliMiddleware
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+# ----------------- Configuration -----------------
+ENABLE_COMPRESSION = os.getenv("ENABLE_COMPRESSION", "true").lower() in {"1", "true", "yes"}
+# Bodies smaller than this (bytes) are sent as-is: short answers gain nothing on the wire
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))       # 0-11; 4 is gzip-fast, smaller output
+# Already-compressed content (PNG figures) is passed through untouched, and so is the
+# /chat/batch NDJSON stream: the compressor would hold lines back until its buffer fills
+COMPRESS_SKIP_PREFIXES = tuple(
+    p for p in os.getenv("COMPRESS_SKIP_PREFIXES", "/static,/chat/batch").split(",") if p
+)
+
+
+class _SkipPaths:
+    """
+    Send requests under `prefixes` straight to `app`, everything else through `compressed`.
+    """
+
+    def __init__(self, app, compressed, prefixes):
+        self.app = app
+        self.compressed = compressed
+        self.prefixes = prefixes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].startswith(self.prefixes):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+class CompressionMiddleware:
+    """
+    br when the client accepts it and brotli-asgi is installed, gzip otherwise; bodies
+    under COMPRESS_MIN_BYTES and paths in COMPRESS_SKIP_PREFIXES stay uncompressed.
+
+        app.add_middleware(CompressionMiddleware)
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, skip_prefixes=COMPRESS_SKIP_PREFIXES):
+        if not ENABLE_COMPRESSION:
+            self.app = app
+            return
+        if HAS_BROTLI:
+            compressed = BrotliMiddleware(app, quality=BROTLI_QUALITY, minimum_size=minimum_size,
+                                          gzip_fallback=True)
+        else:
+            print("⚠️  brotli-asgi is not installed: responses are gzip-only (pip install brotli-asgi)")
+            compressed = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=GZIP_LEVEL)
+        self.app = _SkipPaths(app, compressed, tuple(skip_prefixes)) if skip_prefixes else compressed
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
@@ -0,0 +1,198 @@
+import os
+import json
+import threading
+import dataclasses
+from dataclasses import dataclass
+from typing import Callable, List
+
+from dotenv import load_dotenv
+
+from app.services.metrics import METRICS
+
+load_dotenv()
+
+# Runtime-tunable settings. Env vars give the defaults; CONFIG_PATH (JSON, any subset of
+# the fields below) overrides them and is re-read when it changes, without a restart:
+#   {"retrieval_k": 8, "hybrid_alpha": 0.6, "chat_model": "gpt-4o-mini"}
+# The embedding model is deliberately not here: queries must be embedded with the model the
+# index was built with, so it is a startup-only env var (EMBEDDING_MODEL, see rag.py).
+CONFIG_PATH = os.getenv(
+    "CONFIG_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "runtime_config.json")),
+)
+CONFIG_POLL_SEC = float(os.getenv("CONFIG_POLL_SEC", "2"))
+
+
+@dataclass(frozen=True)
+class Settings:
+    version: int
+    chat_model: str
+    small_model: str
+    router_enabled: bool
+    retrieval_k: int
+    hybrid_alpha: float
+    figure_k: int
+    embed_cache_ttl_sec: float
+    retrieval_cache_ttl_sec: float
+    max_concurrent_chats: int
+    ood_min_similarity: float
+    ood_min_score: float
+    router_min_similarity: float
+
+
+def _env_defaults() -> dict:
+    return {
+        "chat_model": os.getenv("OPENAI_MODEL", "gpt-4o"),
+        # Cheaper tier for simple definition questions (see router.py)
+        "small_model": os.getenv("SMALL_MODEL", "gpt-4o-mini"),
+        "router_enabled": os.getenv("ROUTER_ENABLED", "true"),
+        "retrieval_k": int(os.getenv("RETRIEVAL_K", "6")),
+        "hybrid_alpha": float(os.getenv("HYBRID_ALPHA", "0.5")),
+        "figure_k": int(os.getenv("FIGURE_K", "3")),
+        "embed_cache_ttl_sec": float(os.getenv("EMBED_CACHE_TTL_SEC", "3600")),
+        "retrieval_cache_ttl_sec": float(os.getenv("RETRIEVAL_CACHE_TTL_SEC", "300")),
+        "max_concurrent_chats": int(os.getenv("MAX_CONCURRENT_CHATS", "8")),
+        # Out-of-domain gate (router.out_of_domain): answer locally when the best chunk's cosine
+        # similarity / hybrid score is below these. 0 disables a check. Both are off until
+        # calibrated on this corpus and embedding model (in-domain text-embedding-3-small
+        # similarities often sit at 0.2-0.35): `python -m scripts.calibrate_ood --backend local`
+        # sweeps the evaluation questions (evaluation/questions_v1.jsonl) against off-topic ones.
+        # Record the chosen value, model and dataset version here when setting a default.
+        "ood_min_similarity": float(os.getenv("OOD_MIN_SIMILARITY", "0")),
+        "ood_min_score": float(os.getenv("OOD_MIN_SCORE", "0")),
+        # Router confidence: a definition question goes to the small model only if the best
+        # chunk's cosine similarity reaches this. Same scale as ood_min_similarity, and just as
+        # corpus/model dependent, so provisional and off (0) until calibrated: calibrate_ood
+        # also suggests it (median in-domain similarity).
+        "router_min_similarity": float(os.getenv("ROUTER_MIN_SIMILARITY", "0")),
+    }
+
+
+_FIELDS = {f.name: f.type for f in dataclasses.fields(Settings) if f.name != "version"}
+
+
+def _validate(values: dict) -> dict:
+    if "embedding_model" in values:
+        raise ValueError("embedding_model is not runtime-tunable (set EMBEDDING_MODEL and re-ingest)")
+    unknown = set(values) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+    out = {}
+    for name, value in values.items():
+        kind = _FIELDS[name]
+        if kind is bool and isinstance(value, str):
+            value = value.lower() in {"1", "true", "yes"}
+        try:
+            out[name] = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}: expected {kind.__name__}, got {value!r}")
+    for name in ("hybrid_alpha", "ood_min_similarity", "ood_min_score", "router_min_similarity"):
+        if name in out and not 0.0 <= out[name] <= 1.0:
+            raise ValueError(f"{name} must be within [0, 1]")
+    for name in ("retrieval_k", "figure_k", "max_concurrent_chats"):
+        if name in out and out[name] < (0 if name == "figure_k" else 1):
+            raise ValueError(f"{name} is out of range: {out[name]}")
+    return out
+
+
+def _read_file(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return data
+
+
+_lock = threading.Lock()
+_current = Settings(version=0, **_validate(_env_defaults()))
+_subscribers: List[Callable[[Settings], None]] = []
+_file_mtime = None
+
+
+def settings() -> Settings:
+    """
+    The current snapshot. Read it once per request: a reload swaps the whole object,
+    so a request never sees half of an update.
+    """
+    return _current
+
+
+def subscribe(fn: Callable[[Settings], None]):
+    """
+    Call `fn(new_settings)` after every change (e.g. to resize caches or limits).
+    """
+    _subscribers.append(fn)
+
+
+def _apply(values: dict, source: str) -> Settings:
+    global _current
+    with _lock:
+        old = _current
+        new = Settings(version=old.version + 1, **values)
+        changed = {
+            name: [getattr(old, name), getattr(new, name)]
+            for name in _FIELDS if getattr(old, name) != getattr(new, name)
+        }
+        if not changed:
+            return old
+        _current = new
+    METRICS.incr("config_reloads", source=source)
+    METRICS.event("config", version=new.version, source=source, changed=changed)
+    print(f"ℹ️ Config v{new.version} from {source}: " + ", ".join(f"{k}={v[1]}" for k, v in changed.items()))
+    for fn in _subscribers:
+        fn(new)
+    return new
+
+
+def reload(path: str = CONFIG_PATH) -> Settings:
+    """
+    Re-read `path` over the env defaults. On a bad file the current settings stay in place.
+    """
+    global _file_mtime
+    try:
+        _file_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        values = _validate({**_env_defaults(), **_read_file(path)})
+    except (OSError, ValueError) as e:
+        METRICS.incr("config_errors")
+        print(f"⚠️  Ignoring {path}: {e}")
+        return _current
+    return _apply(values, source="file")
+
+
+def update(changes: dict, path: str = CONFIG_PATH) -> Settings:
+    """
+    Admin update: validate, merge into the config file (atomic rename) and apply.
+    Writing the file keeps it the single source of truth for later reloads.
+    """
+    global _file_mtime
+    changes = _validate(changes)
+    with _lock:
+        data = {**_read_file(path), **changes}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2)
+        os.replace(tmp, path)
+    _file_mtime = os.path.getmtime(path)
+    return _apply(_validate({**_env_defaults(), **data}), source="admin")
+
+
+def _watch(path: str, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        try:
+            mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        except OSError:
+            continue
+        if mtime != _file_mtime:
+            reload(path)
+
+
+def start_watcher(path: str = CONFIG_PATH, interval: float = CONFIG_POLL_SEC) -> threading.Event:
+    """
+    Load `path` now and poll its mtime every `interval` seconds. Set the returned event to stop.
+    """
+    reload(path)
+    stop = threading.Event()
+    threading.Thread(target=_watch, args=(path, interval, stop), name="config-watch", daemon=True).start()
+    return stop
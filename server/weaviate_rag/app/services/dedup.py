@@ -0,0 +1,217 @@
+import os
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.minhash import LSHIndex, MinHasher, Signature, shingles, signature
+
+# Append-only JSON-lines store of the MinHash signatures of everything already indexed:
+#   {"event": "doc",   "source": ..., "sig": [...]}
+#   {"event": "drop",  "source": ...}               (document failed to index: not a canonical)
+#   {"event": "chunk", "uuid": ..., "source": ..., "page": 3, "sig": [...]}
+#   {"event": "alias", "uuid": ... | null, "source": <canonical>, "alias": <duplicate source>}
+# Replayed on start so duplicates are caught across runs, not only within one.
+DEDUP_INDEX_PATH = os.getenv(
+    "DEDUP_INDEX_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "dedup_index.jsonl")),
+)
+ENABLE_DEDUP = os.getenv("ENABLE_DEDUP", "true").lower() in {"1", "true", "yes"}
+# Estimated Jaccard at or above which a chunk / a whole document counts as a duplicate
+CHUNK_DUP_THRESHOLD = float(os.getenv("CHUNK_DUP_THRESHOLD", "0.9"))
+DOC_DUP_THRESHOLD = float(os.getenv("DOC_DUP_THRESHOLD", "0.95"))
+
+
+def text_signature(text: str) -> Signature:
+    return signature(shingles(text))
+
+
+def document_signature(page_texts: Iterable[str]) -> Signature:
+    """
+    text_signature of the pages joined with newlines, without holding the whole text.
+    """
+    hasher = MinHasher()
+    for text in page_texts:
+        hasher.update(text)
+    return hasher.signature()
+
+
+class DedupIndex:
+    """
+    MinHash/LSH index over stored chunks and whole documents. A duplicate is not stored
+    again; its source is added to the canonical object's `aliases` instead.
+
+        uuid = dedup.find_chunk(source, sig)        # canonical chunk or None
+        dedup.add_alias(uuid, dedup.chunk_source(uuid), source)
+
+    Lookups cost O(bands) bucket probes, so the index grows linearly with the corpus.
+    Shared by parallel ingest workers: lookups and updates of the in-memory index, and the
+    file writes, all run under one RLock.
+    """
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH, enabled: bool = ENABLE_DEDUP):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._claim_lock = threading.Lock()
+        self._indexing: Dict[str, threading.Event] = {}   # documents a worker is still storing
+        self._docs = LSHIndex()
+        self._chunks = LSHIndex()
+        self._chunk_source: Dict[str, str] = {}
+        self._doc_chunks: Dict[str, List[str]] = {}
+        self._aliases: Dict[Tuple[Optional[str], str], List[str]] = {}
+        self.duplicate_chunks = 0
+        self.duplicate_docs = 0
+        self._fh = None
+        if enabled:
+            self._load()
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                event = rec.get("event")
+                if event == "doc":
+                    self._docs.add(rec["source"], rec["sig"])
+                elif event == "drop":
+                    self._docs.remove(rec["source"])
+                elif event == "chunk":
+                    self._add_chunk(rec["uuid"], rec["source"], rec["sig"])
+                elif event == "alias":
+                    self._add_alias(rec["uuid"], rec["source"], rec["alias"])
+
+    def _write(self, rec: dict):
+        with self._lock:
+            self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._fh.flush()
+
+    def _add_chunk(self, uuid: str, source: str, sig: Signature):
+        with self._lock:
+            if uuid in self._chunk_source:
+                return False
+            # Source first: find_chunk's exclude looks it up for every bucket hit
+            self._chunk_source[uuid] = source
+            self._chunks.add(uuid, sig)
+            self._doc_chunks.setdefault(source, []).append(uuid)
+            return True
+
+    def _add_alias(self, uuid: Optional[str], source: str, alias: str) -> bool:
+        with self._lock:
+            aliases = self._aliases.setdefault((uuid, source), [])
+            if alias in aliases or alias == source:
+                return False
+            aliases.append(alias)
+            return True
+
+    # ---- documents
+    def find_document(self, source: str, sig: Signature) -> Optional[Tuple[str, float]]:
+        """
+        (canonical source, similarity) if another indexed document matches `sig`.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._docs.best_match(sig, DOC_DUP_THRESHOLD, exclude=lambda key: key == source)
+
+    def add_document(self, source: str, sig: Signature):
+        if not self.enabled:
+            return
+        with self._lock:
+            if source not in self._docs:
+                self._docs.add(source, sig)
+                self._write({"event": "doc", "source": source, "sig": list(sig)})
+
+    def claim_document(self, source: str, sig: Signature) -> Optional[Tuple[str, float]]:
+        """
+        find_document + add_document as one step, for parallel ingest workers. A match that
+        another worker is still storing is waited for; if that worker fails, the match is
+        dropped and the claim is retried. Without a match `source` is claimed: call
+        `release_document` once it is stored or has failed.
+        """
+        while True:
+            with self._claim_lock:
+                match = self.find_document(source, sig)
+                if match is None:
+                    self.add_document(source, sig)
+                    if self.enabled:
+                        self._indexing[source] = threading.Event()
+                    return None
+                pending = self._indexing.get(match[0])
+            if pending is None:
+                return match
+            pending.wait()
+
+    def release_document(self, source: str, failed: bool = False):
+        """
+        End a claim. A failed document is dropped from the index so no copy is aliased to it.
+        """
+        if failed and self.enabled:
+            with self._lock:
+                if source in self._docs:
+                    self._docs.remove(source)
+                    self._write({"event": "drop", "source": source})
+        with self._claim_lock:
+            pending = self._indexing.pop(source, None)
+        if pending is not None:
+            pending.set()
+
+    def document_chunks(self, source: str) -> List[str]:
+        with self._lock:
+            return list(self._doc_chunks.get(source, ()))
+
+    # ---- chunks
+    def find_chunk(self, source: str, sig: Signature) -> Optional[str]:
+        """
+        UUID of a stored chunk from another document that `sig` duplicates.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            match = self._chunks.best_match(
+                sig, CHUNK_DUP_THRESHOLD, exclude=lambda key: self._chunk_source.get(key) == source
+            )
+        return match[0] if match else None
+
+    def chunk_source(self, uuid: str) -> Optional[str]:
+        with self._lock:
+            return self._chunk_source.get(uuid)
+
+    def add_chunk(self, uuid: str, source: str, page: int, sig: Signature):
+        if not (self.enabled and sig):
+            return
+        with self._lock:
+            if self._add_chunk(uuid, source, sig):
+                self._write({"event": "chunk", "uuid": uuid, "source": source, "page": page, "sig": list(sig)})
+
+    # ---- aliases
+    def add_alias(self, uuid: Optional[str], source: str, alias: str) -> bool:
+        """
+        Record `alias` for the canonical chunk `uuid` (None: the whole document `source`).
+        Call it after the alias is written to Weaviate, so a crash in between retries the write.
+        """
+        with self._lock:
+            if not self._add_alias(uuid, source, alias):
+                return False
+            self._write({"event": "alias", "uuid": uuid, "source": source, "alias": alias})
+            if uuid is None:
+                self.duplicate_docs += 1
+            else:
+                self.duplicate_chunks += 1
+            return True
+
+    def aliases(self, uuid: Optional[str], source: str) -> List[str]:
+        with self._lock:
+            return list(self._aliases.get((uuid, source), ()))
+
+    def summary(self) -> str:
+        return (f"{len(self._docs)} documents / {len(self._chunks)} chunks indexed; "
+                f"{self.duplicate_docs} duplicate documents and {self.duplicate_chunks} duplicate chunks aliased")
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
@@ -0,0 +1,65 @@
+import os
+from typing import List, Sequence
+
+import numpy as np
+
+# ----------------- Configuration -----------------
+MMR_ENABLED = os.getenv("MMR_ENABLED", "true").lower() in {"1", "true", "yes"}
+# 1.0 = pure relevance, 0.0 = pure diversity
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+# Candidates fetched per requested chunk before MMR picks the final k
+MMR_FETCH_FACTOR = int(os.getenv("MMR_FETCH_FACTOR", "4"))
+# Leading dimensions used for candidate-candidate similarity (0 = all). text-embedding-3
+# vectors stay meaningful when truncated, and list -> array conversion dominates the cost.
+MMR_DIMS = int(os.getenv("MMR_DIMS", "256"))
+
+
+def mmr_select(relevance: Sequence[float], vectors, k: int, lambda_: float = MMR_LAMBDA,
+               dims: int = MMR_DIMS) -> List[int]:
+    """
+    Maximal marginal relevance: indices of `k` candidates, each chosen to maximise
+    lambda * relevance - (1 - lambda) * max cosine similarity to those already chosen.
+
+    `relevance` is min-max scaled to [0, 1] so it is on the same footing as cosine.
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+
+    rel = np.asarray(relevance, dtype=np.float32)
+    span = rel.max() - rel.min()
+    rel = (rel - rel.min()) / span if span > 0 else np.ones_like(rel)
+    if n <= k:
+        return [int(i) for i in np.argsort(-rel, kind="stable")]
+
+    v = np.array([vec[:dims] for vec in vectors] if dims else vectors, dtype=np.float32)
+    norms = np.linalg.norm(v, axis=1, keepdims=True)
+    v = v / np.where(norms == 0, 1, norms)
+    sim = v @ v.T
+
+    first = int(np.argmax(rel))
+    selected = [first]
+    max_sim = sim[first].copy()
+    taken = np.zeros(n, dtype=bool)
+    taken[first] = True
+    for _ in range(k - 1):
+        score = lambda_ * rel - (1 - lambda_) * max_sim
+        score[taken] = -np.inf
+        i = int(np.argmax(score))
+        selected.append(i)
+        taken[i] = True
+        np.maximum(max_sim, sim[i], out=max_sim)
+    return selected
+
+
+def query_similarity(query_vector, vectors) -> List[float]:
+    """
+    Cosine similarity of each vector to the query: an absolute relevance signal, unlike
+    hybrid scores, which are normalised per query.
+    """
+    if not len(vectors):
+        return []
+    q = np.asarray(query_vector, dtype=np.float32)
+    v = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(v, axis=1) * (np.linalg.norm(q) or 1.0)
+    return (v @ q / np.where(norms == 0, 1, norms)).tolist()
@@ -0,0 +1,54 @@
+import os
+import re
+import json
+from typing import Dict, Iterable
+
+# Per-document metadata stored on every chunk/figure so searches can be scoped:
+#   {"Stroemung_II.pdf": {"tags": ["stroemung"], "language": "de"}, ...}
+# Documents not listed get no tags and a detected language.
+DOC_METADATA_PATH = os.getenv(
+    "DOC_METADATA_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "docs", "metadata.json")),
+)
+
+_WORD_RE = re.compile(r"[a-zäöüß]+")
+_STOPWORDS = {
+    "de": {"der", "die", "das", "und", "ist", "mit", "für", "nicht", "ein", "eine", "den", "von", "zu", "im", "wird", "auf"},
+    "en": {"the", "and", "is", "of", "to", "in", "with", "for", "that", "are", "this", "be", "on", "by", "as", "it"},
+}
+
+
+def load_doc_metadata(path: str = DOC_METADATA_PATH) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def detect_language(page_texts: Iterable[str], max_words: int = 5000) -> str:
+    """
+    "de" / "en" by stopword counts over the first `max_words` words; "" if neither shows up.
+    """
+    counts = {lang: 0 for lang in _STOPWORDS}
+    seen = 0
+    for text in page_texts:
+        for word in _WORD_RE.findall(text.lower()):
+            for lang, stop in _STOPWORDS.items():
+                if word in stop:
+                    counts[lang] += 1
+            seen += 1
+        if seen >= max_words:
+            break
+    lang = max(counts, key=counts.get)
+    return lang if counts[lang] else ""
+
+
+def document_properties(source: str, page_texts: Iterable[str], metadata: Dict[str, dict] = None) -> dict:
+    """
+    The `tags` / `language` properties for every object of `source`.
+    """
+    entry = (metadata if metadata is not None else load_doc_metadata()).get(source, {})
+    return {
+        "tags": list(entry.get("tags", [])),
+        "language": entry.get("language") or detect_language(page_texts),
+    }
@@ -1,18 +1,41 @@
 import os
 import io
 import time
-import random
 import base64
+import threading
+import hashlib
 from typing import List, Iterable, Tuple
 
-import pdfplumber
 import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI, APIError, RateLimitError
+from openai import OpenAI, RateLimitError
 from PIL import Image
-
-from app.services.weaviate_setup import init_schema, client
-from app.services.format_math_equation import format_equations_for_mathjax
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
+
+from app.services.weaviate_setup import (
+    CHUNK_COLLECTION,
+    FIGURE_COLLECTION,
+    get_collection,
+)
+from app.services.resilience import (
+    call_with_retry,
+    OPENAI_BREAKER,
+    WEAVIATE_BREAKER,
+    EMBED_HEDGE_DELAY_SEC,
+)
+from app.services.ingest_journal import IngestJournal
+from app.services.chunking import iter_chunks
+from app.services.extractors import PdfPages, NATIVE_PDF_LOCK
+from app.services.page_spool import spool_pages
+from app.services.tables import TableBudget
+from app.services.page_filter import PageFilter
+from app.services.dedup import DedupIndex, text_signature, document_signature
+from app.services.doc_metadata import document_properties
+from app.services.figure_store import STATIC_FIG_DIR, save_figure
+from app.services.ingest_progress import IngestProgress
+from app.services.micro_batch import MicroBatcher
 
 
 try:
@@ -30,16 +53,9 @@ if not OPENAI_API_KEY:
 openai = OpenAI(api_key=OPENAI_API_KEY)
 
 # ----------------- Configuration -----------------
-PDF_FOLDER = os.getenv("PDF_FOLDER", "docs")
-CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))       # words
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "50"))
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
-# Static folder for written images
-# embedder.py is at: app/services/embedder.py 
-STATIC_FIG_DIR = os.path.normpath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "static", "figures")
-)
+# Static folder for written images (content-hashed names + smaller widths, see figure_store.py)
 os.makedirs(STATIC_FIG_DIR, exist_ok=True)
 
 # Image captioning (optional) — default OFF to avoid 429s
@@ -52,113 +68,204 @@ CAPTION_REQUEST_DELAY_SEC = float(os.getenv("CAPTION_REQUEST_DELAY_SEC", "0.35")
 # Retry settings for 429s / transient errors
 MAX_RETRIES = int(os.getenv("CAPTION_MAX_RETRIES", "6"))
 BACKOFF_BASE = float(os.getenv("CAPTION_BACKOFF_BASE", "0.6"))  # seconds
+# Max inputs per embeddings request / objects per Weaviate batch
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# Parallel ingest: the workers' requests are coalesced into shared batches (IngestBatcher).
+# 0 sends as soon as a sender is free and batches whatever queued up during the last call;
+# a positive value also holds a partial batch back that long to let it fill
+INGEST_BATCH_WAIT_SEC = float(os.getenv("INGEST_BATCH_WAIT_SEC", "0"))
+# Embedding requests the shared batcher keeps in flight at once
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "2"))
+# Objects per insert_many from the shared Weaviate writer
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "200"))
 
 # ----------------- Helpers -----------------
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
     encoding = tiktoken.encoding_for_model(model)
     return len(encoding.encode(text))
 
-def chunk_text(text: str) -> List[str]:
-    words = text.split()
-    chunks: List[str] = []
-    if not words:
-        return chunks
-
-    start = 0
-    step = max(1, CHUNK_SIZE - CHUNK_OVERLAP)
-    while start < len(words):
-        chunk = words[start:start + CHUNK_SIZE]
-        chunks.append(" ".join(chunk))
-        start += step
-    return chunks
-
-def _embed_and_insert(collection, text: str, source: str, page_number: int):
-    if not text.strip():
-        return
-    emb = openai.embeddings.create(
-        input=text,
-        model=EMBEDDING_MODEL
-    ).data[0].embedding
+def _embed_many(texts: List[str], progress: IngestProgress = None) -> List[List[float]]:
+    vectors: List[List[float]] = []
+    for i in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = texts[i:i + EMBED_BATCH_SIZE]
+        resp = call_with_retry(
+            lambda: openai.embeddings.create(input=batch, model=EMBEDDING_MODEL),
+            breaker=OPENAI_BREAKER,
+            hedge_delay=EMBED_HEDGE_DELAY_SEC,
+        )
+        vectors.extend(d.embedding for d in sorted(resp.data, key=lambda d: d.index))
+        if progress is not None and getattr(resp, "usage", None) is not None:
+            progress.add(tokens=resp.usage.total_tokens)
+    return vectors
+
+def object_uuid(source: str, page_number: int, key, text: str = "") -> str:
+    """
+    UUIDv5 of (source, page, offset/key, content hash): re-ingesting the same chunk
+    overwrites the existing object instead of adding a duplicate.
+    """
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return generate_uuid5(f"{source}|{page_number}|{key}|{digest}")
+
+def _batch_upsert(collection, objects: List[DataObject]):
+    """
+    Write objects through the batch endpoint, which replaces objects whose UUID already exists.
+    Objects that fail are retried once before giving up.
+    """
+    pending = list(objects)
+    for attempt in range(2):
+        if not pending:
+            return
+        res = call_with_retry(
+            lambda: collection.data.insert_many(pending),
+            breaker=WEAVIATE_BREAKER,
+        )
+        if not res.has_errors:
+            return
+        first_error = next(iter(res.errors.values())).message
+        pending = [pending[i] for i in sorted(res.errors)]
+    raise RuntimeError(f"{len(pending)} objects failed to upsert: {first_error}")
+
+class IngestBatcher:
+    """
+    The embeddings batcher and Weaviate batch writer of one ingest run. Shared by parallel
+    workers, their per-page requests are coalesced into full API calls; with `enabled=False`
+    (a lone embed_and_store call) every request goes straight through.
+    """
 
-    collection.data.insert(
+    def __init__(self, progress: IngestProgress = None, enabled: bool = True):
+        self.progress = progress
+        self.enabled = enabled
+        self._collections = {}
+        self._embedder = self._writer = None
+        if enabled:
+            self._embedder = MicroBatcher(lambda _, texts: _embed_many(texts, progress), EMBED_BATCH_SIZE,
+                                          INGEST_BATCH_WAIT_SEC, EMBED_CONCURRENCY, "embed")
+            self._writer = MicroBatcher(self._write, WRITE_BATCH_SIZE, INGEST_BATCH_WAIT_SEC, 1, "write")
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._embedder is None:
+            return _embed_many(texts, self.progress)
+        return self._embedder.submit(None, texts).result()
+
+    def upsert(self, collection, objects: List[DataObject]):
+        """
+        Returns once the objects are stored, so the caller can journal them.
+        """
+        if self._writer is None:
+            return _batch_upsert(collection, objects)
+        # Each worker has its own collection handle; batch per collection + tenant
+        key = (collection.name, collection.tenant)
+        self._collections.setdefault(key, collection)
+        self._writer.submit(key, objects).result()
+
+    def _write(self, key, objects: List[DataObject]):
+        _batch_upsert(self._collections[key], objects)
+        return [None] * len(objects)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "not batched"
+        return (f"{self._embedder.items} texts in {self._embedder.calls} embedding requests, "
+                f"{self._writer.items} objects in {self._writer.calls} Weaviate batches")
+
+    def close(self):
+        for batcher in (self._embedder, self._writer):
+            if batcher is not None:
+                batcher.close()
+
+def _insert_figure(collection, caption: str, source: str, page_number: int, image_web_path: str, uuid: str,
+                   doc_props: dict = None, batcher: IngestBatcher = None):
+    """
+    One LectureFigure object per image; embedded only when there is a caption to embed.
+    """
+    if batcher is None:
+        batcher = IngestBatcher(enabled=False)
+    batcher.upsert(collection, [DataObject(
         properties={
-            "text": text,
+            "caption": caption,
             "source": source,
             "page": page_number,  # stored 1-based
+            "imagePath": image_web_path,
+            **(doc_props or {}),
         },
-        vector=emb,
+        uuid=uuid,
+        vector=batcher.embed([caption])[0] if caption else None,
+    )])
+
+# Alias lists are read, extended and written back; parallel workers aliasing onto the same
+# object would lose one update, so every read-modify-write runs under this lock
+_ALIAS_LOCK = threading.Lock()
+
+def _set_aliases(collection, uuid, aliases: List[str]):
+    call_with_retry(
+        lambda: collection.data.update(uuid=uuid, properties={"aliases": aliases}),
+        breaker=WEAVIATE_BREAKER,
     )
 
-def _insert_metadata_only(collection, props: dict):
+def _record_alias(collection, dedup: DedupIndex, uuid: str, alias: str):
     """
-    Insert an object without a vector (for pure metadata like images without captions).
+    `alias` has the same content as the stored chunk `uuid`: list it there instead of storing a copy.
     """
-    collection.data.insert(
-        properties=props,
-        vector=None,
-    )
+    canonical = dedup.chunk_source(uuid)
+    with _ALIAS_LOCK:
+        aliases = dedup.aliases(uuid, canonical)
+        if alias in aliases:
+            return
+        _set_aliases(collection, uuid, aliases + [alias])
+        dedup.add_alias(uuid, canonical, alias)
+
+def _alias_document(collection, figures, dedup: DedupIndex, canonical: str, alias: str):
+    """
+    Whole-document duplicate: add `alias` to every chunk and figure of `canonical`.
+    """
+    if alias in dedup.aliases(None, canonical):
+        return
+    for uuid in dedup.document_chunks(canonical):
+        _record_alias(collection, dedup, uuid, alias)
+    # Figures are not in the MinHash index; their current aliases come from Weaviate
+    with _ALIAS_LOCK:
+        res = call_with_retry(
+            lambda: figures.query.fetch_objects(
+                filters=Filter.by_property("source").equal(canonical),
+                return_properties=["aliases"],
+                limit=1000,
+            ),
+            breaker=WEAVIATE_BREAKER,
+        )
+        for obj in res.objects:
+            aliases = list(obj.properties.get("aliases") or [])
+            if alias not in aliases:
+                _set_aliases(figures, obj.uuid, aliases + [alias])
+    dedup.add_alias(None, canonical, alias)
 
 # ----------------- Captioning with retries -----------------
 def _describe_image_with_gpt4o(image_b64_png: str) -> str:
     """
     Caption an image with retries & exponential backoff to handle 429.
     """
-    attempt = 0
-    while True:
-        try:
-            resp = openai.chat.completions.create(
-                model=VISION_MODEL,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text":
-                            "Describe this figure/diagram for search in 1–3 sentences. "
-                            "Mention axes, labels, units, variables, and what it demonstrates. "
-                            "Be specific and concise."
-                         },
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64_png}"}}
-                    ]
-                }],
-                temperature=0
-            )
-            return (resp.choices[0].message.content or "").strip()
-
-        except RateLimitError as e:
-            attempt += 1
-            if attempt > MAX_RETRIES:
-                raise
-            # Respect Retry-After if present; otherwise exponential backoff with jitter
-            retry_after = getattr(e, "response", None)
-            delay = None
-            if retry_after and hasattr(retry_after, "headers"):
-                ra = retry_after.headers.get("Retry-After")
-                if ra:
-                    try:
-                        delay = float(ra)
-                    except Exception:
-                        delay = None
-            if delay is None:
-                delay = BACKOFF_BASE * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
-            time.sleep(delay)
-
-        except APIError:
-            # transient server errors: retry a few times
-            attempt += 1
-            if attempt > MAX_RETRIES:
-                raise
-            delay = BACKOFF_BASE * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
-            time.sleep(delay)
+    resp = call_with_retry(
+        lambda: openai.chat.completions.create(
+            model=VISION_MODEL,
+            messages=[{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text":
+                        "Describe this figure/diagram for search in 1–3 sentences. "
+                        "Mention axes, labels, units, variables, and what it demonstrates. "
+                        "Be specific and concise."
+                     },
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64_png}"}}
+                ]
+            }],
+            temperature=0
+        ),
+        breaker=OPENAI_BREAKER,
+        max_retries=MAX_RETRIES,
+        backoff_base=BACKOFF_BASE,
+    )
+    return (resp.choices[0].message.content or "").strip()
 
 # ----------------- Image extraction & saving -----------------
-def _save_image_png(im: Image.Image, out_name: str) -> str:
-    """
-    Save PIL image to STATIC_FIG_DIR as PNG and return the relative web path (/static/figures/filename.png)
-    """
-    out_path = os.path.join(STATIC_FIG_DIR, out_name)
-    im.save(out_path, format="PNG")
-    # web path your FastAPI will serve
-    return f"/static/figures/{out_name}"
-
 def _extract_images_with_pymupdf(pdf_path: str) -> Iterable[Tuple[int, Image.Image]]:
     """
     Yields (page_number_1_based, PIL_Image). Skips if PyMuPDF unavailable.
@@ -166,10 +273,14 @@ def _extract_images_with_pymupdf(pdf_path: str) -> Iterable[Tuple[int, Image.Ima
     if not HAS_PYMUPDF:
         return
 
-    doc = fitz.open(pdf_path)
+    # MuPDF calls go through the extractors' lock: parallel ingest workers share the process
+    with NATIVE_PDF_LOCK:
+        doc = fitz.open(pdf_path)
+        page_count = doc.page_count
     try:
-        for pno, page in enumerate(doc, start=1):
-            imgs = page.get_images(full=True)
+        for pno in range(1, page_count + 1):
+            with NATIVE_PDF_LOCK:
+                imgs = doc[pno - 1].get_images(full=True)
             if not imgs:
                 continue
 
@@ -179,7 +290,8 @@ def _extract_images_with_pymupdf(pdf_path: str) -> Iterable[Tuple[int, Image.Ima
                     break
                 xref = img[0]
                 try:
-                    img_dict = doc.extract_image(xref)
+                    with NATIVE_PDF_LOCK:
+                        img_dict = doc.extract_image(xref)
                     raw = img_dict.get("image")
                     if not raw:
                         continue
@@ -197,31 +309,166 @@ def _extract_images_with_pymupdf(pdf_path: str) -> Iterable[Tuple[int, Image.Ima
                 except Exception:
                     continue
     finally:
-        doc.close()
+        with NATIVE_PDF_LOCK:
+            doc.close()
+
+def _count_figures(pdf_path: str) -> int:
+    """
+    Number of images _extract_images_with_pymupdf will yield at most (the caption backlog).
+    """
+    if not HAS_PYMUPDF:
+        return 0
+    with NATIVE_PDF_LOCK, fitz.open(pdf_path) as doc:
+        return sum(min(len(page.get_images(full=True)), MAX_CAPTIONS_PER_PAGE) for page in doc)
 
 # ----------------- Main API -----------------
-def embed_and_store(pdf_path: str):
+def embed_and_store(pdf_path: str, journal: IngestJournal = None, page_filter: PageFilter = None,
+                    dedup: DedupIndex = None, tenant: str = None, progress: IngestProgress = None,
+                    batcher: IngestBatcher = None):
+    """
+    Index one PDF. With a journal, pages/chunks/figures already recorded are skipped,
+    so a crashed run picks up exactly where it stopped. Pass the same `page_filter` and
+    `dedup` for every file of a run so duplicates are detected across documents.
+    With multi-tenancy, `tenant` is the course the PDF is stored under; `progress`
+    collects the rates, stage timings and errors of the whole run. All of these can be
+    shared by parallel workers, as can `batcher` (see load_documents.py).
+    """
     filename = os.path.basename(pdf_path)
-    collection = client.collections.get("LectureChunk")
+    collection = get_collection(CHUNK_COLLECTION, tenant)
+    figures = get_collection(FIGURE_COLLECTION, tenant)
+    if dedup is None:
+        dedup = DedupIndex(enabled=False)
+    if progress is None:
+        progress = IngestProgress(enabled=False)
+    if page_filter is None:
+        page_filter = PageFilter(dedupe_pages=not dedup.enabled, log=progress.write)
+    if batcher is None:
+        batcher = IngestBatcher(progress, enabled=False)
+    if journal is not None:
+        journal.begin_file(pdf_path)
 
     # ---- Text pages
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_number, page in enumerate(pdf.pages, start=1):
-            page_text = page.extract_text() or ""
-            # Optional light math normalization for nicer display/retrieval
-            page_text = format_equations_for_mathjax(page_text)
-
-            for chunk in chunk_text(page_text):
-                _embed_and_insert(collection, chunk, filename, page_number)
+    # Extracted up front: header/footer detection needs every page of the document.
+    # Long documents are spooled to a temp file, so they are held one page at a time.
+    table_budget = TableBudget()
+    with progress.stage("extract"), PdfPages(pdf_path, table_budget=table_budget) as pages:
+        progress.begin_file(filename, len(pages))
+        doc_pages = spool_pages(pages)
+
+    # A copy of an already indexed PDF (e.g. "... (1).pdf") only becomes an alias, and only
+    # of a canonical that was indexed completely; otherwise the copy is stored itself
+    if dedup.enabled:
+        match = dedup.claim_document(filename, document_signature(doc_pages.texts()))
+        if match is not None and (journal is None or journal.source_done(match[0])):
+            canonical, score = match
+            _alias_document(collection, figures, dedup, canonical, filename)
+            progress.write(f"⏭️  {filename} duplicates {canonical} ({score:.2f}); stored as an alias")
+            progress.add(pages=len(doc_pages))
+            progress.end_file(filename, alias_of=canonical)
+            doc_pages.close()
+            if journal is not None:
+                journal.mark_file(pdf_path)
+            return
+        if match is not None:
+            progress.write(f"⚠️  {filename} duplicates {match[0]}, which is not fully indexed; storing it")
+    failed = True
+    try:
+        _store_document(pdf_path, doc_pages, collection, figures, journal, page_filter, dedup, progress,
+                        batcher, table_budget)
+        failed = False
+    finally:
+        # Lets a parallel worker holding a copy of this PDF go on: alias it, or, if this one
+        # failed, index the copy itself
+        dedup.release_document(filename, failed=failed)
+        page_filter.end_document(filename)
+        doc_pages.close()
+
+def _store_document(pdf_path: str, doc_pages, collection, figures, journal: IngestJournal,
+                    page_filter: PageFilter, dedup: DedupIndex, progress: IngestProgress,
+                    batcher: IngestBatcher, table_budget: TableBudget):
+    """
+    Chunks, embeddings and figures of one extracted PDF (the body of embed_and_store).
+    """
+    filename = os.path.basename(pdf_path)
+    page_filter.begin_document(filename, doc_pages.texts())
+    # tags / language for metadata-filtered search
+    doc_props = document_properties(filename, doc_pages.texts())
+
+    for page in doc_pages:
+        page_number, page_text = page.number, page.text
+        if journal is not None and journal.page_done(filename, page_number):
+            page_filter.register(filename, page_number, page_text)
+            progress.add(pages=1)
+            continue
+
+        page_text = page_filter.filter(filename, page_number, page_text, has_tables=bool(page.tables))
+        if page_text is None:
+            if journal is not None:
+                journal.mark_page(filename, page_number)
+            progress.add(pages=1)
+            continue
+
+        # Word-offset keys for text windows, "table-N" keys for table chunks
+        units = list(iter_chunks(page_text))
+        units += [(f"table-{i}", f"[Table]\n{md}") for i, md in enumerate(page.tables)]
+        pending = []
+        for offset, chunk in units:
+            if journal is not None and journal.chunk_done(filename, page_number, offset):
+                continue
+            sig = text_signature(chunk) if dedup.enabled else ()
+            canonical = dedup.find_chunk(filename, sig)
+            if canonical is not None:
+                # Same text already stored from another PDF
+                _record_alias(collection, dedup, canonical, filename)
+                if journal is not None:
+                    journal.mark_chunk(filename, page_number, offset, canonical)
+                continue
+            pending.append((offset, chunk, sig))
+
+        # At most EMBED_BATCH_SIZE chunks (and their vectors) in flight, even on table-heavy pages
+        for start in range(0, len(pending), EMBED_BATCH_SIZE):
+            group = pending[start:start + EMBED_BATCH_SIZE]
+            with progress.stage("embed"):
+                vectors = batcher.embed([chunk for _, chunk, _ in group])
+            objects = [
+                DataObject(
+                    properties={"text": chunk, "source": filename, "page": page_number, **doc_props},  # page 1-based
+                    uuid=object_uuid(filename, page_number, offset, chunk),
+                    vector=vec,
+                )
+                for (offset, chunk, _), vec in zip(group, vectors)
+            ]
+            with progress.stage("upsert"):
+                batcher.upsert(collection, objects)
+            for (offset, _, sig), obj in zip(group, objects):
+                dedup.add_chunk(str(obj.uuid), filename, page_number, sig)
+                if journal is not None:
+                    journal.mark_chunk(filename, page_number, offset, str(obj.uuid))
+
+        if journal is not None:
+            journal.mark_page(filename, page_number)
+        progress.add(pages=1, chunks=len(pending))
+
+    if table_budget.pages or table_budget.skipped_pages:
+        progress.write(f"📊 {filename}: {table_budget.summary()}")
 
     # ---- Images: save + (optional) caption + index
     if HAS_PYMUPDF:
+        fig_index, last_page = 0, None
+        # Captions are the slow part; the queue is what's left of this file's figures
+        queued = _count_figures(pdf_path) if ENABLE_IMAGE_CAPTIONS else 0
         for page_number, pil_img in _extract_images_with_pymupdf(pdf_path):
+            fig_index = fig_index + 1 if page_number == last_page else 0
+            last_page = page_number
+            queued = max(0, queued - 1)
+            progress.set_caption_queue(queued)
+            if journal is not None and journal.figure_done(filename, page_number, fig_index):
+                continue
             try:
-                # Save PNG to /static/figures and get a web path we can render in the UI
+                # Save PNG (+ responsive sizes) to /static/figures under a content-hashed name
                 base = os.path.splitext(filename)[0]
-                out_name = f"{base}_p{page_number}.png"
-                image_web_path = _save_image_png(pil_img, out_name)
+                with progress.stage("figure"):
+                    image_web_path = save_figure(pil_img, f"{base}_p{page_number}")
 
                 if ENABLE_IMAGE_CAPTIONS:
                     # Smooth out bursts
@@ -232,47 +479,32 @@ def embed_and_store(pdf_path: str):
                     pil_img.save(buf, format="PNG")
                     image_b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
 
-                    caption = _describe_image_with_gpt4o(image_b64) or "Figure/diagram"
-                    # Store as a normal embedded record (so retrieval can find it semantically)
-                    _embed_and_insert(
-                        collection=collection,
-                        text=f"[Figure] {caption}",
-                        source=filename,
-                        page_number=page_number
-                    )
-                    # Also attach a metadata-only row so you can render the image directly
-                    _insert_metadata_only(collection, {
-                        "text": "[Figure] image",
-                        "source": filename,
-                        "page": page_number,
-                        "imagePath": image_web_path,
-                    })
+                    with progress.stage("caption"):
+                        caption = _describe_image_with_gpt4o(image_b64) or "Figure/diagram"
                 else:
-                    # No caption → insert metadata-only object that still points to the image file
-                    _insert_metadata_only(collection, {
-                        "text": "[Figure]",
-                        "source": filename,
-                        "page": page_number,
-                        "imagePath": image_web_path,
-                    })
+                    # No caption → vectorless object that still points to the image file
+                    caption = ""
+
+                with progress.stage("figure_upsert"):
+                    _insert_figure(
+                        figures, caption, filename, page_number, image_web_path,
+                        uuid=object_uuid(filename, page_number, f"figure-{fig_index}"),
+                        doc_props=doc_props, batcher=batcher,
+                    )
+                progress.add(figures=1, captions=1 if caption else 0)
+
+                if journal is not None:
+                    journal.mark_figure(filename, page_number, fig_index)
 
             except RateLimitError as e:
-                print(f"⚠️  Skipped an image on page {page_number}: {e}")
+                progress.write(f"⚠️  Skipped an image on page {page_number}: {e}")
             except Exception as e:
-                print(f"⚠️  Skipped an image on page {page_number}: {e}")
-
-    print(f"✅ Finished indexing: {filename}")
-
-def load_all_pdfs():
-    if not os.path.exists(PDF_FOLDER):
-        print(f"❌ Folder not found: {PDF_FOLDER}")
-        return
-
-    init_schema()
-
-    for file in os.listdir(PDF_FOLDER):
-        if file.lower().endswith(".pdf"):
-            pdf_path = os.path.join(PDF_FOLDER, file)
-            embed_and_store(pdf_path)
-
-    client.close()
+                progress.write(f"⚠️  Skipped an image on page {page_number}: {e}")
+            finally:
+                pil_img.close()
+        progress.set_caption_queue(0)
+
+    if journal is not None:
+        journal.mark_file(pdf_path)
+    progress.end_file(filename, pages=len(doc_pages), spooled=doc_pages.on_disk)
+    progress.write(f"✅ Finished indexing: {filename}")
@@ -0,0 +1,218 @@
+import os
+import threading
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+import pdfplumber
+
+from app.services.tables import EXTRACT_TABLES, TableBudget, extract_tables
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except Exception:
+    HAS_PYMUPDF = False
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+    HAS_PDFIUM = True
+except Exception:
+    HAS_PDFIUM = False
+
+# ----------------- Configuration -----------------
+# auto: fast text-layer extractor per page, pdfplumber only for table-heavy pages
+# pymupdf | pdfium | pdfplumber: force one extractor for every page
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "auto").lower()
+# A page with at least this many ruling lines (both directions present) counts as a table page
+TABLE_RULE_THRESHOLD = int(os.getenv("TABLE_RULE_THRESHOLD", "8"))
+# Drop the backends' document-level object caches every N pages so memory stays flat
+# on long documents (0 = never)
+PDF_FLUSH_EVERY = int(os.getenv("PDF_FLUSH_EVERY", "25"))
+_RULE_WIDTH = 2.0   # pt; thinner than this is a line, not a box
+# PyMuPDF and pdfium are not thread-safe, even on different documents: parallel ingest
+# workers take this lock for every call into them (pdfplumber is pure Python)
+NATIVE_PDF_LOCK = threading.RLock()
+
+
+class PageText(NamedTuple):
+    number: int          # 1-based
+    text: str
+    extractor: str       # which backend produced `text`
+    table_heavy: bool
+    tables: Tuple[str, ...] = ()   # Markdown chunks; their cells are not repeated in `text`
+
+
+def _is_table_heavy(boxes) -> bool:
+    """
+    `boxes` are (x0, y0, x1, y1) of vector paths; tables show up as many thin rules.
+    """
+    horizontal = vertical = 0
+    for x0, y0, x1, y1 in boxes:
+        w, h = abs(x1 - x0), abs(y1 - y0)
+        if h < _RULE_WIDTH and w > 3 * _RULE_WIDTH:
+            horizontal += 1
+        elif w < _RULE_WIDTH and h > 3 * _RULE_WIDTH:
+            vertical += 1
+    return horizontal + vertical >= TABLE_RULE_THRESHOLD and horizontal >= 2 and vertical >= 2
+
+
+def default_fast_backend() -> Optional[str]:
+    if HAS_PYMUPDF:
+        return "pymupdf"
+    if HAS_PDFIUM:
+        return "pdfium"
+    return None
+
+
+class PdfPages:
+    """
+    Page-by-page text extraction with pluggable backends.
+
+        with PdfPages(path) as pages:
+            for page in pages:
+                page.number, page.text, page.extractor
+
+    In "auto" mode each page is read with the fast backend (PyMuPDF, else pdfium); pages
+    that look like ruled tables are re-read with pdfplumber, whose layout handling is
+    better for tables. pdfplumber is only opened if such a page turns up.
+
+    With `extract_tables`, table pages additionally go through pdfplumber's table finder
+    (bounded by `table_budget`) and come back as Markdown in `PageText.tables`.
+
+    Pages are released as soon as they are read and backend caches are flushed every
+    PDF_FLUSH_EVERY pages, so iterating a long document doesn't grow memory.
+    """
+
+    def __init__(self, pdf_path: str, mode: str = PDF_EXTRACTOR, extract_tables: bool = EXTRACT_TABLES,
+                 table_budget: Optional[TableBudget] = None):
+        self.pdf_path = pdf_path
+        self.mode = mode
+        self.extract_tables = extract_tables
+        self.table_budget = table_budget if table_budget is not None else TableBudget()
+        self.fast = default_fast_backend() if mode == "auto" else mode
+        if self.fast not in ("pymupdf", "pdfium", "pdfplumber", None):
+            raise ValueError(f"Unknown PDF_EXTRACTOR: {mode}")
+        if self.fast == "pymupdf" and not HAS_PYMUPDF or self.fast == "pdfium" and not HAS_PDFIUM:
+            raise RuntimeError(f"PDF_EXTRACTOR={mode} but that library is not installed")
+        self.fast = self.fast or "pdfplumber"
+        self._fitz = None
+        self._pdfium = None
+        self._plumber = None
+
+    # ---- lifecycle
+    def __enter__(self):
+        with NATIVE_PDF_LOCK:
+            if self.fast == "pymupdf":
+                self._fitz = fitz.open(self.pdf_path)
+            elif self.fast == "pdfium":
+                self._pdfium = pdfium.PdfDocument(self.pdf_path)
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with NATIVE_PDF_LOCK:
+            for doc in (self._fitz, self._pdfium, self._plumber):
+                if doc is not None:
+                    doc.close()
+        self._fitz = self._pdfium = self._plumber = None
+
+    def flush(self):
+        """
+        Release what the backends cache across pages: MuPDF's resource store and
+        pdfminer's parsed-object caches. Everything is re-read on demand.
+        """
+        if self._fitz is not None:
+            with NATIVE_PDF_LOCK:
+                fitz.TOOLS.store_shrink(100)
+        if self._plumber is not None:
+            self._plumber.flush_cache()
+            doc = self._plumber.doc
+            for cache in (getattr(doc, "_cached_objs", None), getattr(doc, "_parsed_objs", None)):
+                if cache:
+                    cache.clear()
+
+    def __len__(self) -> int:
+        with NATIVE_PDF_LOCK:
+            if self._fitz is not None:
+                return self._fitz.page_count
+            if self._pdfium is not None:
+                return len(self._pdfium)
+        return len(self.plumber().pages)
+
+    def plumber(self):
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.pdf_path)
+        return self._plumber
+
+    # ---- backends
+    def _pymupdf_page(self, index: int):
+        page = self._fitz[index]
+        text = page.get_text("text", sort=True)
+        boxes = []
+        for drawing in page.get_drawings():
+            for item in drawing["items"]:
+                if item[0] == "l":
+                    boxes.append((item[1].x, item[1].y, item[2].x, item[2].y))
+                elif item[0] == "re":
+                    boxes.append(tuple(item[1]))
+        return text, boxes
+
+    def _pdfium_page(self, index: int):
+        page = self._pdfium[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_bounded()
+            finally:
+                textpage.close()
+            boxes = []
+            for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH]):
+                left, bottom, right, top = obj.get_pos()
+                boxes.append((left, bottom, right, top))
+        finally:
+            page.close()
+        return text, boxes
+
+    def _plumber_boxes(self, index: int):
+        page = self.plumber().pages[index]
+        return [(obj["x0"], obj["top"], obj["x1"], obj["bottom"]) for obj in (*page.lines, *page.rects)]
+
+    def _plumber_text(self, index: int) -> str:
+        return self.plumber().pages[index].extract_text() or ""
+
+    def page(self, index: int) -> PageText:
+        try:
+            return self._read(index)
+        finally:
+            # pdfplumber keeps every page's objects and layout until the page is closed
+            if self._plumber is not None:
+                self._plumber.pages[index].close()
+
+    def _read(self, index: int) -> PageText:
+        if self.fast == "pdfplumber":
+            text, boxes = None, self._plumber_boxes(index)
+        else:
+            with NATIVE_PDF_LOCK:
+                text, boxes = self._pymupdf_page(index) if self.fast == "pymupdf" else self._pdfium_page(index)
+        table_heavy = _is_table_heavy(boxes)
+        if table_heavy and self.extract_tables:
+            try:
+                found = extract_tables(self.plumber().pages[index], self.table_budget)
+            except Exception as e:
+                # A malformed table shouldn't cost the page: keep its plain text
+                print(f"⚠️ Table extraction failed on {os.path.basename(self.pdf_path)} p{index + 1}: {e}")
+                found = None
+            if found is not None:
+                rest, tables = found
+                return PageText(index + 1, rest, "pdfplumber", True, tuple(tables))
+        if text is None or table_heavy and self.mode == "auto":
+            return PageText(index + 1, self._plumber_text(index), "pdfplumber", table_heavy)
+        return PageText(index + 1, text, self.fast, table_heavy)
+
+    def __iter__(self) -> Iterator[PageText]:
+        for index in range(len(self)):
+            yield self.page(index)
+            if PDF_FLUSH_EVERY and (index + 1) % PDF_FLUSH_EVERY == 0:
+                self.flush()
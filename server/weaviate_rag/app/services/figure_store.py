@@ -0,0 +1,135 @@
+import os
+import io
+import re
+import hashlib
+import struct
+from functools import lru_cache
+from typing import List, Tuple
+
+# Figures are written once, under content-hashed names, so their URLs never change meaning:
+#   static/figures/<pdf>_p<page>.<hash>.png          full size (<= 1600 px, see embedder)
+#   static/figures/<pdf>_p<page>.<hash>.w<width>.png  responsive sizes / thumbnail
+# Hashed files are served with a far-future, immutable Cache-Control (see CachedStaticFiles).
+
+# ----------------- Configuration -----------------
+STATIC_FIG_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "static", "figures")
+)
+FIGURE_WEB_PREFIX = "/static/figures/"
+# Widths generated at ingestion, smallest = thumbnail; only widths below the original are written
+FIGURE_WIDTHS = [int(w) for w in os.getenv("FIGURE_WIDTHS", "320,640,1024").split(",") if w.strip()]
+# Figures are shown at most this wide in the chat UI (the `sizes` attribute of the <img>)
+FIGURE_DISPLAY_WIDTH = int(os.getenv("FIGURE_DISPLAY_WIDTH", "720"))
+STATIC_MAX_AGE_SEC = int(os.getenv("STATIC_MAX_AGE_SEC", "3600"))        # non-hashed files
+IMMUTABLE_MAX_AGE_SEC = 365 * 24 * 3600
+
+_HASHED_RE = re.compile(r"\.[0-9a-f]{12}(?:\.w\d+)?\.png$")
+_VARIANT_RE = re.compile(r"\.w(\d+)\.png$")
+
+
+def is_immutable(path: str) -> bool:
+    """
+    True for content-hashed figure files (their bytes can never change under that name).
+    """
+    return bool(_HASHED_RE.search(path))
+
+
+def cache_control(path: str) -> str:
+    if is_immutable(path):
+        return f"public, max-age={IMMUTABLE_MAX_AGE_SEC}, immutable"
+    # Legacy names may be overwritten by a re-ingest: cache briefly, then revalidate via ETag
+    return f"public, max-age={STATIC_MAX_AGE_SEC}"
+
+
+def save_figure(im, stem: str) -> str:
+    """
+    Write `im` (PIL image) as <stem>.<hash>.png plus its smaller widths; returns the web path
+    of the full-size file. Re-ingesting an unchanged figure rewrites nothing.
+    """
+    from PIL import Image
+
+    buf = io.BytesIO()
+    im.save(buf, format="PNG", optimize=True)
+    data = buf.getvalue()
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.png"
+    path = os.path.join(STATIC_FIG_DIR, name)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+
+    for width in FIGURE_WIDTHS:
+        if width >= im.size[0]:
+            continue
+        variant = os.path.join(STATIC_FIG_DIR, f"{name[:-4]}.w{width}.png")
+        if os.path.exists(variant):
+            continue
+        height = max(1, round(im.size[1] * width / im.size[0]))
+        out = io.BytesIO()
+        im.resize((width, height), Image.LANCZOS).save(out, format="PNG", optimize=True)
+        _write_atomic(variant, out.getvalue())
+    return f"{FIGURE_WEB_PREFIX}{name}"
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _png_width(path: str) -> int:
+    # IHDR is always the first chunk: width is the big-endian uint32 at byte 16
+    with open(path, "rb") as fh:
+        header = fh.read(24)
+    return struct.unpack(">I", header[16:20])[0]
+
+
+@lru_cache(maxsize=4096)
+def _variants(name: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    ((file name, width), ...) for a hashed figure, smallest first, full size last.
+    Hashed files are immutable, so the lookup is cached for the process lifetime.
+    """
+    full = os.path.join(STATIC_FIG_DIR, name)
+    if not os.path.exists(full):
+        return ()
+    out = []
+    for width in sorted(FIGURE_WIDTHS):
+        variant = f"{name[:-4]}.w{width}.png"
+        if os.path.exists(os.path.join(STATIC_FIG_DIR, variant)):
+            out.append((variant, width))
+    out.append((name, _png_width(full)))
+    return tuple(out)
+
+
+def responsive(web_path: str) -> List[Tuple[str, int]]:
+    """
+    [(web path, width)] of every stored size of a figure; [] for legacy (non-hashed) paths.
+    """
+    name = os.path.basename(web_path)
+    if not web_path.startswith(FIGURE_WEB_PREFIX) or not is_immutable(name) or _VARIANT_RE.search(name):
+        return []
+    return [(f"{FIGURE_WEB_PREFIX}{n}", w) for n, w in _variants(name)]
+
+
+_page_index = {"mtime": None, "names": {}}
+
+
+def page_figures(stem: str) -> List[str]:
+    """
+    Full-size web paths stored for "<pdf>_p<page>" (hashed or legacy name), for the
+    file-name fallback when Weaviate returned no figure rows. The directory listing is
+    re-read only when the folder changes.
+    """
+    try:
+        mtime = os.path.getmtime(STATIC_FIG_DIR)
+    except OSError:
+        return []
+    if _page_index["mtime"] != mtime:
+        names = {}
+        for name in sorted(os.listdir(STATIC_FIG_DIR)):
+            if not name.endswith(".png") or _VARIANT_RE.search(name):
+                continue
+            key = _HASHED_RE.sub("", name) if is_immutable(name) else name[:-4]
+            names.setdefault(key, []).append(name)
+        _page_index.update(mtime=mtime, names=names)
+    return [f"{FIGURE_WEB_PREFIX}{n}" for n in _page_index["names"].get(stem, [])]
@@ -0,0 +1,55 @@
+from typing import List, Optional, Sequence, Tuple
+
+from weaviate.classes.query import Filter
+
+
+def check_page_ranges(pages: Optional[Sequence[Tuple[int, int]]]):
+    """
+    `pages` unchanged if every range is (first, last) with 1 <= first <= last; ValueError
+    otherwise, since an inverted or non-positive range silently matches nothing.
+    """
+    for first, last in pages or ():
+        if not 1 <= first <= last:
+            raise ValueError(f"page range [{first}, {last}] must satisfy 1 <= first <= last")
+    return pages
+
+
+def build_filters(
+    sources: Optional[Sequence[str]] = None,
+    pages: Optional[Sequence[Tuple[int, int]]] = None,
+    tags: Optional[Sequence[str]] = None,
+    language: Optional[str] = None,
+):
+    """
+    Weaviate filter for a scoped search, or None for the whole collection.
+
+    sources  PDF file names; a document also matches through `aliases` (see dedup)
+    pages    inclusive (first, last) ranges of 1-based page numbers, any of which may match
+    tags     matches objects carrying any of the tags
+    language "de" / "en"
+    """
+    parts: List = []
+    if sources:
+        sources = list(sources)
+        parts.append(Filter.any_of([
+            Filter.by_property("source").contains_any(sources),
+            Filter.by_property("aliases").contains_any(sources),
+        ]))
+    if pages:
+        check_page_ranges(pages)
+        ranges = [
+            Filter.all_of([
+                Filter.by_property("page").greater_or_equal(first),
+                Filter.by_property("page").less_or_equal(last),
+            ])
+            for first, last in pages
+        ]
+        parts.append(ranges[0] if len(ranges) == 1 else Filter.any_of(ranges))
+    if tags:
+        parts.append(Filter.by_property("tags").contains_any(list(tags)))
+    if language:
+        parts.append(Filter.by_property("language").equal(language))
+
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else Filter.all_of(parts)
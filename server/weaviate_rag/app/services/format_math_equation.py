@@ -1,26 +1,94 @@
 import re
 
+# ----------------- Symbol tables -----------------
+_SYMBOLS = {
+    "∂": "\\partial", "∇": "\\nabla", "∑": "\\sum", "∫": "\\int", "∮": "\\oint",
+    "∏": "\\prod", "√": "\\sqrt", "∞": "\\infty", "≈": "\\approx", "≠": "\\neq",
+    "≤": "\\leq", "≥": "\\geq", "±": "\\pm", "∓": "\\mp", "×": "\\times",
+    "·": "\\cdot", "⋅": "\\cdot", "→": "\\rightarrow", "⇒": "\\Rightarrow",
+    "∈": "\\in", "∝": "\\propto", "∼": "\\sim", "≡": "\\equiv",
+    # Greek
+    "α": "\\alpha", "β": "\\beta", "γ": "\\gamma", "δ": "\\delta", "ε": "\\varepsilon",
+    "ϵ": "\\epsilon", "ζ": "\\zeta", "η": "\\eta", "θ": "\\theta", "ϑ": "\\vartheta",
+    "ι": "\\iota", "κ": "\\kappa", "λ": "\\lambda", "μ": "\\mu", "ν": "\\nu",
+    "ξ": "\\xi", "π": "\\pi", "ρ": "\\rho", "σ": "\\sigma", "ς": "\\varsigma",
+    "τ": "\\tau", "υ": "\\upsilon", "φ": "\\phi", "ϕ": "\\phi", "χ": "\\chi",
+    "ψ": "\\psi", "ω": "\\omega",
+    "Γ": "\\Gamma", "Δ": "\\Delta", "Θ": "\\Theta", "Λ": "\\Lambda", "Ξ": "\\Xi",
+    "Π": "\\Pi", "Σ": "\\Sigma", "Υ": "\\Upsilon", "Φ": "\\Phi", "Ψ": "\\Psi",
+    "Ω": "\\Omega",
+}
+_SUPERSCRIPTS = dict(zip("⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻⁼⁽⁾ⁿⁱ", "0123456789+-=()ni"))
+_SUBSCRIPTS = dict(zip("₀₁₂₃₄₅₆₇₈₉₊₋₌₍₎ₐₑₒₓₕₖₗₘₙₚₛₜ", "0123456789+-=()aeoxhklmnpst"))
+
+# ----------------- Compiled once at import -----------------
+# Line level: every line is consumed by exactly one alternative, so the whole page
+# is walked once.
+#   fence – ``` ... ``` blocks, left untouched
+#   code  – OpenFOAM dictionary / C++ lines (ends in ";", #include, comments, braces)
+#   eq    – any other line containing "=", translated and wrapped in $$...$$
+#   line  – everything else, translated
+_LINE_RE = re.compile(
+    r"^(?:(?P<fence>```.*?^```[^\n]*)"
+    r"|(?P<code>[ \t]*(?:#include|#inputMode|#calc|//|/\*|\*/|FoamFile\b|[{}][ \t]*$)[^\n]*"
+    r"|[^\n]*;[ \t]*(?://[^\n]*)?)"
+    r"|(?P<eq>[^\n=]*=[^\n]*)"
+    r"|(?P<line>[^\n]+))$",
+    re.M | re.S,
+)
+
+_SUP_CHARS = "".join(_SUPERSCRIPTS)
+_SUB_CHARS = "".join(_SUBSCRIPTS)
+_SYM_CHARS = "".join(_SYMBOLS)
+# Inline tokens. The pattern starts with one character class holding every trigger
+# character, which lets the regex engine skip plain text at C speed; the branches then
+# look behind at the character just consumed to decide what it started.
+_INLINE_RE = re.compile(
+    r"[(^*" + _SUP_CHARS + _SUB_CHARS + _SYM_CHARS + r"](?:"
+    # (∂T/∂x) -> \left(\frac{\partial T}{\partial x}\right)
+    r"(?<=\()\s*∂\s*(?P<num>\w+)\s*/\s*∂\s*(?P<den>\w+)\s*\)(?P<frac>)"
+    # x^20 -> x^{20} (the whole exponent, not just its first digit)
+    r"|(?<=\^)(?P<exp>\d+)"
+    # a*b -> a \cdot b; bullets and **bold** are not operands
+    r"|(?:(?<=[\w)\]]\*)|(?<=[\w)\]][ \t]\*))(?!\*)(?=[ \t]?[\w(\[])(?P<mul>)"
+    r"|(?<=[" + _SUP_CHARS + r"])[" + _SUP_CHARS + r"]*(?P<sup>)"
+    r"|(?<=[" + _SUB_CHARS + r"])[" + _SUB_CHARS + r"]*(?P<sub>)"
+    r"|(?<=[" + _SYM_CHARS + r"])(?P<sym>)"
+    r")"
+)
+
+
+def _inline(m: re.Match) -> str:
+    g = m.lastgroup
+    if g == "sym":
+        latex = _SYMBOLS[m.group(0)]
+        # keep "αx" from turning into the unknown command "\alphax"
+        nxt = m.string[m.end():m.end() + 1]
+        return latex + " " if nxt.isascii() and nxt.isalpha() else latex
+    if g == "exp":
+        return "^{" + m.group("exp") + "}"
+    if g == "mul":
+        return " \\cdot "
+    if g == "frac":
+        return f"\\left(\\frac{{\\partial {m.group('num')}}}{{\\partial {m.group('den')}}}\\right)"
+    if g == "sup":
+        return "^{" + "".join(_SUPERSCRIPTS[c] for c in m.group(0)) + "}"
+    return "_{" + "".join(_SUBSCRIPTS[c] for c in m.group(0)) + "}"
+
+
+def _translate(m: re.Match) -> str:
+    g = m.lastgroup
+    if g == "eq":
+        return "$$" + _INLINE_RE.sub(_inline, m.group("eq")) + "$$"
+    if g == "line":
+        return _INLINE_RE.sub(_inline, m.group("line"))
+    return m.group(0)
+
+
 def format_equations_for_mathjax(text: str) -> str:
-    # Replace common math patterns with LaTeX
-    replacements = {
-        "∂": "\\partial",
-        "Δ": "\\Delta",
-        "*": " \\cdot ",
-        "^2": "^{2}",
-        "^3": "^{3}",
-    }
-
-    for ascii_symbol, latex_symbol in replacements.items():
-        text = text.replace(ascii_symbol, latex_symbol)
-
-    # Wrap full equations that are on their own lines with $$...$$
-    text = re.sub(r"(?m)^([^\n=]*=[^\n]*)$", r"$$\1$$", text)
-
-    # Optional: convert inline fractions like (∂T/∂x)
-    text = re.sub(
-        r"\(\s*\\?partial\s*T\s*/\s*\\?partial\s*x\s*\)",
-        r"\\left(\\frac{\\partial T}{\\partial x}\\right)",
-        text,
-    )
-
-    return text
+    """
+    Translate PDF math text to MathJax-friendly LaTeX in a single walk over the page:
+    Unicode symbols/Greek/sub- and superscripts become LaTeX, lines with "=" are wrapped
+    in $$...$$, and code (``` fences, OpenFOAM dictionary / C++ lines) is left as-is.
+    """
+    return _LINE_RE.sub(_translate, text)
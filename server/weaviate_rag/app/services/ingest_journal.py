@@ -0,0 +1,156 @@
+import os
+import glob
+import json
+import threading
+from typing import Dict, List, Set, Tuple
+
+# Append-only JSON-lines log of ingestion progress, one record per finished unit:
+#   {"event": "chunk",  "source": ..., "page": 3, "chunk": <word offset | "table-N">, "uuid": ...}
+#   {"event": "page",   "source": ..., "page": 3}
+#   {"event": "figure", "source": ..., "page": 3, "index": 0}
+#   {"event": "start",  "source": ..., "size": ..., "mtime": ...}
+#   {"event": "file",   "source": ...}
+# Every write is fsync'ed so a crash loses at most the record being written.
+INGEST_JOURNAL_PATH = os.getenv(
+    "INGEST_JOURNAL_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "ingest_journal.jsonl")),
+)
+
+
+def tenant_path(path: str, tenant: str = "") -> str:
+    """
+    Per-tenant variant of a state file: ingest_journal.jsonl -> ingest_journal.cfd.jsonl.
+    """
+    if not tenant:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}.{tenant}{ext}"
+
+
+def tenant_paths(path: str) -> List[str]:
+    """
+    Every existing variant of a state file: the default one and each tenant's.
+    """
+    base, ext = os.path.splitext(path)
+    found = glob.glob(f"{glob.escape(base)}.*{ext}")
+    return sorted(([path] if os.path.exists(path) else []) + found)
+
+
+def _file_signature(pdf_path: str) -> Tuple[int, int]:
+    st = os.stat(pdf_path)
+    return st.st_size, int(st.st_mtime)
+
+
+class IngestJournal:
+    """
+    Durable per-file / per-page / per-chunk progress so a crashed ingest resumes where it stopped.
+    Shared by parallel ingest workers: the in-memory sets and the file are only changed under
+    one lock.
+    """
+
+    def __init__(self, path: str = INGEST_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._files: Set[str] = set()
+        self._pages: Set[Tuple[str, int]] = set()
+        self._figures: Set[Tuple[str, int, int]] = set()
+        self._chunks: Set[Tuple[str, int, object]] = set()
+        self._load()
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line from a crash mid-write
+                    continue
+                event, source = rec.get("event"), rec.get("source")
+                if event == "chunk":
+                    self._chunks.add((source, rec["page"], rec["chunk"]))
+                elif event == "page":
+                    self._pages.add((source, rec["page"]))
+                elif event == "figure":
+                    self._figures.add((source, rec["page"], rec["index"]))
+                elif event == "file":
+                    self._files.add(source)
+                elif event == "start":
+                    sig = (rec["size"], rec["mtime"])
+                    if self._signatures.get(source, sig) != sig:
+                        self._forget(source)
+                    self._signatures[source] = sig
+
+    def _forget(self, source: str):
+        with self._lock:
+            self._files.discard(source)
+            self._pages = {p for p in self._pages if p[0] != source}
+            self._figures = {p for p in self._figures if p[0] != source}
+            self._chunks = {c for c in self._chunks if c[0] != source}
+
+    def _write(self, rec: dict):
+        with self._lock:
+            self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    # ---- queries
+    def file_done(self, pdf_path: str) -> bool:
+        source = os.path.basename(pdf_path)
+        return source in self._files and self._signatures.get(source) == _file_signature(pdf_path)
+
+    def source_done(self, source: str) -> bool:
+        """
+        `source` (a file name) was indexed completely, whatever its current file on disk.
+        """
+        return source in self._files
+
+    def page_done(self, source: str, page: int) -> bool:
+        return (source, page) in self._pages
+
+    def figure_done(self, source: str, page: int, index: int) -> bool:
+        return (source, page, index) in self._figures
+
+    def chunk_done(self, source: str, page: int, chunk) -> bool:
+        return (source, page, chunk) in self._chunks
+
+    # ---- records
+    def begin_file(self, pdf_path: str):
+        """
+        Drop stale progress if the PDF changed since it was (partially) ingested.
+        """
+        source = os.path.basename(pdf_path)
+        sig = _file_signature(pdf_path)
+        with self._lock:
+            if self._signatures.get(source, sig) != sig:
+                self._forget(source)
+            if self._signatures.get(source) != sig:
+                self._signatures[source] = sig
+                self._write({"event": "start", "source": source, "size": sig[0], "mtime": sig[1]})
+
+    def mark_chunk(self, source: str, page: int, chunk, uuid: str):
+        with self._lock:
+            self._chunks.add((source, page, chunk))
+            self._write({"event": "chunk", "source": source, "page": page, "chunk": chunk, "uuid": uuid})
+
+    def mark_page(self, source: str, page: int):
+        with self._lock:
+            self._pages.add((source, page))
+            self._write({"event": "page", "source": source, "page": page})
+
+    def mark_figure(self, source: str, page: int, index: int):
+        with self._lock:
+            self._figures.add((source, page, index))
+            self._write({"event": "figure", "source": source, "page": page, "index": index})
+
+    def mark_file(self, pdf_path: str):
+        source = os.path.basename(pdf_path)
+        with self._lock:
+            self._files.add(source)
+            self._write({"event": "file", "source": source})
+
+    def close(self):
+        self._fh.close()
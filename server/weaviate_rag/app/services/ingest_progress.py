@@ -0,0 +1,238 @@
+import os
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Optional: a live progress bar; without tqdm the periodic rate line is printed instead
+try:
+    from tqdm import tqdm
+    HAS_TQDM = True
+except ImportError:
+    HAS_TQDM = False
+
+# ----------------- Configuration -----------------
+# JSON-lines event log of every ingest run, for later bottleneck analysis (appended to)
+INGEST_PROGRESS_LOG = os.getenv(
+    "INGEST_PROGRESS_LOG",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "ingest_progress.jsonl")),
+)
+# Seconds between "rate" events (pages/s, chunks/s, tokens/s, ETA)
+PROGRESS_INTERVAL_SEC = float(os.getenv("PROGRESS_INTERVAL_SEC", "10"))
+PROGRESS_BAR = os.getenv("PROGRESS_BAR", "true").lower() in {"1", "true", "yes"}
+
+
+def count_pages(pdf_paths) -> int:
+    """
+    Total page count of the PDFs, for the bar and the ETA (opens each file, reads no text).
+    """
+    from app.services.extractors import PdfPages
+
+    total = 0
+    for path in pdf_paths:
+        try:
+            with PdfPages(path) as pages:
+                total += len(pages)
+        except Exception as e:
+            print(f"⚠️  Could not count pages of {os.path.basename(path)}: {e}")
+    return total
+
+
+class IngestProgress:
+    """
+    Progress of one ingest run: counters, per-stage time and errors, a tqdm bar over pages
+    and a JSONL event log. Events: run_start, file_start, rate, error, file_end, run_end.
+    With `enabled=False` it only counts (no bar, log or output), like DedupIndex(enabled=False).
+
+    Safe to share between parallel ingest workers: counts made on a worker thread are also
+    attributed to the file that thread began last (`file_stats`, the "file_end" event).
+
+        progress = IngestProgress(total_pages)
+        progress.begin_file(name, pages)
+        with progress.stage("embed"):
+            ...
+        progress.add(pages=1, chunks=n, tokens=t)
+        progress.close()
+    """
+
+    def __init__(self, total_pages: Optional[int] = None, path: Optional[str] = INGEST_PROGRESS_LOG,
+                 bar: bool = PROGRESS_BAR, interval: float = PROGRESS_INTERVAL_SEC, enabled: bool = True,
+                 **run_info):
+        self.enabled = enabled
+        self.total_pages = total_pages
+        self.interval = interval
+        self.counts = Counter()          # pages, chunks, tokens, figures, captions, files
+        self.errors = Counter()          # per stage
+        self.stage_sec = Counter()       # wall time per stage
+        self.caption_queue = 0
+        self.file_stats: Dict[str, Counter] = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._started = self._last = time.monotonic()
+        self._last_counts = Counter()
+        self._log = open(path, "a", encoding="utf-8") if enabled and path else None
+        self._bar = tqdm(total=total_pages, unit="page", dynamic_ncols=True) if enabled and bar and HAS_TQDM else None
+        self.event("run_start", total_pages=total_pages, **run_info)
+
+    # ---- events
+    def event(self, kind: str, **data):
+        if self._log is None:
+            return
+        row = {"ts": round(time.time(), 3), "kind": kind, "elapsed": round(time.monotonic() - self._started, 3)}
+        self._log.write(json.dumps({**row, **data}, ensure_ascii=False) + "\n")
+        self._log.flush()
+
+    def write(self, message: str):
+        """
+        print() that doesn't tear the progress bar.
+        """
+        if self._bar is not None:
+            self._bar.write(message)
+        else:
+            print(message)
+
+    # ---- reporting
+    @property
+    def file(self) -> Optional[str]:
+        """
+        The file the calling thread is working on.
+        """
+        return getattr(self._local, "file", None)
+
+    def _file_counter(self) -> Optional[Counter]:
+        return self.file_stats.get(self.file) if self.file else None
+
+    def begin_file(self, name: str, pages: int = None):
+        self._local.file = name
+        with self._lock:
+            self.file_stats[name] = Counter(started=time.monotonic())
+            active = sum(1 for c in self.file_stats.values() if "sec" not in c)
+            self.event("file_start", file=name, pages=pages)
+            if self._bar is not None:
+                self._bar.set_description(name[:32] if active == 1 else f"{active} files")
+
+    def end_file(self, name: str, **data) -> Counter:
+        """
+        Close the file's stats (pages, chunks, tokens, <stage>_sec, errors, sec) and return them.
+        """
+        with self._lock:
+            self.counts["files"] += 1
+            stats = self.file_stats.setdefault(name, Counter(started=time.monotonic()))
+            stats["sec"] = time.monotonic() - stats.pop("started")
+            self.event("file_end", file=name, **{**{k: round(v, 3) for k, v in stats.items()}, **data})
+        return stats
+
+    def add(self, pages: int = 0, chunks: int = 0, tokens: int = 0, figures: int = 0, captions: int = 0):
+        with self._lock:
+            delta = Counter(pages=pages, chunks=chunks, tokens=tokens, figures=figures, captions=captions)
+            self.counts.update(delta)
+            stats = self._file_counter()
+            if stats is not None:
+                stats.update(delta)
+            if self._bar is not None and pages:
+                self._bar.update(pages)
+            if self.enabled and time.monotonic() - self._last >= self.interval:
+                self.rate()
+
+    def set_caption_queue(self, depth: int):
+        with self._lock:
+            stats = self._file_counter()
+            if stats is not None:
+                self.caption_queue += depth - stats["caption_queue"]
+                stats["caption_queue"] = depth
+            else:
+                self.caption_queue = depth
+
+    def error(self, stage: str, exc: BaseException, **data):
+        with self._lock:
+            self.errors[stage] += 1
+            stats = self._file_counter()
+            if stats is not None:
+                stats["errors"] += 1
+            self.event("error", stage=stage, file=self.file, error=f"{type(exc).__name__}: {exc}", **data)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage (extract / embed / upsert / caption ...) and count its errors;
+        the exception itself is re-raised.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error(name, e)
+            raise
+        finally:
+            spent = time.perf_counter() - started
+            with self._lock:
+                self.stage_sec[name] += spent
+                stats = self._file_counter()
+                if stats is not None:
+                    stats[f"{name}_sec"] += spent
+
+    def rate(self) -> dict:
+        """
+        Emit a "rate" event: throughput over the last interval and since the start, plus ETA.
+        """
+        with self._lock:
+            return self._rate()
+
+    def _rate(self) -> dict:
+        now = time.monotonic()
+        window = max(now - self._last, 1e-9)
+        total = max(now - self._started, 1e-9)
+        delta = {k: self.counts[k] - self._last_counts[k] for k in ("pages", "chunks", "tokens")}
+        data = {
+            "pages_per_sec": round(delta["pages"] / window, 3),
+            "chunks_per_sec": round(delta["chunks"] / window, 3),
+            "tokens_per_sec": round(delta["tokens"] / window, 1),
+            "avg_pages_per_sec": round(self.counts["pages"] / total, 3),
+            "caption_queue": self.caption_queue,
+            "errors": dict(self.errors),
+            "stage_sec": {k: round(v, 2) for k, v in self.stage_sec.items()},
+            **dict(self.counts),
+        }
+        if self.total_pages and self.counts["pages"]:
+            remaining = max(0, self.total_pages - self.counts["pages"])
+            data["eta_sec"] = round(remaining / (self.counts["pages"] / total))
+        self._last, self._last_counts = now, Counter(self.counts)
+        active = [name for name, c in self.file_stats.items() if "sec" not in c]
+        self.event("rate", active_files=active, **data)
+
+        if self._bar is not None:
+            self._bar.set_postfix(
+                chunks_s=f"{data['chunks_per_sec']:.1f}", tok_s=f"{data['tokens_per_sec']:.0f}",
+                captions=self.caption_queue, errors=sum(self.errors.values()),
+            )
+        else:
+            eta = f", ETA {data['eta_sec'] // 60:.0f} min" if "eta_sec" in data else ""
+            self.write(f"ℹ️ {self.counts['pages']}/{self.total_pages or '?'} pages, "
+                  f"{data['pages_per_sec']:.2f} pages/s, {data['chunks_per_sec']:.1f} chunks/s, "
+                  f"{data['tokens_per_sec']:.0f} tokens/s{eta}")
+        return data
+
+    def summary(self) -> str:
+        total = max(time.monotonic() - self._started, 1e-9)
+        stages = ", ".join(f"{k} {v:.0f}s" for k, v in self.stage_sec.most_common())
+        errors = sum(self.errors.values())
+        return (
+            f"{self.counts['files']} files, {self.counts['pages']} pages, {self.counts['chunks']} chunks "
+            f"in {total:.0f}s ({self.counts['pages'] / total:.2f} pages/s, "
+            f"{self.counts['tokens'] / total:.0f} tokens/s); {stages or 'no stages'}"
+            + (f"; {errors} errors ({', '.join(f'{k} {v}' for k, v in self.errors.items())})" if errors else "")
+        )
+
+    def close(self):
+        if not self.enabled:
+            return
+        self.rate()
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+        self.event("run_end", summary=self.summary())
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Tuple
+
+# In-process metrics, exposed as JSON on GET /metrics:
+#   counters    monotonically increasing totals
+#   summaries   count/mean/p50/p95 over the last METRIC_WINDOW observations
+#   events      recent notable changes (config reloads, ...) to line up with latency shifts
+METRIC_WINDOW = 1000
+EVENT_WINDOW = 100
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: dict) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_str(key: _Key) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = defaultdict(float)
+        self._observations: Dict[_Key, Deque[float]] = defaultdict(lambda: deque(maxlen=METRIC_WINDOW))
+        self._events: Deque[dict] = deque(maxlen=EVENT_WINDOW)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[_key(name, labels)] += value
+
+    def observe(self, name: str, value: float, **labels):
+        with self._lock:
+            self._observations[_key(name, labels)].append(value)
+
+    def event(self, kind: str, **data):
+        with self._lock:
+            self._events.append({"ts": time.time(), "kind": kind, **data})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {_label_str(k): v for k, v in self._counters.items()}
+            summaries = {}
+            for k, values in self._observations.items():
+                ordered = sorted(values)
+                summaries[_label_str(k)] = {
+                    "count": len(ordered),
+                    "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+                    "p50": _percentile(ordered, 0.50),
+                    "p95": _percentile(ordered, 0.95),
+                }
+            return {"counters": counters, "summaries": summaries, "events": list(self._events)}
+
+
+METRICS = Metrics()
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Hashable, List, Sequence
+
+
+class MicroBatcher:
+    """
+    Coalesces small requests from several threads into full batches for one backend call.
+
+        batcher = MicroBatcher(lambda key, items: call(key, items), max_items=64, max_wait_sec=0.05)
+        results = batcher.submit(key, items).result()      # one result per item
+
+    Requests with the same key (e.g. one Weaviate collection) are batched together, the
+    oldest key first. A free sender thread takes up to `max_items` items at once, so requests
+    that arrive while a call is in flight go out together in the next one; with
+    `max_wait_sec` > 0 a partial batch is also held back that long to let it fill. A single
+    request larger than `max_items` is sent on its own.
+    If the call fails, every request in that batch gets the exception.
+    """
+
+    def __init__(self, fn: Callable[[Hashable, List], Sequence], max_items: int, max_wait_sec: float,
+                 concurrency: int = 1, name: str = "batch"):
+        self.fn = fn
+        self.max_items = max_items
+        self.max_wait_sec = max_wait_sec
+        self._cond = threading.Condition()
+        # key -> [(submitted, items, future)], in arrival order of each key's oldest request
+        self._queues: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._closed = False
+        self.calls = 0
+        self.items = 0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True) for i in range(max(1, concurrency))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, key: Hashable, items: Sequence) -> Future:
+        future = Future()
+        if not items:
+            future.set_result([])
+            return future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queues.setdefault(key, []).append((time.monotonic(), list(items), future))
+            self._cond.notify()
+        return future
+
+    def _size(self, key) -> int:
+        return sum(len(items) for _, items, _ in self._queues[key])
+
+    def _take(self):
+        """
+        Block until a batch is due; None once closed and drained. Called with the lock held.
+        """
+        while True:
+            if not self._queues:
+                if self._closed:
+                    return None
+                self._cond.wait()
+                continue
+            key = next(iter(self._queues))
+            due = self._queues[key][0][0] + self.max_wait_sec
+            wait = due - time.monotonic()
+            if wait > 0 and self._size(key) < self.max_items and not self._closed:
+                self._cond.wait(wait)
+                continue
+
+            queue, batch, count = self._queues[key], [], 0
+            while queue and (not batch or count + len(queue[0][1]) <= self.max_items):
+                request = queue.pop(0)
+                batch.append(request)
+                count += len(request[1])
+            if not queue:
+                del self._queues[key]
+            else:
+                self._queues.move_to_end(key)
+            return key, batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                taken = self._take()
+            if taken is None:
+                return
+            key, batch = taken
+            items = [item for _, request_items, _ in batch for item in request_items]
+            try:
+                results = self.fn(key, items)
+            except BaseException as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._cond:
+                self.calls += 1
+                self.items += len(items)
+            start = 0
+            for _, request_items, future in batch:
+                future.set_result(list(results[start:start + len(request_items)]))
+                start += len(request_items)
+
+    def close(self):
+        """
+        Send what is still queued, then stop the worker threads.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
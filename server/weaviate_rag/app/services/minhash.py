@@ -0,0 +1,152 @@
+import hashlib
+import os
+import random
+import re
+from array import array
+from collections import defaultdict
+from typing import Dict, Hashable, List, Sequence, Set
+
+# ----------------- Configuration -----------------
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "64"))
+# bands * rows = permutations; 16 x 4 puts the LSH threshold at Jaccard ~0.5
+LSH_BANDS = int(os.getenv("LSH_BANDS", "16"))
+SHINGLE_WORDS = int(os.getenv("SHINGLE_WORDS", "5"))
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+_WORD_RE = re.compile(r"\w+")
+# Fixed seed: signatures must be comparable across processes and runs
+_rnd = random.Random(0x5EED)
+_PERMS = [(_rnd.randrange(1, _PRIME), _rnd.randrange(0, _PRIME)) for _ in range(MINHASH_PERMUTATIONS)]
+
+Signature = Sequence[int]
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> Set[int]:
+    """
+    64-bit hashes of the k-word shingles of `text` (lower-cased, punctuation ignored).
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    # Texts shorter than k words give a single shingle
+    return {_shingle_hash(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+
+
+def _shingle_hash(words: List[str]) -> int:
+    digest = hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def signature(hashes: Set[int]) -> Signature:
+    if not hashes:
+        return ()
+    return tuple(min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in _PERMS)
+
+
+class MinHasher:
+    """
+    signature(shingles(text)) of a long text fed in pieces: only the running minima and the
+    last k-1 words are kept, so a whole document can be signed page by page.
+
+        hasher = MinHasher()
+        for page_text in pages:
+            hasher.update(page_text)
+        hasher.signature()      # == signature(shingles("\n".join(pages)))
+    """
+
+    def __init__(self, k: int = SHINGLE_WORDS):
+        self.k = k
+        self._tail: List[str] = []
+        self._mins = None
+
+    def update(self, text: str):
+        words = self._tail + _WORD_RE.findall(text.lower())
+        if len(words) >= self.k:
+            # Every window overlaps the new words, so no shingle is counted twice
+            hashes = {_shingle_hash(words[i:i + self.k]) for i in range(len(words) - self.k + 1)}
+            mins = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+            self._mins = mins if self._mins is None else [min(x, y) for x, y in zip(self._mins, mins)]
+        self._tail = words[-(self.k - 1):] if self.k > 1 else []
+
+    def signature(self) -> Signature:
+        if self._mins is None:
+            # Fewer than k words in total: all of them are still in the tail
+            return signature({_shingle_hash(self._tail)}) if self._tail else ()
+        return tuple(m & _MASK for m in self._mins)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """
+    Estimated Jaccard similarity of the two shingle sets.
+    """
+    if not a or not b:
+        return 0.0
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures: `candidates` returns keys that share at least
+    one band with the query, which is then confirmed with `similarity`.
+
+    Memory is linear in the number of entries: each keeps a packed signature plus one
+    bucket slot per band (bands are stored as ints, not tuples).
+    """
+
+    def __init__(self, bands: int = LSH_BANDS):
+        if MINHASH_PERMUTATIONS % bands:
+            raise ValueError(f"LSH_BANDS={bands} must divide MINHASH_PERMUTATIONS={MINHASH_PERMUTATIONS}")
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self._buckets: Dict[int, List[Hashable]] = defaultdict(list)
+        self._signatures: Dict[Hashable, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def _bands(self, sig: Signature):
+        for band in range(self.bands):
+            yield hash((band, *sig[band * self.rows:(band + 1) * self.rows]))
+
+    def add(self, key: Hashable, sig: Signature):
+        if not sig or key in self._signatures:
+            return
+        self._signatures[key] = array("Q", sig)
+        for bucket in self._bands(sig):
+            self._buckets[bucket].append(key)
+
+    def remove(self, key: Hashable):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for bucket in self._bands(sig):
+            keys = self._buckets.get(bucket)
+            if keys is not None and key in keys:
+                keys.remove(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def candidates(self, sig: Signature) -> Set[Hashable]:
+        if not sig:
+            return set()
+        found = set()
+        for bucket in self._bands(sig):
+            found.update(self._buckets.get(bucket, ()))
+        return found
+
+    def best_match(self, sig: Signature, threshold: float, exclude=lambda key: False):
+        """
+        (key, similarity) of the most similar indexed entry at or above `threshold`, or None.
+        """
+        best = None
+        for key in self.candidates(sig):
+            if exclude(key):
+                continue
+            score = similarity(sig, self._signatures[key])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+import tiktoken
+
+from app.services.minhash import LSHIndex, shingles, signature
+
+# ----------------- Configuration -----------------
+ENABLE_PAGE_FILTER = os.getenv("ENABLE_PAGE_FILTER", "true").lower() in {"1", "true", "yes"}
+# Pages with fewer words than this (after boilerplate removal) are not embedded
+PAGE_MIN_WORDS = int(os.getenv("PAGE_MIN_WORDS", "8"))
+# How many lines at the top and bottom of a page are header/footer candidates
+BOILERPLATE_EDGE_LINES = int(os.getenv("BOILERPLATE_EDGE_LINES", "3"))
+# A candidate line is boilerplate if it sits at the edge of this share of the document's pages
+BOILERPLATE_MIN_SHARE = float(os.getenv("BOILERPLATE_MIN_SHARE", "0.5"))
+BOILERPLATE_MIN_PAGES = int(os.getenv("BOILERPLATE_MIN_PAGES", "3"))
+# Estimated Jaccard at or above which a page duplicates one from another document
+PAGE_DUP_THRESHOLD = float(os.getenv("PAGE_DUP_THRESHOLD", "0.9"))
+
+_DIGITS_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+")
+_enc = tiktoken.get_encoding("cl100k_base")   # text-embedding-3-small's encoding
+
+
+def _line_key(line: str) -> str:
+    # "Seite 3 von 40" and "Seite 4 von 40" are the same footer
+    return _DIGITS_RE.sub("#", line.strip().lower())
+
+
+def _edge_lines(text: str) -> Iterable[str]:
+    lines = text.splitlines()
+    n = BOILERPLATE_EDGE_LINES
+    if len(lines) <= 2 * n:
+        return lines
+    return lines[:n] + lines[-n:]
+
+
+def boilerplate_keys(page_texts: Iterable[str]) -> Set[str]:
+    """
+    Header/footer lines of one document: line keys that recur at the top or bottom of
+    at least BOILERPLATE_MIN_SHARE of its pages.
+    """
+    counts, pages = Counter(), 0
+    for text in page_texts:
+        pages += 1
+        counts.update({_line_key(line) for line in _edge_lines(text) if line.strip()})
+    needed = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_MIN_SHARE * pages)
+    return {key for key, c in counts.items() if c >= needed}
+
+
+def strip_boilerplate(text: str, keys: Set[str]) -> Tuple[str, str]:
+    """
+    (text without boilerplate lines, the removed lines). Only edge lines are removed,
+    so a body line that happens to match a footer is kept.
+    """
+    if not keys:
+        return text, ""
+    lines = text.splitlines()
+    n = BOILERPLATE_EDGE_LINES
+    edge = set(range(min(n, len(lines)))) | set(range(max(0, len(lines) - n), len(lines)))
+    kept, removed = [], []
+    for i, line in enumerate(lines):
+        (removed if i in edge and _line_key(line) in keys else kept).append(line)
+    return "\n".join(kept), "\n".join(removed)
+
+
+def count_tokens(text: str) -> int:
+    return len(_enc.encode(text)) if text else 0
+
+
+class PageFilter:
+    """
+    Pre-embedding filter shared by every document of one ingestion run:
+
+        page_filter.begin_document(source, [page texts])
+        text = page_filter.filter(source, page_number, text, has_tables)   # None -> skip page
+
+    Blank pages and pages that near-duplicate a page of another document are dropped;
+    header/footer lines are cut from the rest. Counters feed `summary()`.
+
+    Ingestion turns `dedupe_pages` off when the chunk-level DedupIndex is active, which
+    keeps duplicates out as well but also records the duplicate source as an alias.
+    Documents may be filtered concurrently (parallel ingest); call `end_document` when done.
+    Skipped duplicates are reported through `log` (IngestProgress.write during ingestion,
+    so the progress bar isn't torn).
+    """
+
+    def __init__(self, enabled: bool = ENABLE_PAGE_FILTER, dedupe_pages: bool = True,
+                 log: Callable[[str], None] = print):
+        self.enabled = enabled
+        self.dedupe_pages = dedupe_pages
+        self.log = log
+        self.index = LSHIndex()
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Set[str]] = {}   # boilerplate line keys per document
+        self.pages = 0
+        self.blank = 0
+        self.duplicate = 0
+        self.boilerplate_lines = 0
+        self.saved_tokens = 0
+
+    def begin_document(self, source: str, page_texts: Iterable[str]):
+        self._keys[source] = boilerplate_keys(page_texts) if self.enabled else set()
+
+    def end_document(self, source: str):
+        self._keys.pop(source, None)
+
+    def register(self, source: str, page_number: int, text: str):
+        """
+        Make an already-indexed page visible to duplicate detection without filtering it.
+        """
+        if self.enabled and self.dedupe_pages:
+            text, _ = strip_boilerplate(text, self._keys.get(source, set()))
+            sig = signature(shingles(text))
+            with self._lock:
+                self.index.add((source, page_number), sig)
+
+    def filter(self, source: str, page_number: int, text: str, has_tables: bool = False) -> Optional[str]:
+        if not self.enabled:
+            return text
+        text, removed = strip_boilerplate(text, self._keys.get(source, set()))
+        blank = not has_tables and len(_WORD_RE.findall(text)) < PAGE_MIN_WORDS
+        with self._lock:
+            self.pages += 1
+            if removed:
+                self.boilerplate_lines += removed.count("\n") + 1
+                self.saved_tokens += count_tokens(removed)
+            if blank:
+                self.blank += 1
+                self.saved_tokens += count_tokens(text)
+        if blank:
+            return None
+
+        if not self.dedupe_pages:
+            return text
+        sig = signature(shingles(text))
+        # Lookup and insert together, or two documents filtered in parallel could both keep a page
+        with self._lock:
+            match = self.index.best_match(sig, PAGE_DUP_THRESHOLD, exclude=lambda key: key[0] == source)
+            if match is None or has_tables:
+                self.index.add((source, page_number), sig)
+                return text
+            self.duplicate += 1
+            self.saved_tokens += count_tokens(text)
+        (dup_source, dup_page), score = match
+        self.log(f"⏭️  {source} p{page_number} duplicates {dup_source} p{dup_page} ({score:.2f})")
+        return None
+
+    def summary(self) -> str:
+        return (f"{self.pages} pages checked: {self.blank} blank, {self.duplicate} duplicate, "
+                f"{self.boilerplate_lines} header/footer lines removed, ~{self.saved_tokens} embedding tokens saved")
@@ -0,0 +1,77 @@
+import os
+import json
+import tempfile
+from typing import Iterator, List
+
+from app.services.chunking import normalize_page_text
+from app.services.extractors import PdfPages, PageText
+
+# ----------------- Configuration -----------------
+# Documents with at least this many pages are spooled to a temporary file during ingestion
+# instead of held in memory, so peak RSS doesn't depend on document length (0 = always)
+STREAM_MIN_PAGES = int(os.getenv("STREAM_MIN_PAGES", "200"))
+
+
+class PageSpool:
+    """
+    The extracted pages of one document, normalized, for the passes ingestion makes over
+    them (boilerplate detection, document signature, indexing). On disk only one page is
+    in memory at a time: every iteration re-reads the file from the start, so iterations
+    must not be interleaved.
+
+        spool = PageSpool(on_disk=True)
+        spool.append(page)
+        for page in spool:
+            ...
+    """
+
+    def __init__(self, on_disk: bool = False):
+        self.on_disk = on_disk
+        self._pages: List[PageText] = []
+        # Anonymous temp file: removed by the OS even if ingestion crashes
+        self._fh = tempfile.TemporaryFile("w+", encoding="utf-8") if on_disk else None
+        self._count = 0
+
+    def append(self, page: PageText):
+        self._count += 1
+        if self._fh is None:
+            self._pages.append(page)
+        else:
+            self._fh.write(json.dumps(page, ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[PageText]:
+        if self._fh is None:
+            yield from self._pages
+            return
+        self._fh.flush()
+        self._fh.seek(0)
+        for line in self._fh:
+            number, text, extractor, table_heavy, tables = json.loads(line)
+            yield PageText(number, text, extractor, table_heavy, tuple(tables))
+
+    def texts(self) -> Iterator[str]:
+        return (page.text for page in self)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._pages = []
+
+
+def spool_pages(pages: PdfPages, on_disk: bool = None) -> PageSpool:
+    """
+    Read every page of an open PdfPages into a PageSpool with normalized text; long
+    documents (STREAM_MIN_PAGES) go to disk unless `on_disk` says otherwise.
+    """
+    if on_disk is None:
+        on_disk = len(pages) >= STREAM_MIN_PAGES
+    spool = PageSpool(on_disk)
+    for page in pages:
+        # Plain text is what gets embedded and BM25-indexed; the MathJax rendering
+        # is produced at answer time (see rag._display_text)
+        spool.append(page._replace(text=normalize_page_text(page.text)))
+    return spool
@@ -1,22 +1,93 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from dotenv import load_dotenv
 from openai import OpenAI
-from app.services.weaviate_setup import client
+from weaviate.classes.query import MetadataQuery
+from app.services.weaviate_setup import (
+    CHUNK_COLLECTION,
+    FIGURE_COLLECTION,
+    ALL_TENANTS,
+    get_collection,
+    resolve_tenant,
+    index_updates,
+)
+from app.services.cache import TTLCache
+from app.services.config import settings, subscribe, CONFIG_POLL_SEC
+from app.services.metrics import METRICS
+from app.services.format_math_equation import format_equations_for_mathjax
+from app.services.diversify import mmr_select, query_similarity, MMR_ENABLED, MMR_FETCH_FACTOR
+from app.services.figure_store import page_figures, responsive, FIGURE_DISPLAY_WIDTH
+from app.services.router import route, out_of_domain, is_out_of_domain, OUT_OF_DOMAIN
+from app.services.resilience import (
+    call_with_retry,
+    deadline_in,
+    OPENAI_BREAKER,
+    WEAVIATE_BREAKER,
+    EMBED_HEDGE_DELAY_SEC,
+    ConcurrencyLimit,
+)
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
-WEAVIATE_COLLECTION = "LectureChunk"
+WEAVIATE_COLLECTION = CHUNK_COLLECTION
+# Chat models, k, alpha, cache TTLs and the chat concurrency limit are hot-reloadable: see config.py.
+# The embedding model is not: it must be the one the index was built with (embedder.EMBEDDING_MODEL),
+# so changing it means re-ingesting and restarting.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Figures are searched separately, with their own limit (figure_k) and a relevance cut-off
+FIGURE_MAX_DISTANCE = float(os.getenv("FIGURE_MAX_DISTANCE", "0.6"))
 
+# Chunks are stored as plain text; their MathJax rendering is built on first use
+DISPLAY_CACHE_SIZE = int(os.getenv("DISPLAY_CACHE_SIZE", "4096"))
+
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+_display_text = lru_cache(maxsize=DISPLAY_CACHE_SIZE)(format_equations_for_mathjax)
+
+# Query embeddings are course-independent; retrieval results are cached per tenant so
+# re-ingesting one course only has to clear its own namespace
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+# /chat/batch: questions per embeddings request, and questions answered at once per batch
+# (completions are additionally capped by config.max_concurrent_chats)
+BATCH_EMBED_SIZE = int(os.getenv("BATCH_EMBED_SIZE", "256"))
+BATCH_PARALLEL = int(os.getenv("BATCH_PARALLEL", "8"))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+
+_embedding_cache = TTLCache(EMBED_CACHE_SIZE, settings().embed_cache_ttl_sec)
+_retrieval_cache = TTLCache(RETRIEVAL_CACHE_SIZE, settings().retrieval_cache_ttl_sec)
+_chat_limit = ConcurrencyLimit(settings().max_concurrent_chats)
+
+
+def _on_config(cfg):
+    # New TTLs apply to entries written from now on; cached entries stay warm
+    _embedding_cache.ttl = cfg.embed_cache_ttl_sec
+    _retrieval_cache.ttl = cfg.retrieval_cache_ttl_sec
+    _chat_limit.resize(cfg.max_concurrent_chats)
+
+
+subscribe(_on_config)
 
-STATIC_FIG_DIR = os.path.normpath(
-    os.path.join(os.path.dirname(__file__), "..", "..", "static", "figures")
-)
 
 STATIC_BASE_URL = os.getenv("STATIC_BASE_URL", "http://localhost:8000")
 
-oa = OpenAI(api_key=OPENAI_API_KEY)
+# Optional per-course text pinned into the system message (formula sheet, notation, ...):
+# <PINNED_CONTEXT_DIR>/<tenant>.md, or default.md without multi-tenancy. Being part of the
+# stable prefix it is eligible for provider-side prompt caching (prefixes >= 1024 tokens).
+PINNED_CONTEXT_DIR = os.getenv(
+    "PINNED_CONTEXT_DIR",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "pinned_context")),
+)
+_pinned: dict = {}
+
+@lru_cache(maxsize=1)
+def _openai() -> OpenAI:
+    # Created on first use, so retrieval-only callers (evaluation, calibration) can import this
+    # module without OPENAI_API_KEY
+    return OpenAI(api_key=OPENAI_API_KEY)
 
 SYSTEM_PROMPT = """
 You are a helpful and inspiring study assistant for engineering/science topics.
@@ -34,32 +105,208 @@ example: asker asks about german cars, you give some quotes and motivate him to
 Be scientifically precise. but not boring.
 """
 
-def _retrieve_chunks(query: str, k: int = 6):
-    embedded_query = oa.embeddings.create(
-        input=query,
-        model="text-embedding-3-small"
-    ).data[0].embedding
+def _pinned_context(tenant: str = "") -> str:
+    """
+    Contents of the course's pinned-context file, re-read only when its mtime changes.
+    """
+    path = os.path.join(PINNED_CONTEXT_DIR, f"{tenant or 'default'}.md")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ""
+    cached = _pinned.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, encoding="utf-8") as fh:
+            cached = (mtime, fh.read().strip())
+        _pinned[path] = cached
+    return cached[1]
+
+def _build_messages(question: str, context: str, tenant: str = ""):
+    """
+    Byte-identical prefix first (system prompt + pinned course context), then the
+    per-request part with the question last, so consecutive calls share a cacheable prefix.
+    """
+    system = SYSTEM_PROMPT
+    pinned = _pinned_context(tenant)
+    if pinned:
+        system += f"\nCourse reference (always available, cite it like the context):\n{pinned}\n"
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"},
+    ]
+
+def _embed_query(query: str, deadline=None):
+    cached = _embedding_cache.get("", query)
+    if cached is not None:
+        return cached
+    vector = call_with_retry(
+        lambda: _openai().embeddings.create(
+            input=query,
+            model=EMBEDDING_MODEL
+        ).data[0].embedding,
+        breaker=OPENAI_BREAKER,
+        deadline=deadline,
+        hedge_delay=EMBED_HEDGE_DELAY_SEC,
+    )
+    _embedding_cache.set("", query, vector)
+    return vector
+
+def embed_queries(queries, deadline=None):
+    """
+    Warm the embedding cache for many queries with one embeddings request per
+    BATCH_EMBED_SIZE uncached queries (instead of one request per question).
+    """
+    missing = list(dict.fromkeys(q for q in queries if _embedding_cache.get("", q) is None))
+    for i in range(0, len(missing), BATCH_EMBED_SIZE):
+        batch = missing[i:i + BATCH_EMBED_SIZE]
+        resp = call_with_retry(
+            lambda: _openai().embeddings.create(input=batch, model=EMBEDDING_MODEL),
+            breaker=OPENAI_BREAKER,
+            deadline=deadline,
+        )
+        for d in resp.data:
+            _embedding_cache.set("", batch[d.index], d.embedding)
+    return len(missing)
+
+def _retrieve_chunks(query: str, k: int = None, deadline=None, embedded_query=None, diversify: bool = MMR_ENABLED,
+                     filters=None, tenant: str = None, alpha: float = None):
+    """
+    Hybrid search. With `diversify`, k * MMR_FETCH_FACTOR candidates are fetched with their
+    vectors and MMR keeps k of them, so overlapping windows of one page don't fill the context.
+    `filters` (see filters.build_filters) is applied inside Weaviate, before ranking.
+    """
+    cfg = settings()
+    k = k or cfg.retrieval_k
+    alpha = cfg.hybrid_alpha if alpha is None else alpha
+    if embedded_query is None:
+        embedded_query = _embed_query(query, deadline)
 
-    coll = client.collections.get(WEAVIATE_COLLECTION)
+    coll = get_collection(WEAVIATE_COLLECTION, tenant)
 
-    res = coll.query.hybrid(
-        query=query,
-        vector=embedded_query,
-        limit=k,
-        alpha=0.5
+    res = call_with_retry(
+        lambda: coll.query.hybrid(
+            query=query,
+            vector=embedded_query,
+            limit=k * MMR_FETCH_FACTOR if diversify else k,
+            alpha=alpha,
+            # Vectors feed MMR and the query similarity the model router uses as confidence
+            include_vector=True,
+            return_metadata=MetadataQuery(score=True),
+            filters=filters,
+        ),
+        breaker=WEAVIATE_BREAKER,
+        deadline=deadline,
     )
 
+    objects = res.objects
+    if diversify and len(objects) > k:
+        picked = mmr_select(
+            [obj.metadata.score or 0.0 for obj in objects],
+            [obj.vector["default"] for obj in objects],
+            k,
+        )
+        objects = [objects[i] for i in picked]
+    similarity = query_similarity(embedded_query, [obj.vector["default"] for obj in objects])
+
     # Return all metadata; convert page to 0-based for your UI
     return [
         {
             "text": (obj.properties.get("text", "") or "").strip(),
             "source": obj.properties.get("source", "unknown"),
             "page": (obj.properties.get("page", 1) - 1),
-            "imagePath": obj.properties.get("imagePath"),  
+            # Other PDFs with the same text (ingest-time dedup stores one copy)
+            "aliases": obj.properties.get("aliases") or [],
+            "score": obj.metadata.score or 0.0,
+            "similarity": sim,
+        }
+        for obj, sim in zip(objects, similarity)
+    ]
+
+def _retrieve_figures(query: str, embedded_query, k: int = None, deadline=None, filters=None,
+                      tenant: str = None, alpha: float = None):
+    cfg = settings()
+    k = cfg.figure_k if k is None else k
+    alpha = cfg.hybrid_alpha if alpha is None else alpha
+    if k == 0:
+        return []
+    coll = get_collection(FIGURE_COLLECTION, tenant)
+
+    res = call_with_retry(
+        lambda: coll.query.hybrid(
+            query=query,
+            vector=embedded_query,
+            limit=k,
+            alpha=alpha,
+            max_vector_distance=FIGURE_MAX_DISTANCE,
+            filters=filters,
+        ),
+        breaker=WEAVIATE_BREAKER,
+        deadline=deadline,
+    )
+
+    return [
+        {
+            "caption": (obj.properties.get("caption", "") or "").strip(),
+            "source": obj.properties.get("source", "unknown"),
+            "page": (obj.properties.get("page", 1) - 1),
+            "imagePath": obj.properties.get("imagePath"),
+            "aliases": obj.properties.get("aliases") or [],
         }
         for obj in res.objects
+        if obj.properties.get("imagePath")
     ]
 
+def _retrieve(query: str, k: int = None, figure_k: int = None, deadline=None, filters=None, tenant: str = "",
+              cfg=None):
+    """
+    Embed once, then search text chunks and figures in parallel. Returns (chunks, figures).
+    Results are cached in the tenant's namespace.
+    """
+    cfg = cfg or settings()
+    k = k or cfg.retrieval_k
+    figure_k = cfg.figure_k if figure_k is None else figure_k
+    # Settings that change the result are part of the key, so a reload doesn't serve stale hits
+    cache_key = (query, k, figure_k, cfg.hybrid_alpha, repr(filters))
+    cached = _retrieval_cache.get(tenant, cache_key)
+    if cached is not None:
+        return cached
+
+    embedded_query = _embed_query(query, deadline)
+    chunks = _search_pool.submit(
+        _retrieve_chunks, query, k, deadline, embedded_query, MMR_ENABLED, filters, tenant, cfg.hybrid_alpha
+    )
+    figures = _search_pool.submit(
+        _retrieve_figures, query, embedded_query, figure_k, deadline, filters, tenant, cfg.hybrid_alpha
+    )
+    result = (chunks.result(), figures.result())
+    _retrieval_cache.set(tenant, cache_key, result)
+    return result
+
+def clear_tenant_cache(tenant: str = None):
+    """
+    Drop cached retrieval results for one course (None: all), e.g. after re-ingesting it.
+    """
+    _retrieval_cache.clear(tenant)
+    METRICS.incr("retrieval_cache_clears", tenant=ALL_TENANTS if tenant is None else tenant)
+
+def _watch_index_updates(seen: dict, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        current = index_updates()
+        for tenant, stamp in current.items():
+            if seen.get(tenant) != stamp:
+                clear_tenant_cache(None if tenant == ALL_TENANTS else tenant)
+        seen = current
+
+def watch_index_updates(interval: float = CONFIG_POLL_SEC) -> threading.Event:
+    """
+    Poll weaviate_setup.INDEX_UPDATES_PATH (written by load_documents.py / delete_collection.py)
+    and clear a tenant's retrieval cache when its index changed. Set the returned event to stop.
+    """
+    stop = threading.Event()
+    threading.Thread(target=_watch_index_updates, args=(index_updates(), interval, stop),
+                     name="index-watch", daemon=True).start()
+    return stop
+
 def _build_fallback_image_paths(retrieved):
     web_paths = []
     seen = set()
@@ -70,49 +317,112 @@ def _build_fallback_image_paths(retrieved):
             continue
         base = os.path.splitext(src)[0]
         page1 = page0 + 1  
-        candidate_name = f"{base}_p{page1}.png"
-        fs_path = os.path.join(STATIC_FIG_DIR, candidate_name)
-        if os.path.exists(fs_path):
-            web_path = f"/static/figures/{candidate_name}"
+        for web_path in page_figures(f"{base}_p{page1}"):
             if web_path not in seen:
                 web_paths.append(web_path)
                 seen.add(web_path)
     return web_paths
 
-def retrieve_answer(question: str) -> str:
-    retrieved = _retrieve_chunks(question)
+def _complete(messages, model: str, tier: str, deadline=None, cache_key: str = None) -> str:
+    """
+    One chat completion, with per-tier latency and token metrics. `cache_key` groups
+    requests that share a prompt prefix so the provider routes them to the same cache.
+    """
+    started = time.perf_counter()
+    with _chat_limit.slot(deadline):
+        resp = call_with_retry(
+            lambda: _openai().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0,
+                **({"prompt_cache_key": cache_key} if cache_key else {}),
+            ),
+            breaker=OPENAI_BREAKER,
+            deadline=deadline,
+        )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    cached = 0
+    if resp.usage is not None:
+        details = getattr(resp.usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        METRICS.incr("prompt_tokens", resp.usage.prompt_tokens, tier=tier)
+        METRICS.incr("completion_tokens", resp.usage.completion_tokens, tier=tier)
+        # Prompt tokens served from the provider's prefix cache (cheaper, faster first token)
+        METRICS.incr("cached_prompt_tokens", cached, tier=tier)
+    METRICS.observe("chat_ms", elapsed_ms, tier=tier, model=model, prefix_cache="hit" if cached else "miss")
+    return resp.choices[0].message.content
+
+def _abs_url(url: str) -> str:
+    # stored paths look like "/static/figures/CFD_p8.<hash>.png"
+    return url if url.startswith("http") else f"{STATIC_BASE_URL}{url}"
 
-    # Build text-only context for the LLM
-    text_chunks = [c["text"] for c in retrieved if c.get("text")]
+def _figure_item(path: str, **extra) -> dict:
+    """
+    URL of a figure plus, for content-hashed ones, its thumbnail and `srcset`.
+    """
+    item = {"url": _abs_url(path), **extra}
+    sizes = responsive(path)
+    if len(sizes) > 1:
+        item["thumbnail"] = _abs_url(sizes[0][0])
+        item["srcset"] = ", ".join(f"{_abs_url(p)} {w}w" for p, w in sizes)
+    return item
+
+def answer_question(question: str, filters=None, tenant: str = None) -> dict:
+    """
+    Structured answer: {"answer": markdown, "sources": [...], "figures": [...]}.
+    Figures are URLs with their page, so clients can lazy-load them.
+    `filters`: optional Weaviate filter from filters.build_filters to scope the search.
+    `tenant`: course to search when multi-tenancy is on (ValueError if it can't be served).
+    """
+    tenant = resolve_tenant(tenant)
+    # One snapshot per request: a reload mid-request can't mix old and new settings
+    cfg = settings()
+    started = time.perf_counter()
+    deadline = deadline_in()
+    retrieved, figures = _retrieve(question, deadline=deadline, filters=filters, tenant=tenant, cfg=cfg)
+    METRICS.observe("retrieval_ms", (time.perf_counter() - started) * 1000, config_version=cfg.version)
+
+    # Build text context for the LLM; figure captions (when captioning was on) count as text
+    text_chunks = [_display_text(c["text"]) for c in retrieved if c.get("text")]
+    text_chunks += [f"[Figure] {f['caption']}" for f in figures if f.get("caption")]
     context = "\n\n---\n\n".join(text_chunks)
 
     # Collect any image paths returned directly from Weaviate
-    figure_paths = [c["imagePath"] for c in retrieved if c.get("imagePath")]
+    figure_items = [_figure_item(f["imagePath"], source=f["source"], page=f["page"]) for f in figures]
 
     # If we didn't get any imagePath rows, try file-name fallback
-    if not figure_paths:
-        figure_paths = _build_fallback_image_paths(retrieved)
+    if not figure_items:
+        figure_items = [_figure_item(p) for p in _build_fallback_image_paths(retrieved)]
 
     # If there is neither text nor figures, bail out
-    if not text_chunks and not figure_paths:
-        return (
-            "1. **Explain** – I don't know based on the provided materials.\n\n"
-            "2. **Compare** – I don't know based on the provided materials.\n\n"
-            "3. **Motivate** – I don't know based on the provided materials."
-        )
+    if not text_chunks and not figure_items:
+        return {
+            "answer": (
+                "1. **Explain** – I don't know based on the provided materials.\n\n"
+                "2. **Compare** – I don't know based on the provided materials.\n\n"
+                "3. **Motivate** – I don't know based on the provided materials."
+            ),
+            "sources": [],
+            "figures": [],
+        }
+
+    # Weak retrieval: the model could only decline, so skip the call and answer right away.
+    # Figures already passed FIGURE_MAX_DISTANCE, so any figure hit keeps the question in.
+    if retrieved and not figures and out_of_domain([c["similarity"] for c in retrieved], [c["score"] for c in retrieved], cfg):
+        METRICS.observe("answer_ms", (time.perf_counter() - started) * 1000, config_version=cfg.version)
+        return {"answer": OUT_OF_DOMAIN, "sources": [], "figures": []}
 
     # Ask the model with text context (if any)
     if text_chunks:
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"Question: {question}\n\nContext:\n{context}"}
-        ]
-        resp = oa.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
-            temperature=0
-        )
-        answer = resp.choices[0].message.content
+        messages = _build_messages(question, context, tenant)
+        cache_key = f"rag:{tenant or 'default'}"
+        # Easy, well-grounded questions go to the small model; everything else to chat_model
+        decision = route(question, [c["similarity"] for c in retrieved], len(context), cfg)
+        answer = _complete(messages, decision.model, decision.tier, deadline, cache_key)
+        if decision.tier == "small" and is_out_of_domain(answer):
+            # The small model gave up although retrieval looked confident: ask the large one
+            METRICS.incr("router_escalations")
+            answer = _complete(messages, cfg.chat_model, "large", deadline, cache_key)
     else:
         # No text available but figures exist
         answer = (
@@ -121,26 +431,78 @@ def retrieve_answer(question: str) -> str:
             "3. **Motivate** – Explore SIMPLE/SIMPLER and how they compare to PISO."
         )
 
-    # Sources block (0-based page shown, as you have it)
+    # dedupe figures while preserving order
+    seen = set()
+    figure_items = [f for f in figure_items if not (f["url"] in seen or seen.add(f["url"]))]
+
+    METRICS.observe("answer_ms", (time.perf_counter() - started) * 1000, config_version=cfg.version)
+    return {
+        "answer": answer,
+        # 0-based page, as the UI shows it
+        "sources": [
+            {"source": c["source"], "page": c["page"], "aliases": c.get("aliases") or []}
+            for c in retrieved + figures
+        ],
+        "figures": figure_items,
+    }
+
+def render_answer(result: dict) -> str:
+    """
+    The classic single-string /chat answer: markdown, inline <img> HTML and a sources list.
+    """
+    if not result["sources"] and not result["figures"]:
+        return result["answer"]
+
     sources = "\n".join(
-        f"- From **{c['source']}**, page {c['page']}" for c in retrieved
+        f"- From **{s['source']}**, page {s['page']}"
+        + (f" (also in {', '.join(s['aliases'])})" if s["aliases"] else "")
+        for s in result["sources"]
     )
 
-    def _abs(url: str) -> str:
-        # stored paths look like "/static/figures/CFD_p8.png"
-        return url if url.startswith("http") else f"{STATIC_BASE_URL}{url}"
-
     images_html = ""
-    if figure_paths:
-        # dedupe while preserving order
-        seen = set()
-        uniq = [p for p in figure_paths if not (p in seen or seen.add(p))]
+    if result["figures"]:
+        # Browsers pick the smallest srcset entry that fills the column; off-screen ones load lazily
         imgs = "\n".join(
-            f'<div style="margin:8px 0"><img src="{_abs(p)}" alt="figure" '
-            f'style="max-width:100%;border-radius:8px"/></div>'
-            for p in uniq
+            f'<div style="margin:8px 0"><img src="{f["url"]}" alt="figure" loading="lazy" '
+            + (f'srcset="{f["srcset"]}" sizes="(max-width: {FIGURE_DISPLAY_WIDTH}px) 100vw, '
+               f'{FIGURE_DISPLAY_WIDTH}px" ' if f.get("srcset") else "")
+            + 'style="max-width:100%;border-radius:8px"/></div>'
+            for f in result["figures"]
         )
         images_html = f"\n\n<hr/>\n<h3>Figures</h3>\n{imgs}\n"
 
+    return f"{result['answer']}{images_html}\n\n---\n**Sources:**\n{sources}"
+
+def answer_batch(questions, filters=None, tenant: str = None, parallel: int = BATCH_PARALLEL):
+    """
+    Answer many questions: one batched embedding pass, then searches and completions with
+    `parallel` questions in flight. Yields (index, result, error) in completion order, so
+    callers can stream results while slower questions are still running.
+    """
+    tenant = resolve_tenant(tenant)
+    started = time.perf_counter()
+    embedded = embed_queries(questions, deadline_in())
+    METRICS.incr("batch_questions", len(questions))
+    METRICS.observe("batch_embed_ms", (time.perf_counter() - started) * 1000, queries=embedded)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix="batch")
+    try:
+        futures = {
+            pool.submit(answer_question, q, filters, tenant): i
+            for i, q in enumerate(questions)
+        }
+        for fut in as_completed(futures):
+            try:
+                yield futures[fut], fut.result(), None
+            except Exception as e:
+                METRICS.incr("batch_errors")
+                yield futures[fut], None, f"{type(e).__name__}: {e}"
+    finally:
+        # Client went away: drop the questions that haven't started
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    return f"{answer}{images_html}\n\n---\n**Sources:**\n{sources}"
+def retrieve_answer(question: str, filters=None, tenant: str = None) -> str:
+    """
+    `answer_question` rendered as one markdown/HTML string (see render_answer).
+    """
+    return render_answer(answer_question(question, filters=filters, tenant=tenant))
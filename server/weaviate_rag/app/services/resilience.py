@@ -0,0 +1,265 @@
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional, TypeVar
+
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    RateLimitError,
+)
+from weaviate.exceptions import (
+    UnexpectedStatusCodeError,
+    WeaviateConnectionError,
+    WeaviateGRPCUnavailableError,
+    WeaviateTimeoutError,
+)
+
+T = TypeVar("T")
+
+# ----------------- Configuration -----------------
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.5"))   # seconds
+RETRY_BACKOFF_CAP = float(os.getenv("RETRY_BACKOFF_CAP", "20"))      # seconds
+# Total time budget for one /chat request (embedding + search + completion)
+QUERY_DEADLINE_SEC = float(os.getenv("QUERY_DEADLINE_SEC", "60"))
+# Fire a second embedding request if the first hasn't answered after this long
+EMBED_HEDGE_DELAY_SEC = float(os.getenv("EMBED_HEDGE_DELAY_SEC", "1.5"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SEC = float(os.getenv("BREAKER_RESET_SEC", "30"))
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive transient failures.
+    Open -> half-open after `reset_timeout`; one trial call decides whether to close again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_SEC):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_inflight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the breaker lets a call through (0 if it is closed or half-open).
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_inflight:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._trial_inflight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_inflight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_inflight or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"⚠️  {self.name} circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+            self._trial_inflight = False
+
+
+OPENAI_BREAKER = CircuitBreaker("openai")
+WEAVIATE_BREAKER = CircuitBreaker("weaviate")
+
+
+class ConcurrencyLimit:
+    """
+    Caps concurrent calls; `resize` takes effect for new callers immediately, calls
+    already holding a slot finish normally.
+
+        with limit.slot(deadline):
+            ...
+    """
+
+    def __init__(self, size: int):
+        self._cond = threading.Condition()
+        self.size = size
+        self._active = 0
+
+    def resize(self, size: int):
+        with self._cond:
+            self.size = size
+            self._cond.notify_all()
+
+    def acquire(self, deadline: Optional[float] = None):
+        with self._cond:
+            while self._active >= self.size:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    raise TimeoutError("Deadline exceeded while waiting for a free slot")
+                self._cond.wait(timeout)
+            self._active += 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None):
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# ----------------- Helpers -----------------
+def deadline_in(seconds: Optional[float] = QUERY_DEADLINE_SEC) -> Optional[float]:
+    """
+    Absolute (monotonic) deadline `seconds` from now; None means no budget.
+    """
+    if seconds is None:
+        return None
+    return time.monotonic() + seconds
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUS
+    if isinstance(exc, (WeaviateConnectionError, WeaviateTimeoutError, WeaviateGRPCUnavailableError)):
+        return True
+    if isinstance(exc, UnexpectedStatusCodeError):
+        return exc.status_code in _RETRYABLE_STATUS
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Server-provided delay from `retry-after-ms` / `Retry-After` headers, if any.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    ra_ms = headers.get("retry-after-ms")
+    if ra_ms:
+        try:
+            return float(ra_ms) / 1000.0
+        except ValueError:
+            pass
+    ra = headers.get("retry-after")
+    if ra:
+        try:
+            return float(ra)
+        except ValueError:
+            return None
+    return None
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BACKOFF_BASE, cap: float = RETRY_BACKOFF_CAP) -> float:
+    """
+    Full-jitter exponential backoff for the given 1-based attempt.
+    """
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def hedged_call(fn: Callable[[], T], hedge_delay: float = EMBED_HEDGE_DELAY_SEC) -> T:
+    """
+    Run `fn`; if it hasn't finished after `hedge_delay` seconds, start a second copy
+    and return whichever succeeds first. Only use for idempotent calls.
+    """
+    first = _hedge_pool.submit(fn)
+    done, _ = wait([first], timeout=hedge_delay)
+    if done:
+        return first.result()
+
+    pending = {first, _hedge_pool.submit(fn)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None:
+                return fut.result()
+            error = fut.exception()
+    raise error
+
+
+# ----------------- Main API -----------------
+def call_with_retry(
+    fn: Callable[[], T],
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[float] = None,
+    max_retries: int = RETRY_MAX_ATTEMPTS,
+    backoff_base: float = RETRY_BACKOFF_BASE,
+    backoff_cap: float = RETRY_BACKOFF_CAP,
+    hedge_delay: Optional[float] = None,
+) -> T:
+    """
+    Call `fn` with jittered exponential backoff on transient OpenAI/Weaviate errors.
+
+    Retry-After headers are honored, and no sleep is started that would overrun `deadline`
+    (a time.monotonic() timestamp, see `deadline_in`). Without a deadline an open breaker
+    is waited out; with one, the call fails fast once the budget can't cover the wait.
+    """
+    attempt = 0
+    while True:
+        if breaker is not None:
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                wait_for = max(breaker.retry_in(), 0.05)
+                if deadline is not None and time.monotonic() + wait_for > deadline:
+                    raise
+                time.sleep(wait_for)
+                continue
+
+        try:
+            result = hedged_call(fn, hedge_delay) if hedge_delay is not None else fn()
+        except Exception as e:
+            transient = is_transient(e)
+            if breaker is not None:
+                if transient:
+                    breaker.record_failure()
+                else:
+                    # Not the dependency's fault (bad request etc.) — release a half-open trial
+                    breaker.record_success()
+            attempt += 1
+            if not transient or attempt > max_retries:
+                raise
+
+            delay = _retry_after(e)
+            if delay is None:
+                delay = backoff_delay(attempt, backoff_base, backoff_cap)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
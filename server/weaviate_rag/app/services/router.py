@@ -0,0 +1,76 @@
+import os
+import re
+import time
+from typing import NamedTuple, Sequence
+
+from app.services.metrics import METRICS
+
+# ----------------- Configuration -----------------
+# Models, the on/off switch and the confidence threshold are hot-reloadable
+# (config.small_model / chat_model / router_enabled / router_min_similarity)
+# Longest question (words) still considered "simple"
+ROUTER_MAX_WORDS = int(os.getenv("ROUTER_MAX_WORDS", "20"))
+# Contexts longer than this (chars) need the large model's reading
+ROUTER_MAX_CONTEXT_CHARS = int(os.getenv("ROUTER_MAX_CONTEXT_CHARS", "12000"))
+
+# "What is the Reynolds number?", "Was ist ein Staurohr?", "Define vorticity"
+_DEFINITIONAL_RE = re.compile(
+    r"^\s*(?:what\s+(?:is|are|does)|what's|define|definition\s+of|meaning\s+of|"
+    r"was\s+(?:ist|sind|bedeutet|versteht\s+man)|wie\s+lautet|definiere|nenne)\b",
+    re.IGNORECASE,
+)
+# Multi-step reasoning or explanations that a small model tends to get wrong
+_COMPLEX_RE = re.compile(
+    r"\b(?:deriv\w*|prove|proof|why|compare|comparison|difference|step[- ]by[- ]step|calculate|solve|"
+    r"herleit\w*|beweis\w*|warum|weshalb|vergleich\w*|unterschied\w*|berechne\w*|löse)\b",
+    re.IGNORECASE,
+)
+OUT_OF_DOMAIN = "This question is out of my knowledge domain."
+
+
+class Route(NamedTuple):
+    tier: str      # "small" | "large"
+    model: str
+    reason: str
+
+
+def route(question: str, similarities: Sequence[float], context_chars: int, cfg) -> Route:
+    """
+    Pick the model tier from the question's shape and how well retrieval matched it.
+    Only a short definitional question with a confident top chunk goes to the small model.
+    """
+    started = time.perf_counter()
+    large = lambda reason: Route("large", cfg.chat_model, reason)
+    if not cfg.router_enabled or cfg.small_model == cfg.chat_model:
+        decision = large("router off")
+    elif _COMPLEX_RE.search(question):
+        decision = large("multi-step question")
+    elif len(question.split()) > ROUTER_MAX_WORDS or not _DEFINITIONAL_RE.search(question):
+        decision = large("not a definition question")
+    elif cfg.router_min_similarity > 0 and max(similarities, default=0.0) < cfg.router_min_similarity:
+        decision = large("low retrieval confidence")
+    elif context_chars > ROUTER_MAX_CONTEXT_CHARS:
+        decision = large("long context")
+    else:
+        decision = Route("small", cfg.small_model, "definition with confident retrieval")
+    METRICS.observe("router_ms", (time.perf_counter() - started) * 1000)
+    METRICS.incr("router_decisions", tier=decision.tier, reason=decision.reason)
+    return decision
+
+
+def out_of_domain(similarities: Sequence[float], scores: Sequence[float], cfg) -> bool:
+    """
+    Score gate before any LLM call: True when even the best chunk is a weak match, i.e. the
+    model would only answer OUT_OF_DOMAIN. Cosine similarity is comparable across queries;
+    the hybrid score (relative fusion) is per-query normalised, so its check is off by default.
+    """
+    weak = (
+        (cfg.ood_min_similarity > 0 and max(similarities, default=0.0) < cfg.ood_min_similarity)
+        or (cfg.ood_min_score > 0 and max(scores, default=0.0) < cfg.ood_min_score)
+    )
+    METRICS.incr("ood_gate", result="blocked" if weak else "passed")
+    return weak
+
+
+def is_out_of_domain(answer: str) -> bool:
+    return OUT_OF_DOMAIN.rstrip(".").lower() in (answer or "").lower()
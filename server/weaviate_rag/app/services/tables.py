@@ -0,0 +1,85 @@
+import os
+import time
+from typing import List, Optional, Tuple
+
+# ----------------- Configuration -----------------
+EXTRACT_TABLES = os.getenv("EXTRACT_TABLES", "true").lower() in {"1", "true", "yes"}
+# Wall-clock seconds of table finding allowed per document; past it, pages fall back to plain text
+TABLE_BUDGET_SEC = float(os.getenv("TABLE_BUDGET_SEC", "20"))
+# Split a table into several chunks (header repeated) beyond this many characters
+TABLE_MAX_CHARS = int(os.getenv("TABLE_MAX_CHARS", "4000"))
+
+
+class TableBudget:
+    """
+    Per-document time budget for table extraction, plus the numbers we report.
+    """
+
+    def __init__(self, seconds: float = TABLE_BUDGET_SEC):
+        self.seconds = seconds
+        self.spent = 0.0
+        self.pages = 0
+        self.tables = 0
+        self.skipped_pages = 0
+
+    def exhausted(self) -> bool:
+        return self.spent >= self.seconds
+
+    def summary(self) -> str:
+        s = f"{self.tables} tables on {self.pages} pages in {self.spent:.1f}s (budget {self.seconds:.0f}s)"
+        if self.skipped_pages:
+            s += f", {self.skipped_pages} pages over budget"
+        return s
+
+
+def _cell(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).replace("|", "\\|")
+
+
+def table_to_markdown(rows: List[List[Optional[str]]], max_chars: int = TABLE_MAX_CHARS) -> List[str]:
+    """
+    Compact Markdown for one table; long tables become several chunks that each repeat the header.
+    """
+    rows = [[_cell(c) for c in row] for row in rows if row and any(c for c in row)]
+    if not rows:
+        return []
+    width = max(len(r) for r in rows)
+    lines = ["| " + " | ".join(r + [""] * (width - len(r))) + " |" for r in rows]
+    header = lines[0] + "\n|" + "---|" * width
+
+    chunks, body = [], []
+    size = len(header)
+    for line in lines[1:]:
+        if body and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join([header] + body))
+            body, size = [], len(header)
+        body.append(line)
+        size += len(line) + 1
+    chunks.append("\n".join([header] + body))
+    return chunks
+
+
+def extract_tables(page, budget: TableBudget) -> Optional[Tuple[str, List[str]]]:
+    """
+    Run pdfplumber's table finder on `page`. Returns (text outside the tables, markdown chunks),
+    or None when the budget is spent or no table was found.
+    """
+    if budget.exhausted():
+        budget.skipped_pages += 1
+        return None
+
+    t0 = time.perf_counter()
+    try:
+        found = page.find_tables()
+        if not found:
+            return None
+        chunks: List[str] = []
+        rest = page
+        for table in found:
+            chunks.extend(table_to_markdown(table.extract()))
+            rest = rest.outside_bbox(table.bbox)
+        budget.pages += 1
+        budget.tables += len(found)
+        return rest.extract_text() or "", chunks
+    finally:
+        budget.spent += time.perf_counter() - t0
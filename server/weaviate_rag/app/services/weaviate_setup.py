@@ -1,5 +1,9 @@
+import os
+import json
+import time
 import weaviate
-from weaviate.classes.config import Property, DataType
+from weaviate.classes.config import Configure, Reconfigure, Property, DataType, Tokenization
+from weaviate.classes.tenants import Tenant
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,25 +15,207 @@ client = weaviate.connect_to_local(
     skip_init_checks=True,
 )
 
-def init_schema():
-    class_name = "LectureChunk"
+# Text chunks and figures live in separate collections so figure rows never take
+# text top-k slots or skew BM25 statistics for the text index.
+CHUNK_COLLECTION = "LectureChunk"
+FIGURE_COLLECTION = "LectureFigure"
 
-    existing_collections = client.collections.list_all()
+# ----------------- Multi-tenancy -----------------
+# One tenant per course (e.g. "cfd", "stroemung"): each course gets its own shard that can
+# be activated/deactivated on its own. Only applies when the collections are created;
+# switching an existing deployment needs delete_collection.py + re-ingest.
+MULTI_TENANCY = os.getenv("MULTI_TENANCY", "false").lower() in {"1", "true", "yes"}
+# Tenant used when a request or ingest run doesn't name one
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "")
+
+# ----------------- Index tuning -----------------
+# PROVISIONAL: these defaults were not picked from a benchmark run. efConstruction 128,
+# maxConnections 32 and no quantizer are Weaviate's own defaults; ef 96 is a fixed stand-in
+# for its dynamic ef. Run `python -m scripts.bench_schema` against the ingested corpus
+# (recall@6 vs. p95 latency/memory), set the defaults from its suggestion and record the
+# table here. At our corpus size (a few thousand 1536-d vectors) the uncompressed index fits
+# easily in memory. ef is query-time and can be changed on an existing collection; the rest
+# only apply on create.
+HNSW_EF = int(os.getenv("HNSW_EF", "96"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "128"))
+HNSW_MAX_CONNECTIONS = int(os.getenv("HNSW_MAX_CONNECTIONS", "32"))
+# none | pq | bq | sq
+VECTOR_QUANTIZER = os.getenv("VECTOR_QUANTIZER", "none").lower()
+PQ_SEGMENTS = int(os.getenv("PQ_SEGMENTS", "0")) or None   # 0 -> server default
+
+
+def _quantizer(name: str = VECTOR_QUANTIZER):
+    if name == "pq":
+        return Configure.VectorIndex.Quantizer.pq(segments=PQ_SEGMENTS)
+    if name == "bq":
+        return Configure.VectorIndex.Quantizer.bq()
+    if name == "sq":
+        return Configure.VectorIndex.Quantizer.sq()
+    return None
 
-    if class_name in existing_collections:
-        print(f"ℹ️ Schema '{class_name}' already exists.")
-        return
-
-    client.collections.create(
-        name=class_name,
-        properties=[
-            Property(name="text", data_type=DataType.TEXT),
-            Property(name="source", data_type=DataType.TEXT),
-            Property(name="page", data_type=DataType.INT),
-            Property(name="imagePath", data_type=DataType.TEXT),
-        ],
-        # No vectorizer specified — this uses the default ('none' is not supported in 4.16.8)
-        description="A chunk of a lecture or technical PDF",
+
+def vector_index_config(
+    ef: int = HNSW_EF,
+    ef_construction: int = HNSW_EF_CONSTRUCTION,
+    max_connections: int = HNSW_MAX_CONNECTIONS,
+    quantizer: str = VECTOR_QUANTIZER,
+):
+    return Configure.VectorIndex.hnsw(
+        ef=ef,
+        ef_construction=ef_construction,
+        max_connections=max_connections,
+        quantizer=_quantizer(quantizer),
     )
 
-    print(f"✅ Created schema for '{class_name}'")
\ No newline at end of file
+
+def lecture_chunk_properties():
+    return [
+        # Only `text` is BM25-searchable; nothing filters on it, so skip the filterable index
+        Property(name="text", data_type=DataType.TEXT, index_filterable=False),
+        # Metadata: exact-match filterable only, never tokenized into BM25 or vectorized
+        Property(name="source", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True, skip_vectorization=True),
+        # Range index: page-range filters ("pages 10-20") stay cheap on large collections
+        Property(name="page", data_type=DataType.INT,
+                 index_filterable=True, index_range_filters=True, skip_vectorization=True),
+        *_scope_properties(),
+    ]
+
+
+def _scope_properties():
+    # Filter-only metadata used to scope searches (see filters.build_filters)
+    return [
+        # Other PDFs that contain the same content; set by ingest-time dedup instead of storing a copy
+        Property(name="aliases", data_type=DataType.TEXT_ARRAY, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True, skip_vectorization=True),
+        # Course / document-type tags from docs/metadata.json
+        Property(name="tags", data_type=DataType.TEXT_ARRAY, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True, skip_vectorization=True),
+        Property(name="language", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True, skip_vectorization=True),
+    ]
+
+
+def lecture_figure_properties():
+    return [
+        # Vision caption (empty when captioning is off); the only BM25-searchable field
+        Property(name="caption", data_type=DataType.TEXT, index_filterable=False),
+        Property(name="source", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True, skip_vectorization=True),
+        # Range index: page-range filters ("pages 10-20") stay cheap on large collections
+        Property(name="page", data_type=DataType.INT,
+                 index_filterable=True, index_range_filters=True, skip_vectorization=True),
+        Property(name="imagePath", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=False, skip_vectorization=True),
+        *_scope_properties(),
+    ]
+
+
+COLLECTIONS = {
+    CHUNK_COLLECTION: (lecture_chunk_properties, "A chunk of a lecture or technical PDF"),
+    FIGURE_COLLECTION: (lecture_figure_properties, "A figure extracted from a lecture PDF"),
+}
+
+
+def resolve_tenant(tenant: str = None) -> str:
+    """
+    The tenant to use for a request/ingest run ("" without multi-tenancy).
+    Raises ValueError for a tenant the deployment can't serve.
+    """
+    if not MULTI_TENANCY:
+        if tenant:
+            raise ValueError(f"Tenant '{tenant}' given but MULTI_TENANCY is off")
+        return ""
+    tenant = tenant or DEFAULT_TENANT
+    if not tenant:
+        raise ValueError("MULTI_TENANCY is on: a tenant (course) is required")
+    return tenant
+
+
+def get_collection(name: str, tenant: str = None):
+    """
+    `client.collections.get(name)`, scoped to the tenant when multi-tenancy is on.
+    """
+    collection = client.collections.get(name)
+    tenant = resolve_tenant(tenant)
+    return collection.with_tenant(tenant) if tenant else collection
+
+
+# ----------------- Index updates -----------------
+# {tenant: unix time of its last ingest or delete ("*": every tenant)}. Ingestion runs in
+# another process; the API server polls this file and drops that tenant's cached retrieval
+# results (rag.watch_index_updates), so a re-ingested course is served fresh right away.
+INDEX_UPDATES_PATH = os.getenv(
+    "INDEX_UPDATES_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "index_updates.json")),
+)
+ALL_TENANTS = "*"
+
+
+def index_updates(path: str = INDEX_UPDATES_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def mark_index_updated(tenant: str = None, path: str = INDEX_UPDATES_PATH):
+    """
+    Record that `tenant`'s index changed (None: all tenants), for running API servers.
+    """
+    data = index_updates(path)
+    data[ALL_TENANTS if tenant is None else tenant] = time.time()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def ensure_tenant(tenant: str):
+    """
+    Create `tenant` in every collection if missing (ingest calls this before writing).
+    """
+    for class_name in COLLECTIONS:
+        tenants = client.collections.get(class_name).tenants
+        if not tenants.exists(tenant):
+            tenants.create(Tenant(name=tenant))
+            print(f"✅ Created tenant '{tenant}' in '{class_name}'")
+
+
+def init_schema():
+    existing_collections = client.collections.list_all()
+
+    for class_name, (properties, description) in COLLECTIONS.items():
+        if class_name in existing_collections:
+            collection = client.collections.get(class_name)
+            if collection.config.get().multi_tenancy_config.enabled != MULTI_TENANCY:
+                print(f"⚠️  '{class_name}' was created with multi-tenancy "
+                      f"{'off' if MULTI_TENANCY else 'on'}; run delete_collection.py and re-ingest to switch")
+            # Mutable query-time knob; structural settings need delete_collection.py + re-ingest
+            collection.config.update(
+                vector_index_config=Reconfigure.VectorIndex.hnsw(ef=HNSW_EF)
+            )
+            # Properties added since the collection was created can be appended in place
+            have = {p.name for p in collection.config.get().properties}
+            for prop in properties():
+                if prop.name not in have:
+                    collection.config.add_property(prop)
+                    print(f"✅ Added property '{prop.name}' to '{class_name}'")
+            print(f"ℹ️ Schema '{class_name}' already exists.")
+            continue
+
+        client.collections.create(
+            name=class_name,
+            properties=properties(),
+            # No vectorizer specified — this uses the default ('none' is not supported in 4.16.8)
+            vector_index_config=vector_index_config(),
+            # Auto-activation loads an inactive course's shard on first query
+            multi_tenancy_config=Configure.multi_tenancy(
+                enabled=True, auto_tenant_creation=True, auto_tenant_activation=True
+            ) if MULTI_TENANCY else None,
+            description=description,
+        )
+
+        print(f"✅ Created schema for '{class_name}'")
@@ -0,0 +1,89 @@
+import argparse
+from collections import defaultdict
+
+from weaviate.classes.query import Filter
+
+from app.services.weaviate_setup import client, CHUNK_COLLECTION, FIGURE_COLLECTION, MULTI_TENANCY, get_collection
+from app.services.embedder import object_uuid
+
+DELETE_BATCH = 500
+# Keys tried when looking for the id ingestion would give a group (see embedder.object_uuid):
+# word offsets of text windows, "table-N" and "figure-N"
+MAX_WORD_OFFSET = 20000
+MAX_KEY_INDEX = 200
+# Properties that make two objects the same, per collection
+GROUP_PROPERTIES = {
+    CHUNK_COLLECTION: ("source", "page", "text"),
+    FIGURE_COLLECTION: ("source", "page", "imagePath"),
+}
+
+
+def _deterministic_id(collection_name: str, ids, source: str, page: int, text: str):
+    """
+    The id among `ids` that re-ingesting the group's document would write, or None.
+    """
+    ids = set(ids)
+    if collection_name == FIGURE_COLLECTION:
+        keys = (f"figure-{i}" for i in range(MAX_KEY_INDEX))
+        candidates = (object_uuid(source, page, key) for key in keys)
+    else:
+        keys = [*(f"table-{i}" for i in range(MAX_KEY_INDEX)), *range(MAX_WORD_OFFSET)]
+        candidates = (object_uuid(source, page, key, text) for key in keys)
+    return next((str(uuid) for uuid in candidates if str(uuid) in ids), None)
+
+
+def find_duplicates(collection, collection_name: str = CHUNK_COLLECTION):
+    """
+    Group objects by GROUP_PROPERTIES and return the ids of every copy but the survivor.
+    The survivor is the deterministic id (embedder.object_uuid) when the group has it, so the
+    next re-ingest overwrites it instead of bringing a duplicate back; otherwise the smallest id.
+    """
+    properties = GROUP_PROPERTIES[collection_name]
+    groups = defaultdict(list)
+    for obj in collection.iterator(return_properties=list(properties)):
+        source, page, content = (obj.properties.get(name) for name in properties)
+        # Chunk texts are word-boundary slices, so stripping doesn't change the uuid input
+        key = (source, page, (content or "").strip())
+        groups[key].append(str(obj.uuid))
+
+    duplicates = []
+    for (source, page, content), ids in groups.items():
+        if len(ids) < 2:
+            continue
+        keep = _deterministic_id(collection_name, ids, source, page, content) or min(ids)
+        duplicates.extend(i for i in ids if i != keep)
+    return len(groups), duplicates
+
+
+def _tenants(name: str, only=None):
+    if not MULTI_TENANCY:
+        return [""]
+    names = sorted(client.collections.get(name).tenants.get())
+    return [t for t in names if not only or t in only]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collapse duplicate objects in the chunk and figure collections")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be deleted")
+    parser.add_argument("--tenant", nargs="*", help="courses to clean (default: all; needs MULTI_TENANCY=true)")
+    args = parser.parse_args()
+
+    for name in GROUP_PROPERTIES:
+        for tenant in _tenants(name, args.tenant):
+            collection = get_collection(name, tenant)
+            label = f"{name}/{tenant}" if tenant else name
+            unique, duplicates = find_duplicates(collection, name)
+            print(f"ℹ️ {label}: {unique} unique objects, {len(duplicates)} duplicates")
+
+            if duplicates and not args.dry_run:
+                for i in range(0, len(duplicates), DELETE_BATCH):
+                    batch = duplicates[i:i + DELETE_BATCH]
+                    collection.data.delete_many(where=Filter.by_id().contains_any(batch))
+                print(f"✅ Deleted {len(duplicates)} duplicates from {label}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        client.close()
@@ -1,6 +1,21 @@
-from app.services.weaviate_setup import client
+import os
 
-client.collections.delete("LectureChunk")
-print("✅ Deleted LectureChunk collection")
+from app.services.weaviate_setup import client, CHUNK_COLLECTION, FIGURE_COLLECTION, mark_index_updated
+from app.services.ingest_journal import INGEST_JOURNAL_PATH, tenant_paths
+from app.services.dedup import DEDUP_INDEX_PATH
+
+for name in (CHUNK_COLLECTION, FIGURE_COLLECTION):
+    client.collections.delete(name)
+    print(f"✅ Deleted {name} collection")
+
+# The journals describe what is in the deleted collections; left behind, load_documents.py
+# would skip every file as already indexed. Collections hold all tenants, so all journals go.
+# Same for the dedup indexes: they would alias new documents onto UUIDs that no longer exist.
+for path in tenant_paths(INGEST_JOURNAL_PATH) + tenant_paths(DEDUP_INDEX_PATH):
+    os.remove(path)
+    print(f"✅ Deleted {os.path.basename(path)}")
+
+# Running API servers drop every cached retrieval result
+mark_index_updated(None)
 
 client.close()  
@@ -0,0 +1,7 @@
+"""
+Offline retrieval evaluation: a versioned question -> expected (source, page) set built from
+docs/, retrieval variants (k, alpha, chunk size, MMR, backend) and comparable JSON reports.
+
+    python -m evaluation.run --k 4,6,8 --alpha 0.3,0.5,0.7 --chunk-size 300,500
+    python -m evaluation.compare evaluation/reports/a.json evaluation/reports/b.json
+"""
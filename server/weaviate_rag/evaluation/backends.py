@@ -0,0 +1,113 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.chunking import normalize_page_text, iter_chunks
+from app.services.diversify import mmr_select, MMR_FETCH_FACTOR
+from scripts._corpus import load_pages
+
+# Weaviate's BM25 defaults and "word" tokenization (lower-cased alphanumeric runs)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Candidates taken from each of the keyword and vector searches before fusion
+FUSION_CANDIDATES = 100
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _min_max(scores: Dict[int, float]) -> Dict[int, float]:
+    if not scores:
+        return {}
+    lo, hi = min(scores.values()), max(scores.values())
+    return {i: (s - lo) / (hi - lo) if hi > lo else 1.0 for i, s in scores.items()}
+
+
+class LocalIndex:
+    """
+    In-memory stand-in for LectureChunk at a given chunking: BM25 + cosine over cached
+    embeddings, combined like Weaviate's relativeScoreFusion. Runs without Weaviate and,
+    once the embeddings are cached, without OpenAI.
+    """
+
+    def __init__(self, cache, chunk_size: int, overlap: int):
+        self.chunks: List[Tuple[str, int, str]] = []       # (source, page 1-based, text)
+        for source, page, raw in load_pages():
+            text = normalize_page_text(raw)
+            for _, chunk in iter_chunks(text, chunk_size, overlap):
+                self.chunks.append((source, page, chunk))
+
+        vectors = np.asarray(cache.get_many([c[2] for c in self.chunks]), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = vectors / np.where(norms == 0, 1, norms)
+        self.raw_vectors = vectors
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths = []
+        for i, (_, _, text) in enumerate(self.chunks):
+            counts = Counter(_tokens(text))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((i, tf))
+        self._avg_len = sum(self._lengths) / max(1, len(self._lengths))
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def bm25(self, query: str) -> Dict[int, float]:
+        n = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(_tokens(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[i] / self._avg_len)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def search(self, query: str, query_vector: Sequence[float], k: int, alpha: float,
+               diversify: bool) -> List[dict]:
+        limit = k * MMR_FETCH_FACTOR if diversify else k
+        q = np.asarray(query_vector, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        sims = self.vectors @ q
+
+        top_vec = np.argsort(-sims)[:FUSION_CANDIDATES]
+        keyword = self.bm25(query)
+        top_kw = sorted(keyword, key=keyword.get, reverse=True)[:FUSION_CANDIDATES]
+        vec_scores = _min_max({int(i): float(sims[i]) for i in top_vec})
+        kw_scores = _min_max({i: keyword[i] for i in top_kw})
+        fused = {
+            i: alpha * vec_scores.get(i, 0.0) + (1 - alpha) * kw_scores.get(i, 0.0)
+            for i in set(vec_scores) | set(kw_scores)
+        }
+        ranked = sorted(fused, key=lambda i: (-fused[i], i))[:limit]
+
+        if diversify and len(ranked) > k:
+            picked = mmr_select([fused[i] for i in ranked], self.raw_vectors[ranked].tolist(), k)
+            ranked = [ranked[j] for j in picked]
+        return [
+            {"source": self.chunks[i][0], "page": self.chunks[i][1], "aliases": [],
+             "score": fused[i], "similarity": float(sims[i])}
+            for i in ranked
+        ]
+
+
+def weaviate_search(query: str, query_vector, k: int, alpha: float, diversify: bool,
+                    tenant: str = "") -> List[dict]:
+    """
+    The production path (rag._retrieve_chunks) against the running Weaviate, with the query
+    embedding passed in so only the search itself is timed. Pages are returned 1-based.
+    """
+    from app.services.rag import _retrieve_chunks
+
+    hits = _retrieve_chunks(query, k, embedded_query=list(query_vector), diversify=diversify,
+                            tenant=tenant, alpha=alpha)
+    return [{**h, "page": h["page"] + 1} for h in hits]
@@ -0,0 +1,45 @@
+"""
+Compare two evaluation reports variant by variant:
+
+    python -m evaluation.compare evaluation/reports/v1-before.json evaluation/reports/v1-after.json
+"""
+import argparse
+import json
+
+from evaluation.run import variant_name
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    base, cand = _load(args.baseline), _load(args.candidate)
+    if base["dataset"] != cand["dataset"]:
+        print(f"❌ Different question sets ({base['dataset']} vs {cand['dataset']}); not comparable")
+        return
+    if base["embedding_model"] != cand["embedding_model"]:
+        print(f"⚠️  Embedding models differ: {base['embedding_model']} vs {cand['embedding_model']}")
+
+    before = {variant_name(r["variant"]): r["summary"] for r in base["results"]}
+    print(f"ℹ️ {base.get('commit') or '?'} -> {cand.get('commit') or '?'} on {base['dataset']}")
+    for r in cand["results"]:
+        name = variant_name(r["variant"])
+        if name not in before:
+            print(f"  {name:<58} (new variant)")
+            continue
+        deltas = "  ".join(
+            f"{metric} {value:.3f} ({value - before[name][metric]:+.3f})"
+            for metric, value in r["summary"].items() if metric in before[name]
+        )
+        print(f"  {name:<58} {deltas}")
+
+
+if __name__ == "__main__":
+    main()
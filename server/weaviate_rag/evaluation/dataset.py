@@ -0,0 +1,56 @@
+import json
+import os
+from typing import List, NamedTuple, Sequence, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Bump (new file, never edit an old one) when questions or expectations change, so reports
+# made against different sets are never compared by accident
+DATASET_VERSION = "v1"
+
+
+class Question(NamedTuple):
+    id: str
+    question: str
+    # [(accepted sources, 1-based page)]; several sources when a PDF exists twice in docs/
+    expected: Tuple[Tuple[Tuple[str, ...], int], ...]
+
+
+def load_questions(version: str = DATASET_VERSION) -> List[Question]:
+    path = os.path.join(HERE, f"questions_{version}.jsonl")
+    out = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            expected = tuple((tuple(e["sources"]), int(e["page"])) for e in row["expected"])
+            out.append(Question(row["id"], row["question"], expected))
+    return out
+
+
+def matches(expected_item, hit: dict) -> bool:
+    """
+    `hit` is a retrieved chunk ({"source", "page" (1-based), "aliases"}).
+    """
+    sources, page = expected_item
+    if hit["page"] != page:
+        return False
+    return hit["source"] in sources or any(a in sources for a in hit.get("aliases") or ())
+
+
+def first_relevant_rank(q: Question, hits: Sequence[dict]) -> int:
+    """
+    1-based rank of the first hit on an expected page; 0 if there is none.
+    """
+    for rank, hit in enumerate(hits, start=1):
+        if any(matches(e, hit) for e in q.expected):
+            return rank
+    return 0
+
+
+def recall(q: Question, hits: Sequence[dict]) -> float:
+    """
+    Share of the expected pages that appear among `hits`.
+    """
+    found = sum(1 for e in q.expected if any(matches(e, h) for h in hits))
+    return found / len(q.expected)
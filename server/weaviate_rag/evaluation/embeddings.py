@@ -0,0 +1,82 @@
+import hashlib
+import os
+import sqlite3
+from array import array
+from typing import Callable, List, Optional, Sequence
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+EMBED_CACHE_PATH = os.getenv("EVAL_EMBED_CACHE", os.path.join(ROOT, ".bench_cache", "embeddings.sqlite"))
+EMBED_BATCH_SIZE = 256
+
+
+class MissingEmbedding(RuntimeError):
+    pass
+
+
+def openai_embedder(model: str) -> Callable[[List[str]], List[List[float]]]:
+    from openai import OpenAI
+
+    oa = OpenAI()
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        resp = oa.embeddings.create(input=texts, model=model)
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    return embed
+
+
+class EmbeddingCache:
+    """
+    Text embeddings keyed by (model, sha1(text)), stored as float32 in SQLite. Only texts
+    never seen before reach `embed`; with `offline` they raise MissingEmbedding instead.
+    """
+
+    def __init__(self, model: str, path: str = EMBED_CACHE_PATH, offline: bool = False,
+                 embed: Optional[Callable[[List[str]], List[List[float]]]] = None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.model = model
+        self.offline = offline
+        self._embed = embed
+        self.fetched = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (model TEXT, key TEXT, vector BLOB, PRIMARY KEY (model, key))"
+        )
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[List[float]]:
+        keys = [self._key(t) for t in texts]
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):
+            batch = unique[i:i + 500]
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                [self.model, *batch],
+            )
+            for key, blob in rows:
+                found[key] = array("f", blob).tolist()
+
+        missing = list({k: t for k, t in zip(keys, texts) if k not in found}.items())
+        if missing and self.offline:
+            raise MissingEmbedding(f"{len(missing)} texts have no cached {self.model} embedding (run once online)")
+        if missing and self._embed is None:
+            self._embed = openai_embedder(self.model)
+        for i in range(0, len(missing), EMBED_BATCH_SIZE):
+            batch = missing[i:i + EMBED_BATCH_SIZE]
+            vectors = self._embed([t for _, t in batch])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(self.model, k, array("f", v).tobytes()) for (k, _), v in zip(batch, vectors)],
+            )
+            self._db.commit()
+            for (k, _), v in zip(batch, vectors):
+                found[k] = list(v)
+            self.fetched += len(batch)
+        return [found[k] for k in keys]
+
+    def close(self):
+        self._db.close()
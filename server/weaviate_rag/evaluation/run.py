@@ -0,0 +1,167 @@
+"""
+Run retrieval variants over the question set and write a JSON report.
+
+    python -m evaluation.run                                   # local backend, current defaults
+    python -m evaluation.run --k 4,6,8 --alpha 0.3,0.5,0.7 --chunk-size 300,500 --mmr on,off
+    python -m evaluation.run --backend local,weaviate --offline
+
+Every list option is a grid axis. The "local" backend rebuilds the chunk index per chunk
+size from docs/ (see backends.LocalIndex); "weaviate" searches the live collection, whose
+chunking is whatever the index was built with, so --chunk-size doesn't apply to it.
+Embeddings come from the SQLite cache (evaluation/embeddings.py); --offline fails instead
+of calling OpenAI for anything not cached yet.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from app.services.chunking import CHUNK_SIZE, CHUNK_OVERLAP
+from app.services.diversify import MMR_ENABLED
+from evaluation.dataset import DATASET_VERSION, load_questions, first_relevant_rank, recall
+from evaluation.embeddings import EmbeddingCache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR = os.path.join(HERE, "reports")
+
+
+def _list(kind):
+    return lambda s: [kind(v) for v in s.split(",") if v.strip()]
+
+
+def _on_off(value: str) -> bool:
+    return value.strip().lower() in {"1", "on", "true", "yes"}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=HERE).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def evaluate(search, questions, query_vectors, k: int) -> dict:
+    """
+    recall@k, hit@k, MRR and search latency of one variant; `search(question, vector)`
+    returns ranked hits with 1-based pages.
+    """
+    rows = []
+    for q, vec in zip(questions, query_vectors):
+        started = time.perf_counter()
+        hits = search(q.question, vec)
+        ms = (time.perf_counter() - started) * 1000
+        rank = first_relevant_rank(q, hits[:k])
+        rows.append({
+            "id": q.id,
+            "rank": rank,
+            "recall": recall(q, hits[:k]),
+            "ms": round(ms, 3),
+            "hits": [[h["source"], h["page"]] for h in hits[:k]],
+        })
+    latencies = [r["ms"] for r in rows]
+    return {
+        "summary": {
+            f"recall@{k}": round(statistics.mean(r["recall"] for r in rows), 4),
+            f"hit@{k}": round(statistics.mean(1.0 if r["rank"] else 0.0 for r in rows), 4),
+            "mrr": round(statistics.mean(1.0 / r["rank"] if r["rank"] else 0.0 for r in rows), 4),
+            "p50_ms": round(_percentile(latencies, 0.5), 3),
+            "p95_ms": round(_percentile(latencies, 0.95), 3),
+        },
+        "queries": rows,
+    }
+
+
+def variant_name(v: dict) -> str:
+    return "{backend} chunk={chunk_size}/{overlap} k={k} alpha={alpha} mmr={mmr}".format(**v)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default=DATASET_VERSION)
+    parser.add_argument("--backend", type=_list(str), default=["local"], help="local,weaviate")
+    parser.add_argument("--k", type=_list(int), default=[int(os.getenv("RETRIEVAL_K", "6"))])
+    parser.add_argument("--alpha", type=_list(float), default=[float(os.getenv("HYBRID_ALPHA", "0.5"))])
+    parser.add_argument("--chunk-size", type=_list(int), default=[CHUNK_SIZE], help="words (local backend)")
+    parser.add_argument("--overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--mmr", type=_list(_on_off), default=[MMR_ENABLED], help="on,off")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"))
+    parser.add_argument("--tenant", help="course to search with the weaviate backend")
+    parser.add_argument("--offline", action="store_true", help="never call OpenAI; cached embeddings only")
+    parser.add_argument("--out", help="report path (default evaluation/reports/<dataset>-<time>.json)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.dataset)
+    cache = EmbeddingCache(args.model, offline=args.offline)
+    query_vectors = cache.get_many([q.question for q in questions])
+    print(f"ℹ️ {len(questions)} questions ({args.dataset}), embedding model {args.model}")
+
+    variants = []
+    for backend, size, k, alpha, mmr in itertools.product(args.backend, args.chunk_size, args.k, args.alpha, args.mmr):
+        if backend == "weaviate":
+            size = CHUNK_SIZE      # fixed by the live index
+        variant = {"backend": backend, "chunk_size": size, "overlap": args.overlap, "k": k, "alpha": alpha, "mmr": mmr}
+        if variant not in variants:
+            variants.append(variant)
+
+    indexes = {}
+    client = None
+    results = []
+    try:
+        for v in variants:
+            if v["backend"] == "local":
+                if v["chunk_size"] not in indexes:
+                    from evaluation.backends import LocalIndex
+
+                    started = time.perf_counter()
+                    indexes[v["chunk_size"]] = LocalIndex(cache, v["chunk_size"], v["overlap"])
+                    print(f"ℹ️ local index chunk={v['chunk_size']}: {len(indexes[v['chunk_size']])} chunks "
+                          f"in {time.perf_counter() - started:.1f}s")
+                index = indexes[v["chunk_size"]]
+                search = lambda query, vec, v=v, index=index: index.search(query, vec, v["k"], v["alpha"], v["mmr"])
+            elif v["backend"] == "weaviate":
+                from evaluation.backends import weaviate_search
+                from app.services.weaviate_setup import client, resolve_tenant
+
+                tenant = resolve_tenant(args.tenant)
+                search = lambda query, vec, v=v, tenant=tenant: weaviate_search(
+                    query, vec, v["k"], v["alpha"], v["mmr"], tenant)
+            else:
+                parser.error(f"unknown backend {v['backend']!r}")
+
+            result = evaluate(search, questions, query_vectors, v["k"])
+            results.append({"variant": v, **result})
+            s, k = result["summary"], v["k"]
+            print(f"  {variant_name(v):<58} recall@k {s[f'recall@{k}']:.3f}  hit@k {s[f'hit@{k}']:.3f}  "
+                  f"MRR {s['mrr']:.3f}  p50 {s['p50_ms']:.2f} ms  p95 {s['p95_ms']:.2f} ms")
+    finally:
+        cache.close()
+        if client is not None:
+            client.close()
+
+    report = {
+        "dataset": args.dataset,
+        "questions": len(questions),
+        "embedding_model": args.model,
+        "commit": _git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "embeddings_fetched": cache.fetched,
+        "results": results,
+    }
+    out = args.out or os.path.join(REPORT_DIR, f"{args.dataset}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=1)
+    print(f"✅ Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
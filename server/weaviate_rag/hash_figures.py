@@ -0,0 +1,66 @@
+"""
+Move figures saved by older ingests ("<pdf>_p<page>.png") to content-hashed names with
+responsive sizes, and point LectureFigure.imagePath at the new files.
+
+    python hash_figures.py --dry-run
+    python hash_figures.py --tenant cfd-ws25     # with MULTI_TENANCY on
+"""
+import argparse
+import os
+from collections import defaultdict
+
+from PIL import Image
+
+from app.services.figure_store import STATIC_FIG_DIR, FIGURE_WEB_PREFIX, is_immutable, save_figure
+from app.services.weaviate_setup import client, FIGURE_COLLECTION, get_collection, resolve_tenant
+
+
+def legacy_figures():
+    return sorted(
+        name for name in os.listdir(STATIC_FIG_DIR)
+        if name.endswith(".png") and not is_immutable(name)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rename legacy figures to immutable, hashed URLs")
+    parser.add_argument("--tenant", help="course whose LectureFigure rows to update")
+    parser.add_argument("--dry-run", action="store_true", help="only list the files that would move")
+    parser.add_argument("--keep", action="store_true", help="keep the old files (for cached HTML)")
+    args = parser.parse_args()
+
+    names = legacy_figures()
+    print(f"ℹ️ {len(names)} legacy figures in {STATIC_FIG_DIR}")
+    if args.dry_run or not names:
+        for name in names:
+            print(f"  {name}")
+        return
+
+    figures = get_collection(FIGURE_COLLECTION, resolve_tenant(args.tenant))
+    # imagePath isn't filterable, so map paths to objects in one pass
+    by_path = defaultdict(list)
+    for obj in figures.iterator(return_properties=["imagePath"]):
+        by_path[obj.properties.get("imagePath")].append(obj.uuid)
+
+    updated = 0
+    for name in names:
+        old_path = os.path.join(STATIC_FIG_DIR, name)
+        with Image.open(old_path) as im:
+            new_web = save_figure(im.convert("RGB"), name[:-4])
+
+        uuids = by_path.get(f"{FIGURE_WEB_PREFIX}{name}", [])
+        for uuid in uuids:
+            figures.data.update(uuid=uuid, properties={"imagePath": new_web})
+        updated += len(uuids)
+        if not args.keep:
+            os.remove(old_path)
+        print(f"  {name} -> {os.path.basename(new_web)} ({len(uuids)} rows)")
+
+    print(f"✅ Hashed {len(names)} figures, updated {updated} {FIGURE_COLLECTION} rows")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        client.close()
@@ -1,23 +1,158 @@
+"""
+Index the PDFs in docs/ (the one ingestion entry point):
+
+    python load_documents.py                                # every new or changed PDF, 4 workers
+    python load_documents.py --workers 8 --since 2025-10-01
+    python load_documents.py --only "UserGuide.pdf" "Stroemung_*" --workers 1
+
+Files are scheduled largest first, so the long documents don't end up running alone at
+the end. Workers share one journal, dedup index, page filter and progress log, plus one
+embeddings batcher and one Weaviate batch writer (embedder.IngestBatcher). A file that
+fails is reported and the others carry on; rerunning resumes it from the journal.
+"""
 import os
-from app.services.embedder import embed_and_store
-from app.services.weaviate_setup import init_schema, client
+import argparse
+import fnmatch
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from app.services.embedder import embed_and_store, IngestBatcher
+from app.services.ingest_journal import IngestJournal, INGEST_JOURNAL_PATH, tenant_path
+from app.services.page_filter import PageFilter
+from app.services.dedup import DedupIndex, DEDUP_INDEX_PATH
+from app.services.doc_metadata import load_doc_metadata
+from app.services.ingest_progress import IngestProgress, INGEST_PROGRESS_LOG, count_pages
+from app.services.weaviate_setup import init_schema, client, resolve_tenant, ensure_tenant, mark_index_updated
+
+
+PDF_FOLDER = os.getenv("PDF_FOLDER", os.path.join(os.path.dirname(__file__), "docs"))
+# Files indexed in parallel. Text extraction in PyMuPDF/pdfium is serialized (not
+# thread-safe); embedding, Weaviate writes and captioning overlap.
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+# Per-file stage timings in the summary table (progress.file_stats keys)
+SUMMARY_STAGES = ("extract", "embed", "upsert", "figure", "caption")
+
+
+def select_pdfs(journal: IngestJournal, tags=None, only=None, since: float = None):
+    """
+    PDFs still to index, largest first. `only` takes file names or glob patterns;
+    `since` is a timestamp, older files are skipped.
+    """
+    metadata = load_doc_metadata()
+    todo = []
+    for file in os.listdir(PDF_FOLDER):
+        if not file.lower().endswith(".pdf"):
+            continue
+        if tags and not set(tags) & set(metadata.get(file, {}).get("tags", [])):
+            continue
+        if only and not any(fnmatch.fnmatch(file, pattern) for pattern in only):
+            continue
+        pdf_path = os.path.join(PDF_FOLDER, file)
+        if since is not None and os.path.getmtime(pdf_path) < since:
+            continue
+        if journal.file_done(pdf_path):
+            print(f"⏭️  Already indexed: {file}")
+            continue
+        todo.append(pdf_path)
+    return sorted(todo, key=os.path.getsize, reverse=True)
 
 
-PDF_FOLDER = os.path.join(os.path.dirname(__file__), "docs")
+def print_summary(rows):
+    """
+    rows: (file, stats Counter, wall seconds, error or None)
+    """
+    header = f"{'file':<44}{'pages':>6}{'chunks':>7}" + "".join(f"{s:>9}" for s in SUMMARY_STAGES)
+    print(header + f"{'total s':>9}  status")
+    for name, stats, wall, error in sorted(rows, key=lambda r: -r[2]):
+        # figure_upsert is counted with figure
+        stages = {s: stats[f"{s}_sec"] for s in SUMMARY_STAGES}
+        stages["figure"] += stats["figure_upsert_sec"]
+        print(f"{name[:42]:<44}{stats['pages']:>6}{stats['chunks']:>7}"
+              + "".join(f"{stages[s]:>9.1f}" for s in SUMMARY_STAGES)
+              + f"{wall:>9.1f}  " + (f"❌ {error}" if error else "✅"))
 
-def load_all_pdfs():
+
+def load_all_pdfs(tenant: str = None, tags=None, workers: int = INGEST_WORKERS, only=None, since: float = None):
     if not os.path.exists(PDF_FOLDER):
         print(f"❌ Folder not found: {PDF_FOLDER}")
-        return
+        return False
 
     init_schema()
+    tenant = resolve_tenant(tenant)
+    if tenant:
+        ensure_tenant(tenant)
+    # Progress survives crashes; delete ingest_journal.jsonl to force a full re-index.
+    # Journal and dedup index are per tenant, so one PDF can be indexed for several courses.
+    journal = IngestJournal(tenant_path(INGEST_JOURNAL_PATH, tenant))
+    # Shared across files so duplicates are caught between documents; the dedup index
+    # also persists across runs (delete_collection.py resets both)
+    dedup = DedupIndex(tenant_path(DEDUP_INDEX_PATH, tenant))
+
+    todo = select_pdfs(journal, tags, only, since)
+    workers = max(1, min(workers, len(todo) or 1))
+    # Bar + rates on the console, every event in ingest_progress.jsonl (appended per run)
+    progress = IngestProgress(count_pages(todo), tenant_path(INGEST_PROGRESS_LOG, tenant),
+                              files=len(todo), tenant=tenant, tags=tags, workers=workers)
+    page_filter = PageFilter(dedupe_pages=not dedup.enabled, log=progress.write)
+    # Coalescing only pays off when several files feed it
+    batcher = IngestBatcher(progress, enabled=workers > 1)
+
+    def ingest(pdf_path):
+        started = time.monotonic()
+        try:
+            embed_and_store(pdf_path, journal, page_filter, dedup, tenant, progress, batcher)
+            error = None
+        except Exception as e:
+            # The failing stage already logged an "error" event; this closes the file's stats
+            error = f"{type(e).__name__}: {e}"
+            progress.end_file(os.path.basename(pdf_path), failed=error)
+            progress.write(f"❌ {os.path.basename(pdf_path)} failed: {e}")
+        return pdf_path, time.monotonic() - started, error
+
+    rows = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+            # Submitted largest first; the pool starts them in that order
+            for future in as_completed([pool.submit(ingest, path) for path in todo]):
+                pdf_path, wall, error = future.result()
+                name = os.path.basename(pdf_path)
+                rows.append((name, progress.file_stats.get(name) or Counter(), wall, error))
+    finally:
+        batcher.close()
+        progress.close()
+        dedup.close()
+        journal.close()
+        if rows:
+            # Running API servers drop this course's cached retrieval results
+            mark_index_updated(tenant)
+
+    if rows:
+        print_summary(rows)
+    print(f"📊 Ingest: {progress.summary()}")
+    if batcher.enabled:
+        print(f"📊 Batching: {batcher.summary()}")
+    print(f"📊 Page filter: {page_filter.summary()}")
+    print(f"📊 Dedup: {dedup.summary()}")
+    return not any(error for *_, error in rows)
+
+
+def _since(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
 
-    for file in os.listdir(PDF_FOLDER):
-        if file.lower().endswith(".pdf"):
-            pdf_path = os.path.join(PDF_FOLDER, file)
-            embed_and_store(pdf_path)
-            
-    client.close()
 
 if __name__ == "__main__":
-    load_all_pdfs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Index the PDFs in docs/")
+    parser.add_argument("--tenant", help="course to index into (needs MULTI_TENANCY=true)")
+    parser.add_argument("--tag", nargs="*", help="only PDFs carrying one of these tags in docs/metadata.json")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="files indexed in parallel")
+    parser.add_argument("--only", nargs="*", help="file names or glob patterns to include")
+    parser.add_argument("--since", type=_since, help="only PDFs modified at/after this ISO date or datetime")
+    args = parser.parse_args()
+    try:
+        ok = load_all_pdfs(args.tenant, args.tag, args.workers, args.only, args.since)
+    finally:
+        client.close()
+    if not ok:
+        raise SystemExit(1)
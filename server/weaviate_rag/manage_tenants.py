@@ -0,0 +1,36 @@
+import argparse
+
+from app.services.weaviate_setup import client, COLLECTIONS, MULTI_TENANCY
+
+# Courses that are not in session can be deactivated: their shards are unloaded from
+# memory but stay on disk, and (auto-activation) come back on the next query.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, activate or deactivate course tenants")
+    parser.add_argument("action", choices=["list", "activate", "deactivate", "offload"])
+    parser.add_argument("tenants", nargs="*", help="tenant names (all for 'list')")
+    args = parser.parse_args()
+
+    if not MULTI_TENANCY:
+        print("❌ MULTI_TENANCY is off; there are no tenants to manage")
+        return
+
+    for class_name in COLLECTIONS:
+        tenants = client.collections.get(class_name).tenants
+        if args.action == "list":
+            for name, tenant in sorted(tenants.get().items()):
+                print(f"{class_name:<16} {name:<24} {tenant.activity_status.value}")
+            continue
+        if not args.tenants:
+            parser.error(f"'{args.action}' needs at least one tenant")
+        # offload needs an offload module (e.g. S3) configured on the server
+        getattr(tenants, args.action)(args.tenants)
+        print(f"✅ {args.action}: {', '.join(args.tenants)} in '{class_name}'")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        client.close()
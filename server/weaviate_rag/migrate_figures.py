@@ -0,0 +1,64 @@
+"""
+Move "[Figure]" rows written by older ingests out of LectureChunk into LectureFigure.
+
+Captioned figures used to be two rows (an embedded "[Figure] <caption>" row and a
+vectorless imagePath row); they are merged into one LectureFigure object.
+"""
+from collections import defaultdict
+
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
+
+from app.services.weaviate_setup import client, init_schema, CHUNK_COLLECTION, FIGURE_COLLECTION
+from app.services.embedder import object_uuid
+
+DELETE_BATCH = 500
+
+
+def main():
+    init_schema()
+    chunks = client.collections.get(CHUNK_COLLECTION)
+    figures = client.collections.get(FIGURE_COLLECTION)
+
+    images = defaultdict(list)     # (source, page) -> [imagePath]
+    captions = {}                  # (source, page) -> (caption, vector)
+    old_ids = []
+    for obj in chunks.iterator(include_vector=True):
+        text = (obj.properties.get("text") or "").strip()
+        if not text.startswith("[Figure]"):
+            continue
+        key = (obj.properties.get("source"), obj.properties.get("page"))
+        old_ids.append(str(obj.uuid))
+        if obj.properties.get("imagePath"):
+            images[key].append(obj.properties["imagePath"])
+        elif obj.vector:
+            caption = text[len("[Figure]"):].strip()
+            vec = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+            captions[key] = (caption, vec)
+
+    objects = []
+    for (source, page), paths in images.items():
+        caption, vec = captions.get((source, page), ("", None))
+        for fig_index, path in enumerate(dict.fromkeys(paths)):
+            objects.append(DataObject(
+                properties={"caption": caption, "source": source, "page": page, "imagePath": path},
+                uuid=object_uuid(source, page, f"figure-{fig_index}"),
+                vector=vec if fig_index == 0 else None,
+            ))
+
+    if objects:
+        res = figures.data.insert_many(objects)
+        if res.has_errors:
+            print(f"❌ {len(res.errors)} figures failed to migrate; LectureChunk left unchanged")
+            return
+    for i in range(0, len(old_ids), DELETE_BATCH):
+        chunks.data.delete_many(where=Filter.by_id().contains_any(old_ids[i:i + DELETE_BATCH]))
+
+    print(f"✅ Moved {len(objects)} figures to {FIGURE_COLLECTION}, removed {len(old_ids)} rows from {CHUNK_COLLECTION}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        client.close()
@@ -0,0 +1,41 @@
+"""
+Shared helpers for the offline benchmarks: page texts of every PDF in docs/, extracted
+once with pdfplumber and cached under .bench_cache/.
+"""
+import json
+import os
+from typing import List, Tuple
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+DOCS_DIR = os.path.join(ROOT, "docs")
+CACHE_DIR = os.path.join(ROOT, ".bench_cache")
+
+
+def pdf_paths() -> List[str]:
+    return [
+        os.path.join(DOCS_DIR, name)
+        for name in sorted(os.listdir(DOCS_DIR))
+        if name.lower().endswith(".pdf")
+    ]
+
+
+def load_pages() -> List[Tuple[str, int, str]]:
+    """
+    [(source, page_1_based, raw_text)] for every page of every PDF in docs/.
+    """
+    cache = os.path.join(CACHE_DIR, "pages.json")
+    if os.path.exists(cache):
+        with open(cache, encoding="utf-8") as fh:
+            return [tuple(p) for p in json.load(fh)]
+
+    import pdfplumber
+
+    pages = []
+    for path in pdf_paths():
+        with pdfplumber.open(path) as pdf:
+            for page_number, page in enumerate(pdf.pages, start=1):
+                pages.append((os.path.basename(path), page_number, page.extract_text() or ""))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(cache, "w", encoding="utf-8") as fh:
+        json.dump(pages, fh, ensure_ascii=False)
+    return pages
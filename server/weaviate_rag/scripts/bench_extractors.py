@@ -0,0 +1,71 @@
+"""
+Pages/sec per PDF text extractor over docs/.
+
+    python -m scripts.bench_extractors
+    python -m scripts.bench_extractors --only "UserGuide.pdf"
+
+"auto" is what ingestion uses: the fast backend per page, pdfplumber for table pages.
+Set EXTRACT_TABLES=false to time text extraction without the table finder.
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+
+from app.services.extractors import PdfPages, HAS_PYMUPDF, HAS_PDFIUM
+from app.services.tables import TableBudget
+from scripts._corpus import pdf_paths
+
+
+def available_modes():
+    modes = []
+    if HAS_PYMUPDF:
+        modes.append("pymupdf")
+    if HAS_PDFIUM:
+        modes.append("pdfium")
+    return modes + ["pdfplumber", "auto"]
+
+
+def run(path, mode):
+    t0 = time.perf_counter()
+    pages = chars = 0
+    used = defaultdict(int)
+    budget = TableBudget()
+    with PdfPages(path, mode=mode, table_budget=budget) as doc:
+        for page in doc:
+            pages += 1
+            chars += len(page.text) + sum(len(t) for t in page.tables)
+            used[page.extractor] += 1
+    return pages, chars, time.perf_counter() - t0, used, budget
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="*", help="PDF file names to include")
+    args = parser.parse_args()
+
+    paths = [p for p in pdf_paths() if not args.only or os.path.basename(p) in args.only]
+    modes = available_modes()
+    totals = {m: [0, 0, 0.0] for m in modes}
+
+    print(f"{'file':<48}" + "".join(f"{m + ' p/s':>16}" for m in modes))
+    for path in paths:
+        row = f"{os.path.basename(path)[:46]:<48}"
+        for mode in modes:
+            pages, chars, secs, used, budget = run(path, mode)
+            t = totals[mode]
+            t[0] += pages
+            t[1] += chars
+            t[2] += secs
+            row += f"{pages / max(secs, 1e-9):>16.1f}"
+            if mode == "auto" and used.get("pdfplumber"):
+                row += f"  ({used['pdfplumber']} table pages via pdfplumber; {budget.summary()})"
+        print(row)
+
+    print()
+    for mode, (pages, chars, secs) in totals.items():
+        print(f"{mode:<12} {pages:>6} pages  {secs:>8.2f} s  {pages / max(secs, 1e-9):>8.1f} pages/s  {chars:>10} chars")
+
+
+if __name__ == "__main__":
+    main()
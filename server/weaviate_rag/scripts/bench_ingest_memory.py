@@ -0,0 +1,141 @@
+"""
+Peak memory of the ingestion text pipeline (extract -> boilerplate -> document signature ->
+page filter -> chunks) against document length, without OpenAI or Weaviate.
+
+    python -m scripts.bench_ingest_memory
+    python -m scripts.bench_ingest_memory --only TutorialGuide.pdf --scale 1,4,16 --extractor pdfplumber
+
+Each PDF is repeated --scale times (pages copied with pypdfium2) to get long documents.
+Every run is a fresh subprocess, so its peak RSS is its own:
+
+  memory  pages held in a list, backend caches never flushed (PDF_FLUSH_EVERY=0)
+  stream  pages spooled to a temp file, caches flushed every PDF_FLUSH_EVERY pages
+
+"stream" should stay roughly flat as the page count grows; "memory" grows with it.
+(pdfplumber pages are closed right after reading in both modes; see PdfPages.page.)
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from scripts._corpus import ROOT, pdf_paths
+
+MODES = ("memory", "stream")
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # KiB on Linux
+
+
+def child(path: str, extractor: str, mode: str):
+    from app.services.chunking import iter_chunks
+    from app.services.dedup import document_signature
+    from app.services.doc_metadata import detect_language
+    from app.services.extractors import PdfPages
+    from app.services.page_filter import PageFilter
+    from app.services.page_spool import spool_pages
+
+    base = _peak_mb()
+    t0 = time.perf_counter()
+    chunks = 0
+    with PdfPages(path, mode=extractor) as pages:
+        doc_pages = spool_pages(pages, on_disk=mode == "stream")
+    document_signature(doc_pages.texts())
+    detect_language(doc_pages.texts())
+    page_filter = PageFilter(enabled=True, dedupe_pages=False)
+    page_filter.begin_document(os.path.basename(path), doc_pages.texts())
+    for page in doc_pages:
+        text = page_filter.filter(os.path.basename(path), page.number, page.text, has_tables=bool(page.tables))
+        if text is not None:
+            chunks += sum(1 for _ in iter_chunks(text)) + len(page.tables)
+    print(json.dumps({
+        "pages": len(doc_pages),
+        "chunks": chunks,
+        "sec": time.perf_counter() - t0,
+        "base_mb": base,
+        "peak_mb": _peak_mb(),
+    }))
+
+
+def repeated_pdf(path: str, times: int, out_dir: str) -> str:
+    if times == 1:
+        return path
+    import pypdfium2 as pdfium
+
+    src = pdfium.PdfDocument(path)
+    dst = pdfium.PdfDocument.new()
+    try:
+        for _ in range(times):
+            dst.import_pages(src)
+        out = os.path.join(out_dir, f"x{times}-{os.path.basename(path)}")
+        dst.save(out)
+        return out
+    finally:
+        dst.close()
+        src.close()
+
+
+def run(path: str, extractor: str, mode: str) -> dict:
+    env = dict(os.environ)
+    if mode == "memory":
+        env["PDF_FLUSH_EVERY"] = "0"
+    proc = subprocess.run(
+        [sys.executable, "-m", "scripts.bench_ingest_memory", "--child", path,
+         "--extractor", extractor, "--mode", mode],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "child failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", nargs="*", default=["UserGuide.pdf"], help="PDF file names to include")
+    parser.add_argument("--scale", default="1,4,16", help="repeat each PDF this many times")
+    parser.add_argument("--extractor", default=os.getenv("PDF_EXTRACTOR", "auto"),
+                        help="auto | pymupdf | pdfium | pdfplumber")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.extractor, args.mode)
+        return
+
+    paths = [p for p in pdf_paths() if os.path.basename(p) in args.only]
+    if not paths:
+        print(f"❌ None of {args.only} found in docs/")
+        return
+    scales = [int(s) for s in args.scale.split(",") if s.strip()]
+
+    print(f"{'file':<36}{'pages':>7}" + "".join(f"{m + ' MB':>14}{m + ' s':>10}" for m in MODES))
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            for times in scales:
+                try:
+                    doc = repeated_pdf(path, times, tmp)
+                except ImportError:
+                    print("⚠️  pypdfium2 is needed for --scale > 1")
+                    break
+                row, pages = "", 0
+                for mode in MODES:
+                    try:
+                        r = run(doc, args.extractor, mode)
+                    except RuntimeError as e:
+                        print(f"❌ {os.path.basename(doc)} ({mode}): {e}")
+                        return
+                    pages = r["pages"]
+                    # Growth over the interpreter + imports, which both modes share
+                    row += f"{r['peak_mb'] - r['base_mb']:>14.1f}{r['sec']:>10.1f}"
+                name = f"{os.path.basename(path)[:28]} x{times}"
+                print(f"{name:<36}{pages:>7}" + row)
+
+
+if __name__ == "__main__":
+    main()
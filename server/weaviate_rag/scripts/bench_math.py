@@ -0,0 +1,103 @@
+"""
+Throughput benchmark and golden check for format_equations_for_mathjax.
+
+    python -m scripts.bench_math            # golden cases + MB/s over every docs/ page
+    python -m scripts.bench_math --golden   # golden cases only (no PDFs needed)
+
+Page texts are extracted once with pdfplumber and cached under .bench_cache/.
+"""
+import argparse
+import re
+import sys
+import time
+
+from app.services.format_math_equation import format_equations_for_mathjax
+from scripts._corpus import load_pages
+
+
+def legacy_format(text: str) -> str:
+    """
+    The pre-tokenizer implementation, kept verbatim as the golden reference.
+    """
+    replacements = {
+        "∂": "\\partial",
+        "Δ": "\\Delta",
+        "*": " \\cdot ",
+        "^2": "^{2}",
+        "^3": "^{3}",
+    }
+    for ascii_symbol, latex_symbol in replacements.items():
+        text = text.replace(ascii_symbol, latex_symbol)
+    text = re.sub(r"(?m)^([^\n=]*=[^\n]*)$", r"$$\1$$", text)
+    text = re.sub(
+        r"\(\s*\\?partial\s*T\s*/\s*\\?partial\s*x\s*\)",
+        r"\\left(\\frac{\\partial T}{\\partial x}\\right)",
+        text,
+    )
+    return text
+
+
+# (input, expected). expected=None means "must equal legacy_format(input)".
+GOLDEN = [
+    ("q = -k (∂T/∂x)", None),
+    ("a*b + c * d", None),
+    ("y^3 and x^2", None),
+    ("nu [0 2 -1 0 0 0 0] 0.01;\ninternalField uniform (0 0 0);", None),
+    ('#include "initialConditions"', None),
+    ("plain text line", None),
+    ("p = p0 + 1/2 ρ u^2", "$$p = p0 + 1/2 \\rho u^{2}$$"),
+    # Intentional changes vs. legacy:
+    ("x^20", "x^{20}"),                                   # legacy: x^{2}0
+    ("Δp = 0", "$$\\Delta p = 0$$"),                      # legacy: \Deltap
+    ("* bullet\n**bold**", "* bullet\n**bold**"),         # legacy: \cdot everywhere
+    ("∇·u = 0", "$$\\nabla\\cdot u = 0$$"),
+    ("x² + y₁₂", "x^{2} + y_{12}"),
+    ("∑ α_i ∫ f dx", "\\sum \\alpha_i \\int f dx"),
+    ("(∂U/∂t)", "\\left(\\frac{\\partial U}{\\partial t}\\right)"),
+    ("```\na = b*c\n```", "```\na = b*c\n```"),
+    ("    U = fvc::grad(p)*dt;", "    U = fvc::grad(p)*dt;"),
+]
+
+
+def run_golden() -> bool:
+    ok = True
+    for text, expected in GOLDEN:
+        want = legacy_format(text) if expected is None else expected
+        got = format_equations_for_mathjax(text)
+        if got != want:
+            ok = False
+            print(f"❌ {text!r}\n   want {want!r}\n   got  {got!r}")
+    print(f"{'✅' if ok else '❌'} golden: {len(GOLDEN)} cases")
+    return ok
+
+
+def throughput(fn, pages, repeat):
+    size_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in pages:
+            fn(p)
+        best = min(best, time.perf_counter() - t0)
+    return size_mb / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--golden", action="store_true", help="only run the golden cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ok = run_golden()
+    if not args.golden:
+        pages = [text for _, _, text in load_pages()]
+        size_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+        same = sum(legacy_format(p) == format_equations_for_mathjax(p) for p in pages)
+        print(f"ℹ️ {len(pages)} pages, {size_mb:.1f} MB; {same} pages identical to legacy output")
+        print(f"legacy    {throughput(legacy_format, pages, args.repeat):8.2f} MB/s")
+        print(f"tokenizer {throughput(format_equations_for_mathjax, pages, args.repeat):8.2f} MB/s")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Dry run of the pre-embedding page filter over docs/: what would be skipped and how many
+embedding tokens that saves, without touching OpenAI or Weaviate.
+
+    python -m scripts.bench_page_filter
+    PAGE_DUP_THRESHOLD=0.8 python -m scripts.bench_page_filter
+"""
+import time
+from itertools import groupby
+
+from app.services.chunking import normalize_page_text, iter_chunks
+from app.services.page_filter import PageFilter, count_tokens
+from scripts._corpus import load_pages
+
+
+def chunk_tokens(text):
+    return sum(count_tokens(chunk) for _, chunk in iter_chunks(text))
+
+
+def main():
+    page_filter = PageFilter(enabled=True)
+    before = after = 0
+    t0 = time.perf_counter()
+
+    for source, group in groupby(load_pages(), key=lambda p: p[0]):
+        texts = [(page, normalize_page_text(raw)) for _, page, raw in group]
+        page_filter.begin_document(source, [text for _, text in texts])
+        skipped = 0
+        for page, text in texts:
+            before += chunk_tokens(text)
+            kept = page_filter.filter(source, page, text)
+            if kept is None:
+                skipped += 1
+            else:
+                after += chunk_tokens(kept)
+        print(f"{source[:46]:<48} {len(texts):>5} pages  {skipped:>4} skipped")
+
+    print()
+    print(f"📊 {page_filter.summary()}")
+    print(f"chunk tokens (with overlap)  before {before:>10}  after {after:>10}  "
+          f"({(before - after) / max(1, before):.1%} saved)  in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Model router check: decision time, routing of sample questions and, against the fake
+OpenAI server, per-tier latency including escalations.
+
+    python -m scripts.bench_router                      # decisions only
+    python -m scripts.bench_router --fake --refuse gpt-4o-mini
+
+--fake starts scripts/fake_openai.py in-process and sends each routed question there.
+"""
+import argparse
+import threading
+import time
+
+from app.services.config import settings
+from app.services.metrics import METRICS
+from app.services.router import route, is_out_of_domain
+
+QUESTIONS = [
+    "What is the Reynolds number?",
+    "Was ist ein Staurohr?",
+    "Define vorticity",
+    "Was bedeutet Kontinuitätsgleichung?",
+    "Derive the Hagen-Poiseuille profile from the Navier-Stokes equations",
+    "Why does the boundary layer separate behind a cylinder?",
+    "Compare PISO and SIMPLE in OpenFOAM",
+    "How do I set up a dam break case with interFoam and adjustable time stepping?",
+    "Warum ist die Strömung im Rohr ab Re 2300 turbulent?",
+    "what's blockMesh",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--similarity", type=float, default=0.6, help="top chunk similarity to assume")
+    parser.add_argument("--context-chars", type=int, default=6000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--fake", action="store_true", help="call a local fake OpenAI server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--refuse", nargs="*", default=[], help="models the fake server refuses with")
+    args = parser.parse_args()
+
+    cfg = settings()
+    sims = [args.similarity, args.similarity - 0.1]
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for q in QUESTIONS:
+            route(q, sims, args.context_chars, cfg)
+    per_call = (time.perf_counter() - t0) * 1000 / (args.repeat * len(QUESTIONS))
+    print(f"ℹ️ router decision: {per_call:.4f} ms mean over {args.repeat * len(QUESTIONS)} calls")
+
+    for q in QUESTIONS:
+        d = route(q, sims, args.context_chars, cfg)
+        print(f"  {d.tier:<6} {d.model:<14} {d.reason:<36} {q}")
+
+    if not args.fake:
+        return
+
+    from openai import OpenAI
+    from scripts.fake_openai import serve, parse_latency
+
+    server = serve(args.port, parse_latency(f"{cfg.chat_model}=0.4,{cfg.small_model}=0.1,*=0"), set(args.refuse))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    oa = OpenAI(base_url=f"http://127.0.0.1:{args.port}/v1", api_key="fake")
+
+    def complete(model, tier):
+        started = time.perf_counter()
+        resp = oa.chat.completions.create(model=model, messages=[{"role": "user", "content": q}], temperature=0)
+        METRICS.observe("chat_ms", (time.perf_counter() - started) * 1000, tier=tier)
+        return resp.choices[0].message.content
+
+    for q in QUESTIONS:
+        d = route(q, sims, args.context_chars, cfg)
+        answer = complete(d.model, d.tier)
+        if d.tier == "small" and is_out_of_domain(answer):
+            METRICS.incr("router_escalations")
+            complete(cfg.chat_model, "large")
+    server.shutdown()
+
+    snap = METRICS.snapshot()
+    print()
+    for name, s in sorted(snap["summaries"].items()):
+        if name.startswith("chat_ms"):
+            print(f"{name:<24} n={s['count']:<4} p50 {s['p50']:.0f} ms  p95 {s['p95']:.0f} ms")
+    print(f"escalations: {snap['counters'].get('router_escalations', 0):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark LectureChunk vector-index settings: recall@k vs. query latency and index memory.
+
+Copies the vectors already stored in LectureChunk into throwaway collections, one per
+configuration, and compares HNSW/quantized results against an exact (flat) index.
+
+    python -m scripts.bench_schema --queries 200 --k 6 --min-recall 0.99
+
+Ends with the fastest configuration (p95) that reaches --min-recall, as HNSW_* /
+VECTOR_QUANTIZER values for weaviate_setup.py.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from weaviate.classes.config import Configure
+from weaviate.classes.data import DataObject
+
+from app.services.weaviate_setup import client, vector_index_config
+
+SOURCE_COLLECTION = "LectureChunk"
+BENCH_PREFIX = "BenchLectureChunk"
+
+# (name, ef, efConstruction, maxConnections, quantizer)
+GRID = [
+    ("hnsw-ef64-m16", 64, 128, 16, "none"),
+    ("hnsw-ef96-m32", 96, 128, 32, "none"),
+    ("hnsw-ef128-m32", 128, 256, 32, "none"),
+    ("hnsw-ef256-m64", 256, 256, 64, "none"),
+    ("hnsw-ef96-m32-sq", 96, 128, 32, "sq"),
+    ("hnsw-ef96-m32-pq", 96, 128, 32, "pq"),
+    ("hnsw-ef96-m32-bq", 96, 128, 32, "bq"),
+]
+
+
+def load_vectors():
+    coll = client.collections.get(SOURCE_COLLECTION)
+    out = []
+    for obj in coll.iterator(include_vector=True, return_properties=[]):
+        vec = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+        if vec:
+            out.append((str(obj.uuid), vec))
+    return out
+
+
+def make_queries(vectors, n, noise, seed=7):
+    rnd = random.Random(seed)
+    picks = rnd.sample(vectors, min(n, len(vectors)))
+    return [[x + rnd.gauss(0, noise) for x in vec] for _, vec in picks]
+
+
+def build(name, index_config, vectors):
+    if client.collections.exists(name):
+        client.collections.delete(name)
+    coll = client.collections.create(name=name, vector_index_config=index_config)
+    t0 = time.perf_counter()
+    for i in range(0, len(vectors), 500):
+        coll.data.insert_many([
+            DataObject(properties={}, uuid=uid, vector=vec) for uid, vec in vectors[i:i + 500]
+        ])
+    return coll, time.perf_counter() - t0
+
+
+def search(coll, queries, k):
+    ids, latencies = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        res = coll.query.near_vector(near_vector=q, limit=k, return_properties=[])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        ids.append([str(o.uuid) for o in res.objects])
+    return ids, latencies
+
+
+def estimated_memory_mb(n, dims, max_connections, quantizer):
+    bytes_per_vector = {
+        "none": dims * 4,
+        "sq": dims,
+        "pq": dims // 4 * 1,     # default segments ~ dims/4, one byte each
+        "bq": dims // 8,
+    }[quantizer]
+    graph = max_connections * 2 * 8   # layer-0 links, uint64
+    return n * (bytes_per_vector + graph) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--noise", type=float, default=0.01, help="gaussian noise added to sampled vectors")
+    parser.add_argument("--min-recall", type=float, default=0.99, help="recall@k the suggested config must reach")
+    parser.add_argument("--keep", action="store_true", help="don't drop the benchmark collections")
+    args = parser.parse_args()
+
+    vectors = load_vectors()
+    if not vectors:
+        print(f"❌ {SOURCE_COLLECTION} has no vectors; run load_documents.py first")
+        return
+    dims = len(vectors[0][1])
+    queries = make_queries(vectors, args.queries, args.noise)
+    print(f"ℹ️ {len(vectors)} vectors x {dims} dims, {len(queries)} queries, k={args.k}")
+
+    created, rows = [], []
+    try:
+        exact, _ = build(f"{BENCH_PREFIX}Flat", Configure.VectorIndex.flat(), vectors)
+        created.append(exact.name)
+        truth, _ = search(exact, queries, args.k)
+
+        print(f"{'config':<22}{'recall@k':>10}{'p50 ms':>9}{'p95 ms':>9}{'build s':>9}{'mem MB':>9}")
+        for i, (name, ef, efc, m, quant) in enumerate(GRID):
+            coll, build_s = build(f"{BENCH_PREFIX}{i}", vector_index_config(ef, efc, m, quant), vectors)
+            created.append(coll.name)
+            got, lat = search(coll, queries, args.k)
+            recall = statistics.mean(
+                len(set(g) & set(t)) / max(1, len(t)) for g, t in zip(got, truth)
+            )
+            lat.sort()
+            p95 = lat[int(0.95 * (len(lat) - 1))]
+            rows.append((name, ef, efc, m, quant, recall, p95))
+            print(
+                f"{name:<22}{recall:>10.3f}{statistics.median(lat):>9.2f}"
+                f"{p95:>9.2f}{build_s:>9.1f}"
+                f"{estimated_memory_mb(len(vectors), dims, m, quant):>9.1f}"
+            )
+
+        ok = [r for r in rows if r[5] >= args.min_recall]
+        if ok:
+            name, ef, efc, m, quant, recall, p95 = min(ok, key=lambda r: r[6])
+            print(f"✅ Suggested ({name}: recall@{args.k} {recall:.3f}, p95 {p95:.2f} ms): "
+                  f"HNSW_EF={ef} HNSW_EF_CONSTRUCTION={efc} HNSW_MAX_CONNECTIONS={m} VECTOR_QUANTIZER={quant}")
+        else:
+            print(f"⚠️  No configuration reaches recall@{args.k} {args.min_recall}")
+    finally:
+        if not args.keep:
+            for name in created:
+                client.collections.delete(name)
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
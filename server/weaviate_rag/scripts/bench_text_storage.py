@@ -0,0 +1,114 @@
+"""
+Compare storing MathJax-formatted chunks (old) with plain normalized chunks (new):
+embedding token counts and BM25 recall for plain-text queries such as "dp/dx".
+
+    python -m scripts.bench_text_storage --probes 500 --k 6
+
+Runs offline: the BM25 side of hybrid search is re-implemented here with Weaviate's
+"word" tokenization, and probes are short spans lifted from random raw chunks.
+"""
+import argparse
+import math
+import random
+import re
+from collections import Counter, defaultdict
+
+import tiktoken
+
+from app.services.chunking import normalize_page_text, iter_chunks
+from app.services.format_math_equation import format_equations_for_mathjax
+from scripts._corpus import load_pages
+
+_TOKEN_RE = re.compile(r"[0-9A-Za-zÀ-ÖØ-öø-ÿ]+")
+_MATHY_RE = re.compile(r"[/^=∂∇Δρμν²³]|\d")
+
+
+def words(text):
+    return [t.lower() for t in _TOKEN_RE.findall(text)]
+
+
+class BM25:
+    def __init__(self, docs, k1=1.2, b=0.75):
+        self.k1, self.b = k1, b
+        self.tfs = [Counter(words(d)) for d in docs]
+        self.lens = [sum(tf.values()) for tf in self.tfs]
+        self.avg = sum(self.lens) / max(1, len(self.lens))
+        self.postings = defaultdict(list)
+        for i, tf in enumerate(self.tfs):
+            for term in tf:
+                self.postings[term].append(i)
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def search(self, query, k):
+        scores = defaultdict(float)
+        for term in set(words(query)):
+            for i in self.postings.get(term, ()):
+                tf = self.tfs[i][term]
+                norm = tf + self.k1 * (1 - self.b + self.b * self.lens[i] / self.avg)
+                scores[i] += self.idf[term] * tf * (self.k1 + 1) / norm
+        return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+def build_chunks():
+    """
+    Same chunk boundaries for both variants: old = formatted page text, new = normalized.
+    """
+    old, new = [], []
+    for _, _, raw in load_pages():
+        compact = normalize_page_text(raw)
+        for _, chunk in iter_chunks(compact):
+            new.append(chunk)
+            old.append(format_equations_for_mathjax(chunk))
+    return old, new
+
+
+def make_probes(chunks, n, seed=11):
+    rnd = random.Random(seed)
+    probes = []
+    candidates = list(range(len(chunks)))
+    rnd.shuffle(candidates)
+    for i in candidates:
+        toks = chunks[i].split()
+        mathy = [j for j, t in enumerate(toks) if _MATHY_RE.search(t)]
+        if not mathy:
+            continue
+        j = rnd.choice(mathy)
+        probes.append((" ".join(toks[max(0, j - 1):j + 2]), i))
+        if len(probes) >= n:
+            break
+    return probes
+
+
+def evaluate(index, probes, k):
+    hits, rr = 0, 0.0
+    for query, target in probes:
+        ranked = index.search(query, k)
+        if target in ranked:
+            hits += 1
+            rr += 1 / (ranked.index(target) + 1)
+    return hits / max(1, len(probes)), rr / max(1, len(probes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--probes", type=int, default=500)
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    old, new = build_chunks()
+    enc = tiktoken.get_encoding("cl100k_base")   # text-embedding-3-small's encoding
+    old_tokens = sum(len(enc.encode(c)) for c in old)
+    new_tokens = sum(len(enc.encode(c)) for c in new)
+    print(f"ℹ️ {len(new)} chunks")
+    print(f"embedding tokens  formatted {old_tokens:>10}  plain {new_tokens:>10}  "
+          f"({(old_tokens - new_tokens) / max(1, old_tokens):.1%} saved)")
+
+    probes = make_probes(new, args.probes)
+    for name, chunks in (("formatted", old), ("plain", new)):
+        recall, mrr = evaluate(BM25(chunks), probes, args.k)
+        print(f"BM25 {name:<10} recall@{args.k} {recall:.3f}  MRR {mrr:.3f}  ({len(probes)} probes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Calibrate the out-of-domain gate (config.ood_min_similarity / ood_min_score) and the model
+router's confidence threshold (config.router_min_similarity).
+
+Each labelled question is retrieved once, and its best chunk similarity and hybrid score are
+cached in .bench_cache/, so later sweeps are offline. "Positive" = out-of-domain, i.e. the
+gate should answer locally. Backends:
+
+  weaviate  the running Weaviate (same path as /chat, minus the LLM)
+  local     the evaluation suite's in-memory index over docs/ (evaluation.backends.LocalIndex)
+            with its embedding cache; no Weaviate needed
+
+In-domain questions are the built-in ones plus the evaluation dataset (--dataset, default
+evaluation/questions_v1.jsonl), so the gate is calibrated on the same questions as retrieval.
+
+    python -m scripts.calibrate_ood --backend local           # built-in + evaluation questions
+    python -m scripts.calibrate_ood --questions my.jsonl      # {"question": ..., "in_domain": true}
+    python -m scripts.calibrate_ood --min-precision 0.98 --refresh
+
+The recommended threshold is the one with the best recall whose precision stays at or above
+--min-precision: refusing a real course question costs more than one wasted completion.
+"""
+import argparse
+import json
+import os
+
+from scripts._corpus import CACHE_DIR
+
+FEATURES_PATH = os.path.join(CACHE_DIR, "ood_features.json")
+
+IN_DOMAIN = [
+    "What is the Reynolds number?",
+    "Was ist ein Staurohr?",
+    "Derive the Hagen-Poiseuille velocity profile",
+    "Why does the flow past a cylinder start shedding vortices?",
+    "How do I run the damBreak tutorial with interFoam?",
+    "What does blockMesh do?",
+    "Compare PISO and SIMPLE",
+    "Was besagt die Bernoulli-Gleichung?",
+    "How is the diffusion equation discretised?",
+    "Explain the convection-diffusion exercise",
+    "Wie lautet die Kontinuitätsgleichung?",
+    "Where is the controlDict and what does deltaT mean?",
+    "What is a boundary layer?",
+    "How do I compile OpenFOAM from source?",
+    "Was ist der Unterschied zwischen laminarer und turbulenter Strömung?",
+]
+OUT_OF_DOMAIN = [
+    "Who won the 2014 football world cup?",
+    "Give me a recipe for banana bread",
+    "What is the capital of Australia?",
+    "How do I file my tax return in Germany?",
+    "Write a poem about autumn",
+    "Which smartphone has the best camera?",
+    "Wie wird das Wetter morgen in Berlin?",
+    "Explain the plot of Hamlet",
+    "What is the price of bitcoin?",
+    "How do I train a dog to sit?",
+    "Recommend a good Netflix series",
+    "Wer war der erste Bundeskanzler?",
+    "How many calories are in an apple?",
+    "What is the best programming language for web design?",
+    "Tell me a joke about cats",
+]
+
+
+def load_questions(path: str = None, dataset: str = None):
+    if path is None:
+        in_domain = list(IN_DOMAIN)
+        if dataset:
+            from evaluation.dataset import load_questions as load_eval_questions
+
+            in_domain += [q.question for q in load_eval_questions(dataset)]
+        return [(q, True) for q in dict.fromkeys(in_domain)] + [(q, False) for q in OUT_OF_DOMAIN]
+    with open(path, encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh if line.strip()]
+    return [(r["question"], bool(r["in_domain"])) for r in rows]
+
+
+def _local_features(questions, model: str, offline: bool) -> dict:
+    """
+    Best similarity / hybrid score per question from the evaluation suite's LocalIndex,
+    at the current chunking, k and alpha (the settings /chat would use).
+    """
+    from app.services.chunking import CHUNK_SIZE, CHUNK_OVERLAP
+    from app.services.config import settings
+    from app.services.diversify import MMR_ENABLED
+    from evaluation.backends import LocalIndex
+    from evaluation.embeddings import EmbeddingCache
+
+    cfg = settings()
+    cache = EmbeddingCache(model, offline=offline)
+    try:
+        index = LocalIndex(cache, CHUNK_SIZE, CHUNK_OVERLAP)
+        features = {}
+        for q, vec in zip(questions, cache.get_many(questions)):
+            hits = index.search(q, vec, cfg.retrieval_k, cfg.hybrid_alpha, MMR_ENABLED)
+            features[q] = [max((h["similarity"] for h in hits), default=0.0),
+                           max((h["score"] for h in hits), default=0.0)]
+            print(f"  sim {features[q][0]:.3f}  score {features[q][1]:.3f}  {q}")
+        return features
+    finally:
+        cache.close()
+
+
+def collect_features(questions, tenant: str = None, refresh: bool = False, backend: str = "weaviate",
+                     model: str = None, offline: bool = False) -> dict:
+    """
+    {question: [best similarity, best hybrid score]}; only uncached questions are retrieved.
+    """
+    path = FEATURES_PATH if backend == "weaviate" else os.path.join(CACHE_DIR, f"ood_features.{backend}.json")
+    cached = {}
+    if os.path.exists(path) and not refresh:
+        with open(path, encoding="utf-8") as fh:
+            cached = json.load(fh)
+    missing = [q for q, _ in questions if q not in cached]
+    if missing and backend == "local":
+        cached.update(_local_features(missing, model, offline))
+    elif missing:
+        from app.services.config import settings
+        from app.services.rag import _retrieve
+        from app.services.weaviate_setup import client, resolve_tenant
+
+        tenant = resolve_tenant(tenant)
+        try:
+            for q in missing:
+                chunks, _ = _retrieve(q, tenant=tenant, cfg=settings())
+                cached[q] = [
+                    max((c["similarity"] for c in chunks), default=0.0),
+                    max((c["score"] for c in chunks), default=0.0),
+                ]
+                print(f"  sim {cached[q][0]:.3f}  score {cached[q][1]:.3f}  {q}")
+        finally:
+            client.close()
+    if missing:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(cached, fh, ensure_ascii=False, indent=1)
+    return cached
+
+
+def sweep(values, labels, min_precision: float):
+    """
+    Precision/recall of "value < threshold => out-of-domain" at every distinct cut point.
+    Returns (rows, recommended_row_or_None).
+    """
+    positives = sum(1 for in_domain in labels if not in_domain)
+    cuts = sorted(set(values))
+    thresholds = [(a + b) / 2 for a, b in zip(cuts, cuts[1:])] + [cuts[-1] + 1e-6]
+    rows = []
+    for t in thresholds:
+        flagged = [not in_domain for v, in_domain in zip(values, labels) if v < t]
+        tp = sum(flagged)
+        precision = tp / len(flagged) if flagged else 1.0
+        recall = tp / positives if positives else 0.0
+        rows.append((round(t, 4), precision, recall, len(flagged) - tp))
+    ok = [r for r in rows if r[1] >= min_precision and r[2] > 0]
+    best = max(ok, key=lambda r: (r[2], -r[0])) if ok else None
+    return rows, best
+
+
+def report(name: str, values, labels, min_precision: float):
+    rows, best = sweep(values, labels, min_precision)
+    print(f"\n📊 {name}")
+    print(f"  {'threshold':>9}  {'precision':>9}  {'recall':>6}  {'in-domain refused':>17}")
+    for t, p, r, fp in rows:
+        mark = "  <-" if best and t == best[0] else ""
+        print(f"  {t:>9.4f}  {p:>9.2f}  {r:>6.2f}  {fp:>17}{mark}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", help="JSONL with question / in_domain")
+    parser.add_argument("--dataset", default="v1", help="evaluation dataset added as in-domain ('' = none)")
+    parser.add_argument("--backend", choices=("weaviate", "local"), default="weaviate")
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+                        help="embedding model (local backend; must match the index)")
+    parser.add_argument("--offline", action="store_true", help="local backend: cached embeddings only")
+    parser.add_argument("--tenant", help="course to search when multi-tenancy is on")
+    parser.add_argument("--min-precision", type=float, default=0.95)
+    parser.add_argument("--refresh", action="store_true", help="re-query instead of using cached scores")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions, args.dataset)
+    features = collect_features(questions, args.tenant, args.refresh, args.backend, args.model, args.offline)
+    labels = [in_domain for _, in_domain in questions]
+    print(f"ℹ️ {sum(labels)} in-domain / {len(labels) - sum(labels)} out-of-domain questions")
+
+    recommended = {}
+    for i, (name, field) in enumerate((("cosine similarity", "ood_min_similarity"),
+                                       ("hybrid score", "ood_min_score"))):
+        best = report(name, [features[q][i] for q, _ in questions], labels, args.min_precision)
+        if best:
+            recommended[field] = best[0]
+
+    if recommended:
+        print(f"\n✅ Suggested (precision >= {args.min_precision}, {args.backend}, {args.model}, "
+              f"dataset {args.dataset or 'built-in'}): {json.dumps(recommended)}")
+        print("   apply with POST /admin/config or runtime_config.json")
+    else:
+        print(f"\n⚠️  No threshold reaches precision {args.min_precision}; keep the gate off (0)")
+
+    # The router's confidence check sends a definition question to the small model only when
+    # retrieval matched it at least as well as a typical course question does
+    in_domain = sorted(features[q][0] for q, label in questions if label)
+    if in_domain:
+        print(f"ℹ️ router_min_similarity: {in_domain[len(in_domain) // 2]:.4f} "
+              f"(median in-domain similarity; record it in config.py when setting a default)")
+
+
+if __name__ == "__main__":
+    main()
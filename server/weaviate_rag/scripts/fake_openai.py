@@ -0,0 +1,129 @@
+"""
+Local stand-in for the OpenAI API, for exercising the model router and load tests
+without spending tokens:
+
+    python -m scripts.fake_openai --port 8099 --latency gpt-4o=1.2,gpt-4o-mini=0.3
+    OPENAI_BASE_URL=http://localhost:8099/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+Implements POST /v1/chat/completions and /v1/embeddings. Per-model latency is simulated;
+--refuse makes the listed models answer with the out-of-domain sentence (escalation path).
+Prompt caching is mimicked: a system message of >= 1024 tokens seen before is reported
+as `cached_tokens` (in 128-token steps) and halves the simulated latency.
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.router import OUT_OF_DOMAIN
+
+EMBEDDING_DIM = 1536
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _embedding(text: str):
+    rnd = random.Random(hashlib.sha1(text.encode("utf-8")).digest())
+    return [rnd.uniform(-1, 1) for _ in range(EMBEDDING_DIM)]
+
+
+def make_handler(latency: dict, refuse: set):
+    seen_prefixes = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            model = req.get("model", "")
+            delay = latency.get(model, latency.get("*", 0.0))
+
+            cached = 0
+            messages = req.get("messages") or []
+            if messages and messages[0].get("role") == "system":
+                prefix = messages[0].get("content") or ""
+                key = (model, hashlib.sha1(prefix.encode("utf-8")).hexdigest())
+                if _tokens(prefix) >= 1024 and key in seen_prefixes:
+                    cached = _tokens(prefix) // 128 * 128
+                    delay /= 2
+                seen_prefixes.add(key)
+            time.sleep(delay)
+
+            if self.path.endswith("/embeddings"):
+                inputs = req.get("input")
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                return self._send({
+                    "object": "list",
+                    "model": model,
+                    "data": [{"object": "embedding", "index": i, "embedding": _embedding(t)}
+                             for i, t in enumerate(inputs)],
+                    "usage": {"prompt_tokens": sum(map(_tokens, inputs)), "total_tokens": sum(map(_tokens, inputs))},
+                })
+
+            if self.path.endswith("/chat/completions"):
+                prompt = " ".join(m.get("content") or "" for m in req.get("messages", []))
+                answer = OUT_OF_DOMAIN if model in refuse else (
+                    f"1. **Explain** – [{model}] fake answer.\n\n"
+                    "2. **Compare** – fake.\n\n3. **Motivate** – fake."
+                )
+                usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(answer),
+                         "prompt_tokens_details": {"cached_tokens": cached}}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                return self._send({
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": answer}}],
+                    "usage": usage,
+                })
+
+            self._send({"error": {"message": f"unknown path {self.path}"}}, status=404)
+
+    return Handler
+
+
+def parse_latency(spec: str) -> dict:
+    out = {}
+    for part in filter(None, spec.split(",")):
+        model, seconds = part.split("=")
+        out[model.strip()] = float(seconds)
+    return out
+
+
+def serve(port: int, latency: dict, refuse: set) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, refuse))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default="gpt-4o=1.2,gpt-4o-mini=0.3,*=0.05",
+                        help="model=seconds,...  ('*' = any other model)")
+    parser.add_argument("--refuse", nargs="*", default=[], help="models that answer out-of-domain")
+    args = parser.parse_args()
+
+    server = serve(args.port, parse_latency(args.latency), set(args.refuse))
+    print(f"✅ Fake OpenAI on http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from app.services.chunking import normalize_page_text
+
+
+def test_soft_hyphen_break_is_joined():
+    assert normalize_page_text("Die Strö\u00ad\nmung ist laminar") == "Die Strömung ist laminar"
+
+
+def test_soft_hyphen_inside_line_is_dropped():
+    assert normalize_page_text("Rey\u00adnolds number") == "Reynolds number"
+
+
+def test_broken_word_seen_elsewhere_on_the_page_is_joined():
+    text = "Die Strömung am Zylinder.\nDie Strö-\nmung löst ab."
+    assert normalize_page_text(text) == "Die Strömung am Zylinder.\nDie Strömung löst ab."
+
+
+def test_hyphenated_compound_keeps_its_hyphen():
+    assert normalize_page_text("a state-\nof-the-art solver") == "a state-\nof-the-art solver"
+
+
+def test_compound_without_evidence_keeps_its_hyphen():
+    assert normalize_page_text("a well-\nknown result") == "a well-\nknown result"
+
+
+def test_capitalized_continuation_keeps_its_hyphen():
+    assert normalize_page_text("the Navier-\nStokes equations") == "the Navier-\nStokes equations"
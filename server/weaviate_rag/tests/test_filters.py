@@ -0,0 +1,20 @@
+import pytest
+
+from app.services.filters import build_filters, check_page_ranges
+
+
+def test_valid_page_ranges_pass_through():
+    pages = [(1, 1), (10, 20)]
+    assert check_page_ranges(pages) == pages
+    assert check_page_ranges(None) is None
+
+
+@pytest.mark.parametrize("pages", [[(3, 1)], [(0, 2)], [(-4, -1)], [(1, 5), (7, 6)]])
+def test_inverted_or_non_positive_page_range_is_rejected(pages):
+    with pytest.raises(ValueError):
+        check_page_ranges(pages)
+
+
+def test_build_filters_rejects_inverted_page_range():
+    with pytest.raises(ValueError):
+        build_filters(pages=[(3, 1)])